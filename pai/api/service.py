@@ -22,6 +22,8 @@ from ..libs.alibabacloud_eas20210701.models import (
     CreateServiceResponseBody,
     DescribeMachineSpecRequest,
     DescribeMachineSpecResponseBody,
+    ListServiceInstancesRequest,
+    ListServiceInstancesResponseBody,
     ListServicesRequest,
     ListServicesResponseBody,
     ReleaseServiceRequest,
@@ -45,6 +47,7 @@ class ServiceAPI(ResourceAPI):
     _stop_method = "stop_service_with_options"
     _delete_method = "delete_service_with_options"
     _release_method = "release_service_with_options"
+    _list_instances_method = "list_service_instances_with_options"
 
     _get_group_method = "describe_group_with_options"
     _list_groups_method = "list_group_with_options"
@@ -72,6 +75,20 @@ class ServiceAPI(ResourceAPI):
         resp: ListServicesResponseBody = self._do_request(self._list_method, request)
         return self.make_paginated_result(resp)
 
+    def list_instances(self, name, page_number=None, page_size=None) -> PaginatedResult:
+        """List the instances of the service."""
+        request = ListServiceInstancesRequest(
+            page_number=page_number,
+            page_size=page_size,
+        )
+        resp: ListServiceInstancesResponseBody = self._do_request(
+            self._list_instances_method,
+            cluster_id=self.region_id,
+            service_name=name,
+            request=request,
+        )
+        return self.make_paginated_result(resp, item_key="Instances")
+
     def get_api_object_by_resource_id(self, resource_id):
         resp = self._do_request(
             self._get_method,
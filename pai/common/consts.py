@@ -19,6 +19,17 @@ DEFAULT_CONFIG_PATH = os.environ.get(
     "PAI_CONFIG_PATH", os.path.join(os.path.expanduser("~"), ".pai", "config.json")
 )
 
+# Directory used to persist the model signature definitions of TensorFlow prediction
+# services, signature definitions are only cached in memory if it is not provided.
+SIGNATURE_DEF_CACHE_DIR = os.environ.get("PAI_SIGNATURE_DEF_CACHE_DIR", None)
+
+# Path of the local cache of file digests used by `oss_utils.sync`, the digest of a
+# file is reused if its size and modification time are not changed.
+FILE_HASH_CACHE_PATH = os.environ.get(
+    "PAI_FILE_HASH_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".pai", "cache", "file_hashes.json"),
+)
+
 # Default network type used to connect to PAI services
 DEFAULT_NETWORK_TYPE = os.environ.get("PAI_NETWORK_TYPE", None)
 
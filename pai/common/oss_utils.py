@@ -14,12 +14,21 @@
 
 from __future__ import absolute_import
 
+import collections
 import glob
+import gzip
+import hashlib
+import io
+import json
 import os.path
 import pathlib
+import shutil
 import tarfile
 import tempfile
-from typing import Optional, Tuple, Union
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
+from typing import IO, Callable, List, Optional, Tuple, Union
 from urllib.parse import parse_qs, urlparse
 
 import oss2
@@ -28,6 +37,7 @@ from alibabacloud_credentials.models import Config as CredentialConfig
 from oss2.credentials import Credentials, CredentialsProvider
 from tqdm.autonotebook import tqdm
 
+from .consts import FILE_HASH_CACHE_PATH
 from .logging import get_logger
 
 logger = get_logger(__name__)
@@ -84,6 +94,771 @@ def _download_with_progress(
         pbar.update(n=pbar.total - pbar.n)
 
 
+# Files smaller than the threshold are uploaded with a single PutObject request,
+# larger files are uploaded in parts with multipart upload.
+_MULTIPART_THRESHOLD = oss2.defaults.multipart_threshold
+
+
+def _default_max_workers() -> int:
+    return (os.cpu_count() or 1) * 2
+
+
+class _TransferScheduler(object):
+    """Runs the transfers of many files on a shared pool of worker threads, and
+    reports the aggregate progress with a single progress bar.
+
+    Tasks may submit further tasks (such as the parts of a multipart upload), all
+    of them are bounded by the same worker budget. Tasks never wait for other tasks,
+    so that the pool could not be deadlocked.
+    """
+
+    def __init__(
+        self, total: Optional[int], desc: str, max_workers: Optional[int] = None
+    ):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or _default_max_workers()
+        )
+        self._pbar = tqdm(total=total, unit="B", unit_scale=True, desc=desc)
+        self._lock = threading.Lock()
+        self._futures: List[Future] = []
+        self._cleanups: List[Callable[[], None]] = []
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        future = self._executor.submit(fn, *args, **kwargs)
+        with self._lock:
+            self._futures.append(future)
+        return future
+
+    def update(self, n: int):
+        with self._lock:
+            self._pbar.update(n)
+
+    def add_cleanup(self, fn: Callable[[], None]):
+        """Register a function that is called if the transfers fail, after all the
+        running tasks exit, such as aborting an incomplete multipart upload."""
+        with self._lock:
+            self._cleanups.append(fn)
+
+    def add_total(self, n: int):
+        """Grow the total size of the transfers, used while the transfers are
+        discovered and started incrementally."""
+        with self._lock:
+            self._pbar.total = (self._pbar.total or 0) + n
+            self._pbar.refresh()
+
+    def failed(self) -> bool:
+        with self._lock:
+            return any(f.done() and f.exception() for f in self._futures)
+
+    def progress_callback(self) -> Callable[[int, Optional[int]], None]:
+        """Returns an oss2 progress callback that reports the consumed bytes of a
+        transfer to the aggregate progress bar."""
+        consumed = 0
+
+        def _callback(consumed_bytes, total_bytes):
+            nonlocal consumed
+            self.update(consumed_bytes - consumed)
+            consumed = consumed_bytes
+
+        return _callback
+
+    def wait(self):
+        """Wait for all the submitted tasks, including the tasks submitted by the
+        running tasks, raise the first error of the tasks."""
+        succeeded = False
+        try:
+            while True:
+                with self._lock:
+                    pending = [f for f in self._futures if not f.done()]
+                    failed = [f for f in self._futures if f.done() and f.exception()]
+                if failed:
+                    raise failed[0].exception()
+                if not pending:
+                    succeeded = True
+                    return
+                wait(pending, return_when=FIRST_EXCEPTION)
+        finally:
+            with self._lock:
+                for future in self._futures:
+                    future.cancel()
+            self._executor.shutdown(wait=True)
+            self._pbar.close()
+            if not succeeded:
+                for cleanup in self._cleanups:
+                    cleanup()
+
+
+def _put_file(
+    scheduler: _TransferScheduler, bucket: oss2.Bucket, filename: str, object_key: str
+):
+    bucket.put_object_from_file(
+        object_key, filename, progress_callback=scheduler.progress_callback()
+    )
+
+
+class _MultipartUpload(object):
+    """Uploads a file in parts, the parts are uploaded concurrently by the tasks of
+    the scheduler, and the upload is completed by the task of the last part. The
+    upload is aborted if it is not completed when the transfers of the scheduler
+    fail."""
+
+    def __init__(
+        self,
+        scheduler: _TransferScheduler,
+        bucket: oss2.Bucket,
+        filename: str,
+        object_key: str,
+        size: int,
+    ):
+        self.scheduler = scheduler
+        self.bucket = bucket
+        self.filename = filename
+        self.object_key = object_key
+        self.size = size
+        self.upload_id = None
+        self._parts: List[oss2.models.PartInfo] = []
+        self._remaining = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        part_size = oss2.determine_part_size(
+            self.size, preferred_size=oss2.defaults.part_size
+        )
+        self.upload_id = self.bucket.init_multipart_upload(self.object_key).upload_id
+        self.scheduler.add_cleanup(self._abort)
+        offsets = list(range(0, self.size, part_size))
+        self._remaining = len(offsets)
+        for part_number, offset in enumerate(offsets, start=1):
+            self.scheduler.submit(
+                self._upload_part,
+                part_number,
+                offset,
+                min(part_size, self.size - offset),
+            )
+
+    def _upload_part(self, part_number: int, offset: int, size: int):
+        try:
+            with open(self.filename, "rb") as f:
+                f.seek(offset)
+                result = self.bucket.upload_part(
+                    self.object_key,
+                    self.upload_id,
+                    part_number,
+                    oss2.utils.SizedFileAdapter(f, size),
+                    progress_callback=self.scheduler.progress_callback(),
+                )
+        except Exception:
+            self._abort()
+            raise
+        with self._lock:
+            self._parts.append(oss2.models.PartInfo(part_number, result.etag))
+            self._remaining -= 1
+            completed = self._remaining == 0
+        if completed:
+            try:
+                self.bucket.complete_multipart_upload(
+                    self.object_key,
+                    self.upload_id,
+                    sorted(self._parts, key=lambda p: p.part_number),
+                )
+            except Exception:
+                self._abort()
+                raise
+            with self._lock:
+                self.upload_id = None
+
+    def _abort(self):
+        with self._lock:
+            if self.upload_id is None:
+                return
+            upload_id, self.upload_id = self.upload_id, None
+        try:
+            self.bucket.abort_multipart_upload(self.object_key, upload_id)
+        except oss2.exceptions.OssError as e:
+            logger.warning(
+                "Failed to abort the multipart upload: key=%s %s", self.object_key, e
+            )
+
+
+def _upload_files(
+    files: List[Tuple[str, str]],
+    bucket: oss2.Bucket,
+    desc: str,
+    max_workers: Optional[int] = None,
+):
+    """Upload the files concurrently, the files are given as a list of (local file
+    path, object key)."""
+    sizes = [os.path.getsize(filename) for filename, _ in files]
+    scheduler = _TransferScheduler(total=sum(sizes), desc=desc, max_workers=max_workers)
+    for (filename, object_key), size in zip(files, sizes):
+        _submit_upload(scheduler, bucket, filename, object_key, size)
+    scheduler.wait()
+
+
+def _submit_upload(
+    scheduler: _TransferScheduler,
+    bucket: oss2.Bucket,
+    filename: str,
+    object_key: str,
+    size: int,
+):
+    if size < _MULTIPART_THRESHOLD:
+        scheduler.submit(_put_file, scheduler, bucket, filename, object_key)
+    else:
+        upload = _MultipartUpload(scheduler, bucket, filename, object_key, size)
+        scheduler.submit(upload.start)
+
+
+class _MultipartUploadWriter(object):
+    """A writable file object that uploads the written data to an OSS object.
+
+    The data is split into parts, which are uploaded concurrently while the data is
+    still being written. At most `max_buffered_parts` parts are buffered in memory
+    (40 MiB with the default part size, whatever the number of CPUs is), the writer
+    blocks until a part is uploaded if the limit is reached. The data is uploaded
+    with a single PutObject request if it is smaller than a part. The multipart
+    upload is aborted if the upload fails.
+    """
+
+    def __init__(
+        self,
+        bucket: oss2.Bucket,
+        object_key: str,
+        desc: str,
+        max_workers: Optional[int] = None,
+        max_buffered_parts: int = 4,
+    ):
+        max_workers = min(max_workers or _default_max_workers(), max_buffered_parts)
+        self.bucket = bucket
+        self.object_key = object_key
+        self.part_size = oss2.defaults.part_size
+        self.upload_id = None
+        self.closed = False
+        self._scheduler = _TransferScheduler(
+            total=0, desc=desc, max_workers=max_workers
+        )
+        self._slots = threading.BoundedSemaphore(max_buffered_parts)
+        self._buffer = bytearray()
+        self._parts: List[oss2.models.PartInfo] = []
+        self._lock = threading.Lock()
+
+    def writable(self):
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        while len(self._buffer) >= self.part_size:
+            self._submit_part(bytes(self._buffer[: self.part_size]))
+            del self._buffer[: self.part_size]
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def _submit_part(self, data: bytes):
+        if self._scheduler.failed():
+            # Raise the error of the failed part.
+            self._scheduler.wait()
+        if self.upload_id is None:
+            self.upload_id = self.bucket.init_multipart_upload(
+                self.object_key
+            ).upload_id
+        self._slots.acquire()
+        # Reserve the part number, the etag is filled in by the upload task.
+        with self._lock:
+            part_number = len(self._parts) + 1
+            self._parts.append(oss2.models.PartInfo(part_number, None))
+        self._scheduler.add_total(len(data))
+        self._scheduler.submit(self._upload_part, part_number, data)
+
+    def _upload_part(self, part_number: int, data: bytes):
+        try:
+            result = self.bucket.upload_part(
+                self.object_key,
+                self.upload_id,
+                part_number,
+                data,
+                progress_callback=self._scheduler.progress_callback(),
+            )
+        finally:
+            self._slots.release()
+        with self._lock:
+            self._parts[part_number - 1].etag = result.etag
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self.upload_id is None:
+                self._scheduler.add_total(len(self._buffer))
+                self._scheduler.submit(
+                    self.bucket.put_object,
+                    self.object_key,
+                    bytes(self._buffer),
+                    progress_callback=self._scheduler.progress_callback(),
+                )
+                self._scheduler.wait()
+                return
+            if self._buffer:
+                self._submit_part(bytes(self._buffer))
+            self._scheduler.wait()
+            self.bucket.complete_multipart_upload(
+                self.object_key, self.upload_id, self._parts
+            )
+        except BaseException:
+            self._abort()
+            raise
+
+    def abort(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._abort()
+
+    def _abort(self):
+        try:
+            self._scheduler.wait()
+        except Exception:
+            pass
+        if self.upload_id is not None:
+            try:
+                self.bucket.abort_multipart_upload(self.object_key, self.upload_id)
+            except oss2.exceptions.OssError as e:
+                logger.warning(
+                    "Failed to abort the multipart upload: key=%s %s",
+                    self.object_key,
+                    e,
+                )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class _ParallelGzipWriter(object):
+    """A writable file object that compresses the written data with gzip.
+
+    The data is split into chunks, which are compressed concurrently into gzip
+    members. A gzip file could be a concatenation of members (RFC 1952), which is
+    decompressed as a whole by `gzip.GzipFile` and the gzip command. Note that the
+    stream mode of tarfile ("r|gz") stops at the end of the first member, the
+    archive should be read in stream mode through `gzip.GzipFile` instead.
+    """
+
+    def __init__(
+        self,
+        fileobj,
+        compresslevel: int = 6,
+        chunk_size: int = 4 * 1024 * 1024,
+        max_workers: Optional[int] = None,
+    ):
+        max_workers = max_workers or min(os.cpu_count() or 1, 8)
+        self.fileobj = fileobj
+        self.compresslevel = compresslevel
+        self.chunk_size = chunk_size
+        self.closed = False
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._max_pending = max_workers * 2
+        self._pending = collections.deque()
+        self._buffer = bytearray()
+        self._members = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        while len(self._buffer) >= self.chunk_size:
+            self._submit(bytes(self._buffer[: self.chunk_size]))
+            del self._buffer[: self.chunk_size]
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def _submit(self, data: bytes):
+        self._pending.append(
+            self._executor.submit(
+                gzip.compress, data, compresslevel=self.compresslevel, mtime=0
+            )
+        )
+        self._members += 1
+        while len(self._pending) > self._max_pending:
+            self.fileobj.write(self._pending.popleft().result())
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self._buffer or not self._members:
+                self._submit(bytes(self._buffer))
+            while self._pending:
+                self.fileobj.write(self._pending.popleft().result())
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def abort(self):
+        """Discard the data that is not written, and release the worker threads."""
+        if self.closed:
+            return
+        self.closed = True
+        for future in self._pending:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+
+
+def _import_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            "zstd compression requires the zstandard package, install it with "
+            "'pip install zstandard'."
+        )
+    return zstandard
+
+
+# Suffix of the archive created by `upload(..., is_tar=True)` for the compression.
+_TAR_SUFFIXES = {
+    "gzip": ".tar.gz",
+    "parallel_gzip": ".tar.gz",
+    "zstd": ".tar.zst",
+}
+
+
+def _upload_tar_stream(
+    source_path: str,
+    bucket: oss2.Bucket,
+    object_key: str,
+    compression: str = "gzip",
+    max_workers: Optional[int] = None,
+):
+    """Archive and compress the source file/directory, and upload the compressed
+    stream to OSS without writing the archive to local disk.
+
+    The "gzip" archive is a single gzip stream compressed by tarfile. The
+    "parallel_gzip" archive consists of multiple gzip members compressed
+    concurrently, which could not be read by the stream mode of tarfile ("r|gz").
+    """
+    if compression not in _TAR_SUFFIXES:
+        raise ValueError(
+            "Unsupported compression: {}, supported compressions are {}.".format(
+                compression, list(_TAR_SUFFIXES.keys())
+            )
+        )
+    source_path = os.path.abspath(source_path)
+    arcname = "" if os.path.isdir(source_path) else os.path.basename(source_path)
+    with _MultipartUploadWriter(
+        bucket, object_key, desc=f"Uploading: {source_path}", max_workers=max_workers
+    ) as writer:
+        if compression == "gzip":
+            with tarfile.open(fileobj=writer, mode="w|gz") as tar:
+                tar.add(name=source_path, arcname=arcname)
+            return
+        if compression == "zstd":
+            compressed = (
+                _import_zstandard()
+                .ZstdCompressor(threads=-1)
+                .stream_writer(writer, closefd=False)
+            )
+        else:
+            compressed = _ParallelGzipWriter(writer)
+        try:
+            with tarfile.open(fileobj=compressed, mode="w|") as tar:
+                tar.add(name=source_path, arcname=arcname)
+            compressed.close()
+        except BaseException:
+            # Release the compression threads, the upload is aborted by the writer.
+            if isinstance(compressed, _ParallelGzipWriter):
+                compressed.abort()
+            raise
+
+
+# Objects larger than the threshold are downloaded with concurrent ranged GET
+# requests, smaller objects are downloaded with a single GET request.
+_RANGED_DOWNLOAD_THRESHOLD = oss2.defaults.multiget_threshold
+
+
+def _get_file(
+    scheduler: _TransferScheduler, bucket: oss2.Bucket, object_key: str, dest: str
+):
+    # Download into a temporary file, so that a failed download does not leave a
+    # truncated file at the destination.
+    tmp_path = dest + ".tmp"
+    try:
+        bucket.get_object_to_file(
+            object_key, tmp_path, progress_callback=scheduler.progress_callback()
+        )
+        os.replace(tmp_path, dest)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class _RangedDownload(object):
+    """Downloads an object with concurrent ranged GET requests by the tasks of the
+    scheduler.
+
+    The ranges are written into a temporary file, which is moved to the destination
+    by the task of the last range. The temporary file is removed if the transfers of
+    the scheduler fail, so that an interrupted download never leaves a file of the
+    full size at the destination.
+    """
+
+    def __init__(
+        self,
+        scheduler: _TransferScheduler,
+        bucket: oss2.Bucket,
+        object_key: str,
+        dest: str,
+        size: int,
+        etag: str,
+    ):
+        self.scheduler = scheduler
+        self.bucket = bucket
+        self.object_key = object_key
+        self.dest = dest
+        self.tmp_path = dest + ".tmp"
+        self.size = size
+        self.etag = etag
+        self._remaining = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        with open(self.tmp_path, "wb") as f:
+            f.truncate(self.size)
+        self.scheduler.add_cleanup(self._remove_tmp)
+        part_size = oss2.defaults.multiget_part_size
+        starts = list(range(0, self.size, part_size))
+        self._remaining = len(starts)
+        for start in starts:
+            self.scheduler.submit(
+                self._get_range, start, min(start + part_size, self.size) - 1
+            )
+
+    def _get_range(self, start: int, end: int):
+        # Pin the object version with `If-Match`, so that a concurrent overwrite of
+        # the object fails the download instead of producing a corrupted file.
+        result = self.bucket.get_object(
+            self.object_key,
+            byte_range=(start, end),
+            headers={"If-Match": self.etag},
+            progress_callback=self.scheduler.progress_callback(),
+        )
+        with open(self.tmp_path, "r+b") as f:
+            f.seek(start)
+            shutil.copyfileobj(result, f)
+        with self._lock:
+            self._remaining -= 1
+            completed = self._remaining == 0
+        if completed:
+            os.replace(self.tmp_path, self.dest)
+
+    def _remove_tmp(self):
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def _download_prefix(
+    bucket: oss2.Bucket,
+    prefix: str,
+    local_path: str,
+    max_workers: Optional[int] = None,
+):
+    """Download the objects under the prefix concurrently.
+
+    The transfers are started while the objects are still being listed, and the
+    sizes returned by the listing are used to plan the transfers.
+    """
+    scheduler = _TransferScheduler(
+        total=None, desc=f"Downloading: {prefix}", max_workers=max_workers
+    )
+    try:
+        for obj in oss2.ObjectIteratorV2(bucket=bucket, prefix=prefix):
+            if obj.key.endswith("/"):
+                continue
+            if scheduler.failed():
+                break
+            dest = os.path.join(local_path, os.path.relpath(obj.key, prefix))
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            scheduler.add_total(obj.size)
+            if obj.size < _RANGED_DOWNLOAD_THRESHOLD:
+                scheduler.submit(_get_file, scheduler, bucket, obj.key, dest)
+                continue
+            _RangedDownload(
+                scheduler, bucket, obj.key, dest, size=obj.size, etag=obj.etag
+            ).start()
+    finally:
+        scheduler.wait()
+
+
+class _RangePrefetchReader(io.RawIOBase):
+    """A readable file object of an OSS object.
+
+    Consecutive ranges of the object are fetched concurrently ahead of the reads, at
+    most `max_prefetch` ranges are buffered in memory (40 MiB with the default part
+    size, whatever the number of CPUs is).
+    """
+
+    def __init__(
+        self,
+        bucket: oss2.Bucket,
+        object_key: str,
+        size: int,
+        etag: str,
+        chunk_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        max_prefetch: int = 4,
+    ):
+        super(_RangePrefetchReader, self).__init__()
+        self.bucket = bucket
+        self.object_key = object_key
+        self.size = size
+        self.etag = etag
+        self.chunk_size = chunk_size or oss2.defaults.multiget_part_size
+        self.max_prefetch = max_prefetch
+        self._executor = ThreadPoolExecutor(
+            max_workers=min(max_workers or _default_max_workers(), max_prefetch)
+        )
+        self._pending = collections.deque()
+        self._offset = 0
+        self._current = memoryview(b"")
+        self._pbar = tqdm(
+            total=size, unit="B", unit_scale=True, desc=f"Downloading: {object_key}"
+        )
+
+    def readable(self):
+        return True
+
+    def _fetch(self, start: int, end: int) -> bytes:
+        # Pin the object version with `If-Match`, so that a concurrent overwrite of the
+        # object fails the read instead of mixing the content of two versions.
+        return self.bucket.get_object(
+            self.object_key, byte_range=(start, end), headers={"If-Match": self.etag}
+        ).read()
+
+    def _prefetch(self):
+        while len(self._pending) < self.max_prefetch and self._offset < self.size:
+            end = min(self._offset + self.chunk_size, self.size) - 1
+            self._pending.append(self._executor.submit(self._fetch, self._offset, end))
+            self._offset = end + 1
+
+    def readinto(self, b) -> int:
+        if not self._current:
+            self._prefetch()
+            if not self._pending:
+                return 0
+            self._current = memoryview(self._pending.popleft().result())
+            self._pbar.update(len(self._current))
+        n = min(len(b), len(self._current))
+        b[:n] = self._current[:n]
+        self._current = self._current[n:]
+        return n
+
+    def close(self):
+        if not self.closed:
+            for future in self._pending:
+                future.cancel()
+            self._executor.shutdown(wait=True)
+            self._pbar.close()
+        super(_RangePrefetchReader, self).close()
+
+
+def _check_tar_member(member: tarfile.TarInfo, dest: str):
+    """Check that the tar member is a regular file, directory or link which is
+    extracted inside the destination directory."""
+
+    def _check_inside(path: str):
+        if os.path.commonpath([dest, os.path.realpath(path)]) != dest:
+            raise ValueError(
+                "Tar member is extracted outside the destination directory: "
+                f"name={member.name} dest={dest}"
+            )
+
+    if not (member.isfile() or member.isdir() or member.issym() or member.islnk()):
+        raise ValueError(f"Unsupported type of the tar member: name={member.name}")
+    target = os.path.join(dest, member.name)
+    _check_inside(target)
+    if member.issym():
+        _check_inside(os.path.join(os.path.dirname(target), member.linkname))
+    elif member.islnk():
+        _check_inside(os.path.join(dest, member.linkname))
+
+
+def _extract_tar_stream(fileobj, local_path: str, compression: str = "gzip"):
+    """Extract the members of a compressed tar stream while it is being read.
+
+    The files and directories created by the extraction are removed if the
+    extraction fails, the existing files in the destination directory are kept.
+    """
+    if compression == "zstd":
+        fileobj = _import_zstandard().ZstdDecompressor().stream_reader(fileobj)
+    else:
+        # The stream mode of tarfile ("r|gz") stops at the end of the first gzip
+        # member, while the archive uploaded by `_ParallelGzipWriter` consists of
+        # multiple members.
+        fileobj = gzip.GzipFile(fileobj=fileobj, mode="rb")
+    created = []
+
+    def _record_created(path: str):
+        missing = []
+        while not os.path.lexists(path):
+            missing.append(path)
+            path = os.path.dirname(path)
+        created.extend(reversed(missing))
+
+    local_path = os.path.abspath(local_path)
+    _record_created(local_path)
+    try:
+        os.makedirs(local_path, exist_ok=True)
+        dest = os.path.realpath(local_path)
+        # The builtin extraction filter is available since Python 3.12 and in the
+        # security releases of the earlier versions.
+        extract_kwargs = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+        with tarfile.open(fileobj=fileobj, mode="r|") as tar:
+            for member in tar:
+                _check_tar_member(member, dest)
+                _record_created(os.path.normpath(os.path.join(dest, member.name)))
+                tar.extract(member, path=dest, **extract_kwargs)
+    except BaseException:
+        for path in reversed(created):
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.lexists(path):
+                os.remove(path)
+        raise
+
+
+def _download_and_extract(
+    bucket: oss2.Bucket,
+    object_key: str,
+    local_path: str,
+    max_workers: Optional[int] = None,
+):
+    """Download a compressed tar archive and extract it while it is downloaded."""
+    meta = bucket.get_object_meta(object_key)
+    with _RangePrefetchReader(
+        bucket,
+        object_key,
+        size=meta.content_length,
+        etag=meta.etag,
+        max_workers=max_workers,
+    ) as reader:
+        _extract_tar_stream(
+            reader,
+            local_path,
+            compression="zstd" if object_key.endswith(".tar.zst") else "gzip",
+        )
+
+
 def is_oss_uri(uri: Union[str, bytes]) -> bool:
     """Determines whether the given uri is an OSS uri.
 
@@ -247,24 +1022,6 @@ class OssUriObj(object):
         return is_dir, dir_path, file_name
 
 
-def _tar_file(source_file, target=None):
-    source_file = (
-        source_file if os.path.isabs(source_file) else os.path.abspath(source_file)
-    )
-    if not os.path.exists(source_file):
-        raise ValueError("source file not exists: %s", source_file)
-    if os.path.isdir(source_file):
-        arcname = ""
-    else:
-        arcname = os.path.basename(source_file)
-
-    if not target:
-        target = tempfile.mktemp()
-    with tarfile.open(target, "w:gz") as tar:
-        tar.add(name=source_file, arcname=arcname)
-    return target
-
-
 def _get_bucket_and_path(
     bucket: Optional[oss2.Bucket],
     oss_path: Union[str, OssUriObj],
@@ -296,9 +1053,14 @@ def upload(
     oss_path: Union[str, OssUriObj],
     bucket: Optional[oss2.Bucket] = None,
     is_tar: Optional[bool] = False,
+    max_workers: Optional[int] = None,
+    tar_compression: str = "gzip",
 ) -> str:
     """Upload local source file/directory to OSS.
 
+    The files in a directory are uploaded concurrently by a pool of workers, small
+    files are uploaded with a single request, and large files are uploaded in parts.
+
     Examples::
 
         # compress and upload local directory `./src/` to OSS
@@ -313,6 +1075,14 @@ def upload(
         bucket (oss2.Bucket): OSS bucket used to store the upload data. If it is not
             provided, OSS bucket of the default session will be used.
         is_tar (bool): Whether to compress the file before uploading (default: False).
+        max_workers (int, optional): The maximum number of concurrent requests used
+            to upload a directory (default: twice the number of CPUs).
+        tar_compression (str): The compression used if `is_tar` is True, "gzip",
+            "parallel_gzip" or "zstd" (default: "gzip"). The archive is streamed to
+            OSS without being written to local disk. "parallel_gzip" and "zstd"
+            compress the archive with multiple threads, "parallel_gzip" produces a
+            multi-member gzip file, which could not be read by the stream mode of
+            tarfile ("r|gz").
 
     Returns:
         str: A string in OSS URI format. If the source_path is directory, return the
@@ -327,20 +1097,20 @@ def upload(
         raise RuntimeError("Source path is not exist: {}".format(source_path))
 
     if is_tar:
-        # compress the local data and upload the compressed source data.
-        with tempfile.TemporaryDirectory() as dir_name:
-            temp_tar_path = _tar_file(
-                source_path, os.path.join(dir_name, "source.tar.gz")
-            )
-            dest_path = (
-                os.path.join(oss_path, os.path.basename(temp_tar_path))
-                if oss_path.endswith("/")
-                else oss_path
-            )
-            _upload_with_progress(
-                filename=temp_tar_path, object_key=dest_path, oss_bucket=bucket
-            )
-            return "oss://{}/{}".format(bucket.bucket_name, dest_path)
+        # compress the local data and upload the compressed stream.
+        dest_path = (
+            os.path.join(oss_path, "source" + _TAR_SUFFIXES.get(tar_compression, ""))
+            if oss_path.endswith("/")
+            else oss_path
+        )
+        _upload_tar_stream(
+            source_path,
+            bucket=bucket,
+            object_key=dest_path,
+            compression=tar_compression,
+            max_workers=max_workers,
+        )
+        return "oss://{}/{}".format(bucket.bucket_name, dest_path)
     elif not source_path_obj.is_dir():
         # if source path is a file, just invoke bucket.put_object.
 
@@ -364,14 +1134,20 @@ def upload(
         if not oss_path.endswith("/"):
             oss_path += "/"
 
-        files = [f for f in source_files if not os.path.isdir(f)]
-        for file_path in files:
-            file_path_obj = pathlib.Path(file_path)
-            file_relative_path = file_path_obj.relative_to(source_path_obj).as_posix()
-            object_key = oss_path + file_relative_path
-            _upload_with_progress(
-                filename=file_path, object_key=object_key, oss_bucket=bucket
+        files = [
+            (
+                f,
+                oss_path + pathlib.Path(f).relative_to(source_path_obj).as_posix(),
             )
+            for f in source_files
+            if not os.path.isdir(f)
+        ]
+        _upload_files(
+            files,
+            bucket=bucket,
+            desc=f"Uploading: {source_path}",
+            max_workers=max_workers,
+        )
         return "oss://{}/{}".format(bucket.bucket_name, oss_path)
 
 
@@ -380,9 +1156,14 @@ def download(
     local_path: str,
     bucket: Optional[oss2.Bucket] = None,
     un_tar=False,
+    max_workers: Optional[int] = None,
 ):
     """Download OSS objects to local path.
 
+    The objects under an OSS directory are downloaded concurrently by a pool of
+    workers while the directory is listed, and large objects are downloaded with
+    concurrent ranged requests.
+
     Args:
         oss_path (str): Source OSS path, could be a single OSS object or a OSS
             directory.
@@ -390,7 +1171,12 @@ def download(
         bucket (oss2.Bucket, optional): OSS bucket used to store the upload data. If it
             is not provided, OSS bucket of the default session will be used.
         un_tar (bool, optional): Whether to decompress the downloaded data. It is only
-            work for `oss_path` point to a single file that has a suffix "tar.gz".
+            work for `oss_path` point to a single file that has a suffix "tar.gz"
+            or "tar.zst". The archive is extracted while it is downloaded, and the
+            members that would be extracted outside `local_path` are rejected.
+        max_workers (int, optional): The maximum number of concurrent requests used
+            to download a directory or an archive (default: twice the number of
+            CPUs).
 
     Returns:
         str: A local file path for the downloaded data.
@@ -405,35 +1191,17 @@ def download(
         # Note: `un_tar` is not work while `oss_path` is a directory.
 
         oss_path += "/" if not oss_path.endswith("/") else ""
-        iterator = oss2.ObjectIteratorV2(
-            bucket=bucket,
-            prefix=oss_path,
+        _download_prefix(
+            bucket, prefix=oss_path, local_path=local_path, max_workers=max_workers
         )
-        keys = [obj.key for obj in iterator if not obj.key.endswith("/")]
-        for key in tqdm(keys, desc=f"Downloading: {oss_path}"):
-            rel_path = os.path.relpath(key, oss_path)
-            dest = os.path.join(local_path, rel_path)
-            os.makedirs(os.path.dirname(dest), exist_ok=True)
-            _download_with_progress(
-                dest,
-                object_key=key,
-                oss_bucket=bucket,
-            )
         return local_path
     else:
         # The `oss_path` represents a single file in OSS bucket.
-        if oss_path.endswith(".tar.gz") and un_tar:
-            # currently, only tar.gz format is supported for un_tar after downloading.
-            with tempfile.TemporaryDirectory() as temp_dir:
-                target_path = os.path.join(temp_dir, os.path.basename(oss_path))
-                _download_with_progress(
-                    target_path,
-                    object_key=oss_path,
-                    oss_bucket=bucket,
-                )
-                with tarfile.open(name=target_path, mode="r") as t:
-                    t.extractall(path=local_path)
-
+        if oss_path.endswith(tuple(_TAR_SUFFIXES.values())) and un_tar:
+            # the archive is extracted while it is downloaded.
+            _download_and_extract(
+                bucket, oss_path, local_path=local_path, max_workers=max_workers
+            )
             return local_path
         else:
             os.makedirs(local_path, exist_ok=True)
@@ -447,6 +1215,286 @@ def download(
             return dest
 
 
+# Name of the manifest object stored with the data uploaded by `sync`.
+_SYNC_MANIFEST_NAME = ".pai_manifest.json"
+
+# Maximum size of an object that could be copied with a single CopyObject request.
+_COPY_OBJECT_LIMIT = 1024**3
+
+
+# Files modified within the given seconds before they are hashed are not cached.
+_RACY_MTIME_WINDOW = 2
+
+
+class _FileHashCache(object):
+    """Caches the SHA-256 digests of local files, the cached digest of a file is
+    reused as long as its size and modification time are unchanged.
+
+    A file modified shortly before it is hashed is not cached ("racy" mtime), since
+    an edit made within the granularity of the modification time after it is hashed
+    would keep the same size and modification time.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._entries = {}
+        self._lock = threading.Lock()
+        if path and os.path.isfile(path):
+            try:
+                with open(path, "r") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Failed to load the file hash cache: %s %s", path, e)
+
+    @classmethod
+    def _hash_file(cls, filename: str) -> str:
+        h = hashlib.sha256()
+        with open(filename, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def digest(self, filename: str) -> str:
+        filename = os.path.abspath(filename)
+        stat = os.stat(filename)
+        with self._lock:
+            entry = self._entries.get(filename)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+        hashed_at = time.time_ns()
+        digest = self._hash_file(filename)
+        with self._lock:
+            if hashed_at - stat.st_mtime_ns >= _RACY_MTIME_WINDOW * 10**9:
+                self._entries[filename] = [stat.st_size, stat.st_mtime_ns, digest]
+            else:
+                self._entries.pop(filename, None)
+        return digest
+
+    def save(self):
+        """Persist the cache, the entries of the removed files are dropped."""
+        if not self.path:
+            return
+        with self._lock:
+            entries = {k: v for k, v in self._entries.items() if os.path.isfile(k)}
+        cache_dir = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp_file = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(entries, f)
+            os.replace(tmp_file, self.path)
+        except OSError as e:
+            logger.warning("Failed to save the file hash cache: %s %s", self.path, e)
+
+
+def _copy_or_upload(
+    scheduler: _TransferScheduler,
+    bucket: oss2.Bucket,
+    source_key: str,
+    filename: str,
+    object_key: str,
+    size: int,
+):
+    """Copy an unchanged file from a previous upload on the server side, the file
+    is uploaded if the previous object no longer exists."""
+    try:
+        bucket.copy_object(bucket.bucket_name, source_key, object_key)
+    except oss2.exceptions.NoSuchKey:
+        _submit_upload(scheduler, bucket, filename, object_key, size)
+    else:
+        scheduler.update(size)
+
+
+def _read_object(bucket: oss2.Bucket, object_key: str) -> Optional[bytes]:
+    try:
+        return bucket.get_object(object_key).read()
+    except oss2.exceptions.NoSuchKey:
+        return None
+
+
+def sync(
+    source_path: str,
+    oss_path: Union[str, OssUriObj],
+    bucket: Optional[oss2.Bucket] = None,
+    max_workers: Optional[int] = None,
+    hash_cache_path: Optional[str] = FILE_HASH_CACHE_PATH,
+) -> str:
+    """Upload local source file/directory to a content-addressed path in OSS.
+
+    The data is uploaded to "{oss_path}{tree_hash}/", where tree_hash is the
+    SHA-256 digest of the file paths and file contents. If the same content has
+    been uploaded before, the existing path is reused and nothing is uploaded. Else,
+    the files that are unchanged since the previous sync of the source path are
+    copied on the server side, and only the new or changed files are uploaded.
+
+    A manifest of the uploaded files is stored with the data, and the digests of
+    the local files are cached by their size and modification time, so that files
+    are not hashed again if they are not modified.
+
+    Examples::
+
+        # the second sync reuses the data uploaded by the first one.
+        uri = sync("./src/", "pai/training_src/sha256/")
+        assert sync("./src/", "pai/training_src/sha256/") == uri
+
+    Args:
+        source_path (str): Source file local path which needs to be uploaded, can be
+            a single file or a directory.
+        oss_path (Union[str, OssUriObj]): Base OSS path of the content-addressed
+            data.
+        bucket (oss2.Bucket, optional): OSS bucket used to store the upload data. If
+            it is not provided, OSS bucket of the default session will be used.
+        max_workers (int, optional): The maximum number of concurrent requests used
+            to upload the data (default: twice the number of CPUs).
+        hash_cache_path (str, optional): Path of the local file hash cache, the
+            digests are not cached if it is None.
+
+    Returns:
+        str: A string in OSS URI format. If the source_path is directory, return the
+            OSS URI representing the directory for uploaded data, else then
+            returns the OSS URI points to the uploaded file.
+    """
+    bucket, oss_path = _get_bucket_and_path(bucket, oss_path)
+    if not oss_path.endswith("/"):
+        oss_path += "/"
+    source_path_obj = pathlib.Path(source_path)
+    if not source_path_obj.exists():
+        raise RuntimeError("Source path is not exist: {}".format(source_path))
+
+    if source_path_obj.is_dir():
+        files = [
+            (f, pathlib.Path(f).relative_to(source_path_obj).as_posix())
+            for f in glob.glob(pathname=str(source_path_obj / "**"), recursive=True)
+            if not os.path.isdir(f)
+        ]
+    else:
+        files = [(source_path, source_path_obj.name)]
+
+    hash_cache = _FileHashCache(hash_cache_path)
+    with ThreadPoolExecutor(max_workers=max_workers or _default_max_workers()) as e:
+        digests = list(e.map(hash_cache.digest, [f for f, _ in files]))
+    hash_cache.save()
+    manifest = {
+        rel_path: {"sha256": digest, "size": os.path.getsize(filename)}
+        for (filename, rel_path), digest in zip(files, digests)
+    }
+    tree_hash = hashlib.sha256(
+        json.dumps(manifest, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+    dest = oss_path + tree_hash + "/"
+    uri = "oss://{}/{}".format(
+        bucket.bucket_name,
+        dest if source_path_obj.is_dir() else dest + source_path_obj.name,
+    )
+    if bucket.object_exists(dest + _SYNC_MANIFEST_NAME):
+        logger.info("Reuse the uploaded data of the source path: %s", uri)
+        return uri
+
+    # The pointer to the latest sync of the source path, used to find the files that
+    # are unchanged and could be copied on the server side.
+    latest_key = "{}.latest-{}".format(
+        oss_path,
+        hashlib.sha256(os.path.abspath(source_path).encode("utf-8")).hexdigest()[:16],
+    )
+    previous = {}
+    latest = _read_object(bucket, latest_key)
+    previous_manifest = latest and _read_object(
+        bucket, oss_path + latest.decode("utf-8") + "/" + _SYNC_MANIFEST_NAME
+    )
+    if previous_manifest:
+        previous = {
+            v["sha256"]: oss_path + latest.decode("utf-8") + "/" + k
+            for k, v in json.loads(previous_manifest).items()
+        }
+
+    scheduler = _TransferScheduler(
+        total=sum(v["size"] for v in manifest.values()),
+        desc=f"Uploading: {source_path}",
+        max_workers=max_workers,
+    )
+    try:
+        for filename, rel_path in files:
+            entry = manifest[rel_path]
+            source_key = previous.get(entry["sha256"])
+            if source_key and entry["size"] < _COPY_OBJECT_LIMIT:
+                scheduler.submit(
+                    _copy_or_upload,
+                    scheduler,
+                    bucket,
+                    source_key,
+                    filename,
+                    dest + rel_path,
+                    entry["size"],
+                )
+            else:
+                _submit_upload(
+                    scheduler, bucket, filename, dest + rel_path, entry["size"]
+                )
+    finally:
+        scheduler.wait()
+
+    # The manifest is uploaded at last, which marks the content-addressed path as
+    # complete.
+    bucket.put_object(dest + _SYNC_MANIFEST_NAME, json.dumps(manifest))
+    bucket.put_object(latest_key, tree_hash)
+    return uri
+
+
+def put_object(
+    data: Union[bytes, str, IO],
+    oss_path: Union[str, OssUriObj],
+    bucket: Optional[oss2.Bucket] = None,
+) -> str:
+    """Upload in-memory data or a file-like object to OSS as a single object.
+
+    Args:
+        data (Union[bytes, str, IO]): Data to be uploaded.
+        oss_path (Union[str, OssUriObj]): Destination OSS path.
+        bucket (oss2.Bucket, optional): OSS bucket used to store the data. If it is
+            not provided, OSS bucket of the default session will be used.
+
+    Returns:
+        str: The OSS URI of the uploaded object.
+    """
+    bucket, oss_path = _get_bucket_and_path(bucket, oss_path)
+    bucket.put_object(oss_path, data)
+    return "oss://{}/{}".format(bucket.bucket_name, oss_path)
+
+
+def get_object(
+    oss_path: Union[str, OssUriObj],
+    bucket: Optional[oss2.Bucket] = None,
+):
+    """Open an OSS object for streaming read.
+
+    Args:
+        oss_path (Union[str, OssUriObj]): OSS path of the object.
+        bucket (oss2.Bucket, optional): OSS bucket that stores the object. If it is
+            not provided, OSS bucket of the default session will be used.
+
+    Returns:
+        oss2.models.GetObjectResult: A file-like object of the object content.
+    """
+    bucket, oss_path = _get_bucket_and_path(bucket, oss_path)
+    return bucket.get_object(oss_path)
+
+
+def delete_object(
+    oss_path: Union[str, OssUriObj],
+    bucket: Optional[oss2.Bucket] = None,
+):
+    """Delete an OSS object.
+
+    Args:
+        oss_path (Union[str, OssUriObj]): OSS path of the object.
+        bucket (oss2.Bucket, optional): OSS bucket that stores the object. If it is
+            not provided, OSS bucket of the default session will be used.
+    """
+    bucket, oss_path = _get_bucket_and_path(bucket, oss_path)
+    bucket.delete_object(oss_path)
+
+
 class CredentialProviderWrapper(CredentialsProvider):
     """A wrapper class for the credential provider of OSS."""
 
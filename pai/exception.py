@@ -34,6 +34,14 @@ class PredictionException(PAIException):
         return "{}: code={}, {}".format(type(self).__name__, self.code, self.message)
 
 
+class ConcurrencyLimitExceededException(PredictionException):
+    """Raised if a prediction request is shed by the client-side concurrency
+    limiter."""
+
+    def __init__(self, message):
+        super(ConcurrencyLimitExceededException, self).__init__(429, message)
+
+
 class UnexpectedStatusException(PAIException):
     """Raised when resource status is not expected."""
 
@@ -27,7 +27,7 @@ from Tea.exceptions import TeaException
 from ..api.base import PaginatedResult
 from ..common.consts import StoragePathCategory
 from ..common.logging import get_logger
-from ..common.oss_utils import OssUriObj, is_oss_uri, upload
+from ..common.oss_utils import OssUriObj, is_oss_uri, sync, upload
 from ..common.utils import (
     is_dataset_id,
     is_filesystem_uri,
@@ -852,10 +852,12 @@ class _TrainingJobSubmitter(object):
             )
         elif isinstance(item, str):
             if os.path.exists(item):
+                # Local input data is uploaded to a content-addressed path, which is
+                # reused if the data is not changed.
                 store_path = Session.get_storage_path_by_category(
-                    StoragePathCategory.InputData
+                    StoragePathCategory.InputData, "sha256"
                 )
-                input_ = UriInput(name=name, input_uri=upload(item, store_path))
+                input_ = UriInput(name=name, input_uri=sync(item, store_path))
             else:
                 raise ValueError("Invalid input data path, file not found: {item}.")
         else:
@@ -907,15 +909,22 @@ class _TrainingJobSubmitter(object):
             code_uri = source_dir
         elif not os.path.exists(source_dir):
             raise ValueError(f"Source directory {source_dir} does not exist.")
-        else:
-            code_dest = code_dest or self.session.get_storage_path_by_category(
-                StoragePathCategory.TrainingSrc, to_plain_text(job_name)
-            )
+        elif code_dest:
             code_uri = upload(
                 source_path=source_dir,
                 oss_path=code_dest,
                 bucket=self.session.oss_bucket,
             )
+        else:
+            # Source files are uploaded to a content-addressed path, unchanged source
+            # files are not uploaded again.
+            code_uri = sync(
+                source_path=source_dir,
+                oss_path=self.session.get_storage_path_by_category(
+                    StoragePathCategory.TrainingSrc, "sha256"
+                ),
+                bucket=self.session.oss_bucket,
+            )
         oss_uri_obj = OssUriObj(uri=self.session.patch_oss_endpoint(code_uri))
         code_dir = CodeDir(
             location_type="oss",
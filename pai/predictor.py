@@ -14,29 +14,66 @@
 
 import asyncio
 import base64
+import collections
+import copy
 import functools
+import gzip
 import json
+import math
+import os
 import posixpath
+import queue
+import random
+import threading
 import time
+import uuid
+import weakref
 from abc import ABC, abstractmethod
-from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from io import IOBase
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
-from urllib.parse import urlencode
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+from urllib.parse import urlencode, urlsplit
 
 import aiohttp
+import numpy as np
+import oss2
 import requests
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 
 from .common.consts import FrameworkTypes
 from .common.docker_utils import ContainerRun
 from .common.logging import get_logger
+from .common.oss_utils import (
+    OssUriObj,
+    delete_object,
+    get_object,
+    is_oss_uri,
+    put_object,
+)
 from .common.utils import http_user_agent, is_package_available
-from .exception import PredictionException
+from .exception import ConcurrencyLimitExceededException, PredictionException
 from .serializers import (
+    ArrowSerializer,
     JsonSerializer,
     PyTorchSerializer,
     SerializerBase,
     TensorFlowSerializer,
+    _is_numpy_ndarray,
+    _is_pandas_dataframe,
 )
 from .session import Session, get_default_session
 
@@ -54,6 +91,13 @@ _PAI_SERVICE_CONSOLE_URI_PATTERN = (
 _QUEUE_SERVICE_REQUEST_ID_HEADER = "X-Eas-Queueservice-Request-Id"
 _QUEUE_SERVICE_SINK_PATH = "sink"
 _DEFAULT_ASYNC_WORKER_COUNT = 30
+# Number of the completed requests required to estimate the completion time of the
+# async prediction requests.
+_MIN_COMPLETION_TIME_SAMPLES = 5
+# Key of the JSON document that references a payload offloaded to OSS.
+_PAYLOAD_URI_KEY = "payload_uri"
+# Response status codes indicate that the service is overloaded.
+_OVERLOAD_STATUS_CODES = (429, 503)
 
 
 class ServiceStatus(object):
@@ -83,13 +127,1336 @@ class EndpointType(object):
     # VPC Endpoint
     INTRANET = "INTRANET"
 
+    # Send requests directly to the service instances from the VPC, bypassing the
+    # EAS gateway.
+    DIRECT = "DIRECT"
+
 
 class ServiceType(object):
     Standard = "Standard"
     Async = "Async"
 
 
+class ConnectionConfig(object):
+    """ConnectionConfig is used to configure the HTTP connection pools that the
+    predictor uses to send requests."""
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 30,
+        use_dns_cache: bool = True,
+        ttl_dns_cache: Optional[int] = 300,
+    ):
+        """ConnectionConfig initializer.
+
+        Args:
+            limit (int): The total number of simultaneous connections in the pool,
+                0 means no limit (Default 100).
+            limit_per_host (int): The number of simultaneous connections to the same
+                endpoint, 0 means no limit (Default 0).
+            keepalive_timeout (float): Seconds an idle connection is kept alive for
+                re-use (Default 30).
+            use_dns_cache (bool): Whether to cache the DNS lookup results
+                (Default True).
+            ttl_dns_cache (int, optional): Seconds the DNS lookup results are cached,
+                None means cached forever (Default 300).
+        """
+        if limit < 0 or limit_per_host < 0:
+            raise ValueError("limit and limit_per_host must be non-negative integer.")
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.use_dns_cache = use_dns_cache
+        self.ttl_dns_cache = ttl_dns_cache
+
+    def build_connector(self) -> aiohttp.TCPConnector:
+        """Build an aiohttp connector using the config, it should be called within a
+        running event loop."""
+        return aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=self.use_dns_cache,
+            ttl_dns_cache=self.ttl_dns_cache,
+        )
+
+    @property
+    def pool_size(self) -> int:
+        """The size of the connection pool of the sync prediction calls, which is
+        `limit_per_host` or `limit` if it is not limited per host."""
+        return self.limit_per_host or self.limit or DEFAULT_POOLSIZE
+
+    def build_http_adapter(self) -> HTTPAdapter:
+        """Build a requests HTTP adapter using the config."""
+        return HTTPAdapter(pool_maxsize=self.pool_size)
+
+
+class CompressionConfig(object):
+    """CompressionConfig is used to compress the bodies of the prediction requests,
+    and to accept compressed prediction responses.
+
+    Request bodies (after serialization) larger than `threshold` are compressed and
+    sent with the `Content-Encoding` header, unless compression does not reduce
+    their size. Compressed responses are decoded by the HTTP client, the predictor
+    advertises the encodings supported by the client in the `Accept-Encoding` header.
+    It is useful for large payloads sent over the bandwidth-bound INTERNET endpoint.
+
+    Examples::
+
+        predictor = Predictor(
+            "example_service",
+            compression_config=CompressionConfig("zstd", threshold=4096),
+        )
+        ...
+        print(predictor.compression_stats)
+
+    """
+
+    GZIP = "gzip"
+    ZSTD = "zstd"
+
+    def __init__(
+        self,
+        algorithm: str = GZIP,
+        threshold: int = 1024,
+        level: Optional[int] = None,
+        accept_compressed_response: bool = True,
+    ):
+        """CompressionConfig initializer.
+
+        Args:
+            algorithm (str): Algorithm used to compress the request bodies, could be
+                "gzip" or "zstd", the latter requires the zstandard package
+                (Default "gzip").
+            threshold (int): Request bodies larger than the given bytes are
+                compressed (Default 1024).
+            level (int, optional): Compression level, default to 6 for gzip and 3
+                for zstd.
+            accept_compressed_response (bool): Whether to advertise the encodings
+                supported by the HTTP client in the `Accept-Encoding` header
+                (Default True).
+        """
+        if algorithm not in (self.GZIP, self.ZSTD):
+            raise ValueError(f"Not supported compression algorithm: {algorithm}")
+        if threshold < 0:
+            raise ValueError("threshold must be non-negative integer.")
+        if algorithm == self.ZSTD:
+            try:
+                import zstandard
+            except ImportError:
+                raise ImportError(
+                    "zstd compression requires zstandard, please install it with"
+                    " `pip install zstandard`."
+                )
+            self._zstd = zstandard
+            # ZstdCompressor is not thread-safe, each thread uses its own instance.
+            self._local = threading.local()
+        self.algorithm = algorithm
+        self.threshold = threshold
+        self.level = level
+        self.accept_compressed_response = accept_compressed_response
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress the data using the configured algorithm."""
+        if self.algorithm == self.GZIP:
+            return gzip.compress(
+                data, compresslevel=6 if self.level is None else self.level
+            )
+        compressor = getattr(self._local, "compressor", None)
+        if not compressor:
+            compressor = self._local.compressor = self._zstd.ZstdCompressor(
+                level=3 if self.level is None else self.level
+            )
+        return compressor.compress(data)
+
+
+@functools.lru_cache()
+def _accept_encoding(async_client: bool) -> str:
+    """Returns the content encodings that the HTTP client is able to decode."""
+    if async_client:
+        from aiohttp import compression_utils as module
+    else:
+        from urllib3 import response as module
+    # zstd decoding depends on the version of the HTTP client and the installed
+    # packages.
+    return "zstd, gzip" if getattr(module, "HAS_ZSTD", False) else "gzip"
+
+
+class RetryConfig(object):
+    """RetryConfig is used to configure the retry and hedging policy of the requests
+    sent by the predictor.
+
+    Failed requests (connection errors, timeouts or retryable status codes) are
+    retried with jittered exponential backoff. If hedging is enabled, a duplicate
+    request is sent when the original request has not completed after a delay
+    (a percentile of the recently observed latencies), and the first successful
+    response is used.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_base: float = 0.1,
+        backoff_max: float = 2,
+        retry_status_codes: Tuple[int, ...] = (500, 502, 503, 504),
+        retry_methods: Optional[List[str]] = None,
+        hedging: bool = False,
+        hedging_percentile: float = 95,
+        hedging_min_delay: float = 0.01,
+        hedging_min_samples: int = 20,
+    ):
+        """RetryConfig initializer.
+
+        Args:
+            max_attempts (int): The maximum number of attempts for a request,
+                including the first attempt (Default 3).
+            backoff_base (float): Base of the exponential backoff in seconds, the
+                n-th retry waits a random time between 0 and
+                `min(backoff_max, backoff_base * 2 ** (n - 1))` (Default 0.1).
+            backoff_max (float): The maximum backoff in seconds (Default 2).
+            retry_status_codes (Tuple[int]): Response status codes that are retried
+                (Default 500, 502, 503, 504).
+            retry_methods (List[str], optional): HTTP methods of the requests that
+                could be retried. If not provided, prediction requests of the online
+                services are assumed to be idempotent and retried, while requests
+                enqueued to the asynchronous services are neither retried nor
+                hedged, since each of them creates a new task. Listing the method
+                explicitly enables retrying the enqueued requests.
+            hedging (bool): Whether to send a hedged request if the original request
+                is slow (Default False).
+            hedging_percentile (float): The percentile of the recent latencies used as
+                the delay before a hedged request is sent (Default 95).
+            hedging_min_delay (float): The minimum delay in seconds before a hedged
+                request is sent (Default 0.01).
+            hedging_min_samples (int): Hedged requests are sent only after the given
+                number of latency samples are observed (Default 20).
+        """
+        if max_attempts <= 0:
+            raise ValueError("max_attempts must be positive integer.")
+        if not 0 < hedging_percentile <= 100:
+            raise ValueError("hedging_percentile must be in range (0, 100].")
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_status_codes = tuple(retry_status_codes)
+        self.retry_methods = (
+            [m.upper() for m in retry_methods] if retry_methods is not None else None
+        )
+        self.hedging = hedging
+        self.hedging_percentile = hedging_percentile
+        self.hedging_min_delay = hedging_min_delay
+        self.hedging_min_samples = hedging_min_samples
+
+    def is_retryable(
+        self, method: str, data: Any = None, idempotent: bool = True
+    ) -> bool:
+        # Request body of a file-like object could not be re-sent.
+        if isinstance(data, IOBase):
+            return False
+        if self.retry_methods is None:
+            return idempotent
+        return method.upper() in self.retry_methods
+
+    def backoff(self, attempt: int) -> float:
+        """Returns the backoff in seconds before the given retry attempt."""
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        )
+
+
+class _LatencyWindow(object):
+    """Rolling window of the recent request latencies."""
+
+    def __init__(self, size: int = 1000, refresh_interval: int = 50):
+        self._samples = collections.deque(maxlen=size)
+        self._refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._sorted = []
+        self._pending = 0
+
+    def __len__(self):
+        return len(self._samples)
+
+    def record(self, latency: float):
+        with self._lock:
+            self._samples.append(latency)
+            self._pending += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            # Sort the samples lazily, only after enough new samples are recorded.
+            if self._pending >= self._refresh_interval or (
+                self._pending and len(self._sorted) < self._refresh_interval
+            ):
+                self._sorted = sorted(self._samples)
+                self._pending = 0
+            if not self._sorted:
+                return
+            idx = min(len(self._sorted) - 1, int(len(self._sorted) * p / 100))
+            return self._sorted[idx]
+
+
+class LoadBalancerConfig(object):
+    """LoadBalancerConfig is used to configure the client-side load balancing of the
+    predictor using the `DIRECT` endpoint type.
+
+    The predictor keeps a table of the running instances of the service, which is
+    refreshed periodically, and sends each request directly to an instance picked by
+    the load balancing policy. Instances that fail consecutively are ejected from the
+    table for a while.
+    """
+
+    POWER_OF_TWO_CHOICES = "power_of_two_choices"
+    LEAST_OUTSTANDING_REQUESTS = "least_outstanding_requests"
+
+    def __init__(
+        self,
+        policy: str = POWER_OF_TWO_CHOICES,
+        refresh_interval: float = 30,
+        max_failures: int = 3,
+        ejection_time: float = 30,
+    ):
+        """LoadBalancerConfig initializer.
+
+        Args:
+            policy (str): The load balancing policy, `power_of_two_choices` picks the
+                instance with fewer outstanding requests from two random instances,
+                `least_outstanding_requests` picks the instance with the fewest
+                outstanding requests (Default `power_of_two_choices`).
+            refresh_interval (float): Seconds between the refreshes of the instance
+                table (Default 30).
+            max_failures (int): Number of consecutive failures (connection errors or
+                5xx responses) before an instance is ejected (Default 3).
+            ejection_time (float): Seconds an ejected instance is excluded from the
+                load balancing (Default 30).
+        """
+        if policy not in (
+            self.POWER_OF_TWO_CHOICES,
+            self.LEAST_OUTSTANDING_REQUESTS,
+        ):
+            raise ValueError(f"Unsupported load balancing policy: {policy}")
+        if max_failures <= 0:
+            raise ValueError("max_failures must be positive integer.")
+        self.policy = policy
+        self.refresh_interval = refresh_interval
+        self.max_failures = max_failures
+        self.ejection_time = ejection_time
+
+
+def _instance_address(instance: Dict[str, Any]) -> str:
+    # TenantInstanceIP is the IP of the instance in the user VPC, if VPC direct
+    # connection is enabled for the service.
+    ip = instance.get("TenantInstanceIP") or instance["InnerIP"]
+    return "{}:{}".format(ip, instance["InstancePort"])
+
+
+class _InstanceBalancer(object):
+    """Client-side load balancer over the running instances of a service."""
+
+    def __init__(
+        self,
+        list_instances: Callable[[], List[Dict[str, Any]]],
+        config: LoadBalancerConfig,
+    ):
+        self.config = config
+        self._list_instances = list_instances
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._addresses: List[str] = []
+        self._outstanding: Dict[str, int] = {}
+        self._failures: Dict[str, int] = {}
+        self._ejected_until: Dict[str, float] = {}
+        self._refreshed_at = None
+
+    @property
+    def addresses(self) -> List[str]:
+        """Addresses of the instances in the table."""
+        return list(self._addresses)
+
+    def needs_refresh(self) -> bool:
+        return (
+            self._refreshed_at is None
+            or time.monotonic() - self._refreshed_at >= self.config.refresh_interval
+        )
+
+    def refresh(self):
+        """Refresh the instance table.
+
+        Only one caller refreshes the table at a time, the others keep using the
+        current table unless it is empty.
+        """
+        if not self._refresh_lock.acquire(blocking=not self._addresses):
+            return
+        try:
+            if not self.needs_refresh():
+                return
+            try:
+                addresses = [
+                    _instance_address(instance)
+                    for instance in self._list_instances()
+                    if instance.get("Status") == "Running"
+                ]
+            except Exception as e:
+                if not self._addresses:
+                    raise
+                logger.warning("Failed to refresh the service instances: %s", e)
+                addresses = self._addresses
+            with self._lock:
+                self._addresses = addresses
+                for table in (self._failures, self._ejected_until):
+                    for address in [a for a in table if a not in addresses]:
+                        table.pop(address)
+                self._refreshed_at = time.monotonic()
+        finally:
+            self._refresh_lock.release()
+
+    def acquire(self) -> str:
+        """Pick an instance for a request, the returned address should be released
+        by `release` after the request completes."""
+        if self.needs_refresh():
+            self.refresh()
+        with self._lock:
+            now = time.monotonic()
+            # Fallback to all the instances if all of them are ejected.
+            candidates = [
+                a for a in self._addresses if self._ejected_until.get(a, 0) <= now
+            ] or self._addresses
+            if not candidates:
+                raise RuntimeError("No running instance is available for the service.")
+            if len(candidates) == 1:
+                address = candidates[0]
+            elif self.config.policy == LoadBalancerConfig.LEAST_OUTSTANDING_REQUESTS:
+                least = min(self._outstanding.get(a, 0) for a in candidates)
+                address = random.choice(
+                    [a for a in candidates if self._outstanding.get(a, 0) == least]
+                )
+            else:
+                a, b = random.sample(candidates, 2)
+                address = (
+                    a
+                    if self._outstanding.get(a, 0) <= self._outstanding.get(b, 0)
+                    else b
+                )
+            self._outstanding[address] = self._outstanding.get(address, 0) + 1
+            return address
+
+    def release(self, address: str, success: bool):
+        """Release the instance picked by `acquire`, the instance is ejected after
+        consecutive failures."""
+        with self._lock:
+            outstanding = self._outstanding.pop(address, 0) - 1
+            if outstanding > 0:
+                self._outstanding[address] = outstanding
+            if success:
+                self._failures.pop(address, None)
+                return
+            failures = self._failures.get(address, 0) + 1
+            if failures < self.config.max_failures:
+                self._failures[address] = failures
+                return
+            self._failures.pop(address, None)
+            self._ejected_until[address] = time.monotonic() + self.config.ejection_time
+        logger.warning(
+            "Eject the service instance after %s consecutive failures: %s",
+            failures,
+            address,
+        )
+
+
+class ConcurrencyLimit(ABC):
+    """Base class of the algorithms that estimate the concurrency limit of a service
+    from the latencies and the overload responses of the completed requests.
+
+    The methods are called by the `ConcurrencyLimiter` with its lock held, the
+    implementations are not required to be thread-safe.
+    """
+
+    @property
+    @abstractmethod
+    def limit(self) -> int:
+        """The current concurrency limit."""
+
+    @abstractmethod
+    def update(self, latency: float, inflight: int, dropped: bool):
+        """Update the limit with the sample of a completed request.
+
+        Args:
+            latency (float): Seconds the request took.
+            inflight (int): Number of in-flight requests, including the completed
+                one.
+            dropped (bool): Whether the request is rejected by the overloaded
+                service, such as a 429/503 response, a connection error or a
+                timeout.
+        """
+
+
+class AIMDLimit(ConcurrencyLimit):
+    """Additive-increase/multiplicative-decrease concurrency limit.
+
+    The limit grows by one for each successful request while the limit is
+    utilized, and is multiplied by `backoff_ratio` if a request is dropped or
+    takes longer than `timeout`.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        backoff_ratio: float = 0.9,
+        timeout: Optional[float] = None,
+    ):
+        """AIMDLimit initializer.
+
+        Args:
+            initial_limit (int): The initial concurrency limit (Default 20).
+            min_limit (int): The minimum concurrency limit (Default 1).
+            max_limit (int): The maximum concurrency limit (Default 200).
+            backoff_ratio (float): Ratio the limit is multiplied by when a request
+                is dropped, in range [0.5, 1) (Default 0.9).
+            timeout (float, optional): Requests taking longer than the given seconds
+                are treated as dropped.
+        """
+        if not 0 < min_limit <= initial_limit <= max_limit:
+            raise ValueError("Requires 0 < min_limit <= initial_limit <= max_limit.")
+        if not 0.5 <= backoff_ratio < 1:
+            raise ValueError("backoff_ratio must be in range [0.5, 1).")
+        self._limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.timeout = timeout
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def update(self, latency: float, inflight: int, dropped: bool):
+        if dropped or (self.timeout is not None and latency > self.timeout):
+            self._limit = max(self.min_limit, int(self._limit * self.backoff_ratio))
+        elif inflight * 2 >= self._limit:
+            # Only grow the limit if the client is limited by it.
+            self._limit = min(self.max_limit, self._limit + 1)
+
+
+class GradientLimit(ConcurrencyLimit):
+    """Latency gradient based concurrency limit.
+
+    The limit is scaled by the gradient between the long-term and the short-term
+    average latencies: it shrinks when the latency rises above the baseline, as
+    requests start queueing in the service, and grows by a headroom of
+    `sqrt(limit)` when the latency is close to the baseline.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        smoothing: float = 0.2,
+        tolerance: float = 1.5,
+        short_window: int = 10,
+        long_window: int = 600,
+    ):
+        """GradientLimit initializer.
+
+        Args:
+            initial_limit (int): The initial concurrency limit (Default 20).
+            min_limit (int): The minimum concurrency limit (Default 1).
+            max_limit (int): The maximum concurrency limit (Default 200).
+            smoothing (float): Weight of the new limit estimate, in range (0, 1]
+                (Default 0.2).
+            tolerance (float): Ratio of the short-term latency to the long-term
+                latency tolerated before the limit shrinks (Default 1.5).
+            short_window (int): Number of samples of the short-term latency
+                average (Default 10).
+            long_window (int): Number of samples of the long-term latency average
+                (Default 600).
+        """
+        if not 0 < min_limit <= initial_limit <= max_limit:
+            raise ValueError("Requires 0 < min_limit <= initial_limit <= max_limit.")
+        if not 0 < smoothing <= 1:
+            raise ValueError("smoothing must be in range (0, 1].")
+        if tolerance < 1:
+            raise ValueError("tolerance must not be less than 1.")
+        self._limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.smoothing = smoothing
+        self.tolerance = tolerance
+        self._short_alpha = 2 / (short_window + 1)
+        self._long_alpha = 2 / (long_window + 1)
+        self._short_latency = None
+        self._long_latency = None
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def update(self, latency: float, inflight: int, dropped: bool):
+        if dropped:
+            gradient = 0.5
+        else:
+            if self._short_latency is None:
+                self._short_latency = self._long_latency = latency
+            self._short_latency += self._short_alpha * (latency - self._short_latency)
+            self._long_latency += self._long_alpha * (latency - self._long_latency)
+            if inflight * 2 < self._limit:
+                # Only grow the limit if the client is limited by it.
+                return
+            gradient = max(
+                0.5,
+                min(
+                    1.0,
+                    self.tolerance
+                    * self._long_latency
+                    / max(self._short_latency, 1e-9),
+                ),
+            )
+        new_limit = self._limit * gradient + math.sqrt(self._limit)
+        self._limit = min(
+            self.max_limit,
+            max(
+                self.min_limit,
+                (1 - self.smoothing) * self._limit + self.smoothing * new_limit,
+            ),
+        )
+
+
+class _LimiterWaiter(object):
+    """A call waiting for a slot of the ConcurrencyLimiter, from a thread or an
+    event loop."""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.granted = False
+        self.event = threading.Event() if loop is None else loop.create_future()
+
+    def grant(self):
+        self.granted = True
+        if self.loop is None:
+            self.event.set()
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._set_result)
+
+    def _set_result(self):
+        if not self.event.done():
+            self.event.set_result(None)
+
+
+class ConcurrencyLimiter(object):
+    """ConcurrencyLimiter bounds the number of in-flight prediction requests to the
+    limit estimated by a `ConcurrencyLimit` algorithm, which is driven by the
+    observed latencies and the 429/503 responses of the service.
+
+    Requests exceeding the limit are queued until a slot is available, or shed with
+    `ConcurrencyLimitExceededException` if the queue is full or the request waits
+    longer than `queue_timeout`. A limiter could be shared by predictors across
+    threads and event loops, `ConcurrencyLimiter.for_service` returns the limiter
+    shared by all the predictors of a service in the process.
+
+    Examples::
+
+        limiter = ConcurrencyLimiter.for_service("example_service")
+        p1 = Predictor("example_service", concurrency_limiter=limiter)
+        p2 = Predictor("example_service", concurrency_limiter=limiter)
+
+    """
+
+    _service_limiters = weakref.WeakValueDictionary()
+    _service_limiters_lock = threading.Lock()
+
+    def __init__(
+        self,
+        limit: Optional[ConcurrencyLimit] = None,
+        max_queue_size: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+    ):
+        """ConcurrencyLimiter initializer.
+
+        Args:
+            limit (ConcurrencyLimit, optional): The algorithm estimating the
+                concurrency limit, `AIMDLimit` is used if not provided.
+            max_queue_size (int, optional): The maximum number of requests waiting
+                for a slot, 0 means excess requests are shed immediately. If not
+                provided, the queue is unbounded.
+            queue_timeout (float, optional): The maximum seconds a request waits for
+                a slot. If not provided, requests wait until a slot is available.
+        """
+        if max_queue_size is not None and max_queue_size < 0:
+            raise ValueError("max_queue_size must be non-negative integer.")
+        self._limit = limit or AIMDLimit()
+        self.max_queue_size = max_queue_size
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._waiters: Deque[_LimiterWaiter] = collections.deque()
+
+    @classmethod
+    def for_service(
+        cls,
+        service_name: str,
+        session: Optional[Session] = None,
+        **kwargs,
+    ) -> "ConcurrencyLimiter":
+        """Get the limiter shared by the predictors of the service, it is created
+        with the given arguments if not exists.
+
+        Args:
+            service_name (str): Name of the prediction service.
+            session (Session, optional): A PAI session object, used to get the
+                region of the service.
+            **kwargs: Arguments of the ConcurrencyLimiter initializer.
+
+        Returns:
+            ConcurrencyLimiter: The limiter shared by the predictors of the service.
+        """
+        session = session or get_default_session()
+        key = (session.region_id, service_name)
+        with cls._service_limiters_lock:
+            limiter = cls._service_limiters.get(key)
+            if limiter is None:
+                limiter = cls(**kwargs)
+                cls._service_limiters[key] = limiter
+            return limiter
+
+    @property
+    def limit(self) -> int:
+        """The current concurrency limit."""
+        return self._limit.limit
+
+    @property
+    def inflight(self) -> int:
+        """Number of in-flight requests."""
+        return self._inflight
+
+    @property
+    def queue_size(self) -> int:
+        """Number of requests waiting for a slot."""
+        return len(self._waiters)
+
+    def _try_acquire(self, waiter: _LimiterWaiter) -> bool:
+        if not self._waiters and self._inflight < self.limit:
+            self._inflight += 1
+            return True
+        if (
+            self.max_queue_size is not None
+            and len(self._waiters) >= self.max_queue_size
+        ):
+            raise ConcurrencyLimitExceededException(
+                f"Request is shed by the concurrency limiter: limit={self.limit}"
+                f" queue_size={len(self._waiters)}"
+            )
+        self._waiters.append(waiter)
+        return False
+
+    def _dispatch(self):
+        while self._waiters and self._inflight < self.limit:
+            self._inflight += 1
+            self._waiters.popleft().grant()
+
+    def _timeout_error(self) -> ConcurrencyLimitExceededException:
+        return ConcurrencyLimitExceededException(
+            "Timeout waiting for the concurrency limiter:"
+            f" limit={self.limit} queue_timeout={self.queue_timeout}"
+        )
+
+    def acquire(self):
+        """Acquire a slot for a request, blocks until a slot is available.
+
+        Raises:
+            ConcurrencyLimitExceededException: Raise if the request is shed.
+        """
+        waiter = _LimiterWaiter()
+        with self._lock:
+            if self._try_acquire(waiter):
+                return
+        if waiter.event.wait(self.queue_timeout):
+            return
+        with self._lock:
+            if waiter.granted:
+                return
+            self._waiters.remove(waiter)
+        raise self._timeout_error()
+
+    async def acquire_async(self):
+        """Acquire a slot for a request, waits until a slot is available without
+        blocking the event loop.
+
+        Raises:
+            ConcurrencyLimitExceededException: Raise if the request is shed.
+        """
+        waiter = _LimiterWaiter(asyncio.get_running_loop())
+        with self._lock:
+            if self._try_acquire(waiter):
+                return
+        try:
+            await asyncio.wait_for(waiter.event, self.queue_timeout)
+            return
+        except asyncio.TimeoutError:
+            with self._lock:
+                if waiter.granted:
+                    return
+                self._waiters.remove(waiter)
+            raise self._timeout_error()
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    # Give back the slot granted to the cancelled call.
+                    self._inflight -= 1
+                    self._dispatch()
+                else:
+                    self._waiters.remove(waiter)
+            raise
+
+    def release(self, latency: float, dropped: bool = False):
+        """Release the slot acquired by the request, and update the concurrency
+        limit with the sample of the request.
+
+        Args:
+            latency (float): Seconds the request took.
+            dropped (bool): Whether the request is rejected by the overloaded
+                service.
+        """
+        with self._lock:
+            self._limit.update(latency, self._inflight, dropped)
+            self._inflight -= 1
+            self._dispatch()
+
+
+class ServiceDescriptorCache(object):
+    """A process-wide, thread-safe TTL cache of service descriptors (response of
+    the DescribeService API), shared by all predictors.
+
+    Constructing a predictor looks up the cache before calling the DescribeService
+    API. Entries are invalidated by the predictor operations that change the
+    service, such as `refresh`, `switch_version`, `start_service` and
+    `stop_service`, and waiting for the service to be ready always calls the API.
+    Each predictor gets its own copy of the cached descriptor. Set `ttl` to 0 to
+    disable the cache.
+    """
+
+    def __init__(self, ttl: float = 60):
+        """ServiceDescriptorCache initializer.
+
+        Args:
+            ttl (float): Seconds a cached service descriptor is valid (Default 60).
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+
+    def get(self, region_id: str, service_name: str) -> Optional[Dict[str, Any]]:
+        """Get a copy of the cached service descriptor, None if not found or
+        expired."""
+        key = (region_id, service_name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return
+            expire_at, descriptor = entry
+            if expire_at <= time.monotonic():
+                self._entries.pop(key, None)
+                return
+        return copy.deepcopy(descriptor)
+
+    def put(self, region_id: str, service_name: str, descriptor: Dict[str, Any]):
+        """Put a copy of the service descriptor into the cache."""
+        if self.ttl <= 0:
+            return
+        descriptor = copy.deepcopy(descriptor)
+        with self._lock:
+            self._entries[(region_id, service_name)] = (
+                time.monotonic() + self.ttl,
+                descriptor,
+            )
+
+    def invalidate(self, region_id: str, service_name: str):
+        """Remove the cached service descriptor."""
+        with self._lock:
+            self._entries.pop((region_id, service_name), None)
+
+    def clear(self):
+        """Remove all the cached service descriptors."""
+        with self._lock:
+            self._entries.clear()
+
+
+service_descriptor_cache = ServiceDescriptorCache()
+
+
+def _replace_netloc(url: str, netloc: str) -> str:
+    return urlsplit(url)._replace(scheme="http", netloc=netloc).geturl()
+
+
+@functools.lru_cache(maxsize=128)
+def _parse_service_config(service_config: str) -> Dict[str, Any]:
+    # The parsed config is shared by the predictors, it should not be modified.
+    return json.loads(service_config)
+
+
+class BatchConfig(object):
+    """BatchConfig is used to enable client-side micro-batching of the predictor,
+    which coalesces concurrent `predict` calls into one prediction request.
+
+    The input data of the calls are concatenated along the first axis (batch
+    dimension) before they are serialized, and the prediction result is split back
+    to each call. For a dict result, the values with the batch size of the request
+    as the leading dimension are split, and the other values, such as the model
+    version, are copied to each call. If the result could not be split, the calls
+    are sent again without batching. Batching is supported by the predictor using
+    `TensorFlowSerializer`, `PyTorchSerializer` (numpy inputs) or `JsonSerializer`
+    (list inputs).
+    """
+
+    def __init__(
+        self, max_batch_size: int = 32, max_wait_ms: float = 5, max_concurrency: int = 4
+    ):
+        """BatchConfig initializer.
+
+        Args:
+            max_batch_size (int): The maximum number of `predict` calls coalesced into
+                one prediction request (Default 32).
+            max_wait_ms (float): The maximum time in milliseconds that a call waits
+                for other calls to fill the batch (Default 5).
+            max_concurrency (int): The maximum number of batched prediction requests
+                in flight (Default 4).
+        """
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive integer.")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be non-negative.")
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive integer.")
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_concurrency = max_concurrency
+
+
+def _batch_size_of(value) -> int:
+    shape = np.shape(value)
+    if not shape:
+        raise ValueError("Batching requires input data with a batch dimension.")
+    return shape[0]
+
+
+class _BatchSplitError(ValueError):
+    """The prediction result of a batched request could not be split."""
+
+
+def _split_array(value, sizes: List[int]) -> List[np.ndarray]:
+    value = np.asarray(value)
+    if _leading_size(value) != sum(sizes):
+        raise _BatchSplitError(
+            f"Batch size of the prediction result ({_leading_size(value)}) does not "
+            f"match the batch size of the request ({sum(sizes)})."
+        )
+    return np.split(value, np.cumsum(sizes)[:-1])
+
+
+def _leading_size(value) -> Optional[int]:
+    """Returns the size of the leading dimension of a list or an array value, None
+    for the other values."""
+    if isinstance(value, list):
+        return len(value)
+    shape = getattr(value, "shape", None) or ()
+    return shape[0] if shape else None
+
+
+def _split_value(value, sizes: List[int]) -> List:
+    if isinstance(value, list):
+        offsets = np.cumsum([0] + sizes)
+        return [value[offsets[i] : offsets[i + 1]] for i in range(len(sizes))]
+    return _split_array(value, sizes)
+
+
+def _merge_batch(serializer: SerializerBase, items: List[Any]) -> Tuple[Any, List[int]]:
+    """Merge the input data of the batched calls into one input, returns the merged
+    input and the batch size of each call."""
+    if isinstance(serializer, JsonSerializer):
+        rows = []
+        for item in items:
+            if _is_pandas_dataframe(item):
+                item = item.to_numpy().tolist()
+            elif _is_numpy_ndarray(item):
+                item = item.tolist()
+            if not isinstance(item, list):
+                raise ValueError("Batching with JsonSerializer requires list input.")
+            rows.append(item)
+        return [row for item in rows for row in item], [len(item) for item in rows]
+    elif isinstance(serializer, TensorFlowSerializer):
+        if all(isinstance(item, dict) for item in items):
+            names = list(items[0].keys())
+            if any(set(item.keys()) != set(names) for item in items):
+                raise ValueError("Batched calls have different input names.")
+            sizes = [_batch_size_of(item[names[0]]) for item in items]
+            merged = {
+                name: np.concatenate([np.asarray(item[name]) for item in items])
+                for name in names
+            }
+            return merged, sizes
+        values = [np.asarray(item) for item in items]
+        return np.concatenate(values), [_batch_size_of(v) for v in values]
+    elif isinstance(serializer, ArrowSerializer):
+        # concatenate the tables column by column.
+        tables = [serializer._to_table(item) for item in items]
+        return serializer._pa.concat_tables(tables), [t.num_rows for t in tables]
+    elif isinstance(serializer, PyTorchSerializer):
+        if all(isinstance(item, (list, tuple)) for item in items):
+            # multi-input request, concatenate each input respectively.
+            sizes = [_batch_size_of(item[0]) for item in items]
+            merged = [
+                np.concatenate([np.asarray(value) for value in values])
+                for values in zip(*items)
+            ]
+            return merged, sizes
+        values = [np.asarray(item) for item in items]
+        return np.concatenate(values), [_batch_size_of(v) for v in values]
+    raise ValueError(
+        f"Batching is not supported by the serializer: {type(serializer).__name__}."
+    )
+
+
+def _split_batch(serializer: SerializerBase, result: Any, sizes: List[int]) -> List:
+    """Split the prediction result of a batched request to each call."""
+    if isinstance(result, dict):
+        split = {
+            name: _split_value(value, sizes)
+            for name, value in result.items()
+            if _leading_size(value) == sum(sizes)
+        }
+        if not split:
+            raise _BatchSplitError(
+                "No value of the prediction result has the batch size of the request"
+                f" ({sum(sizes)})."
+            )
+        return [
+            {
+                name: split[name][idx] if name in split else copy.deepcopy(value)
+                for name, value in result.items()
+            }
+            for idx in range(len(sizes))
+        ]
+    elif isinstance(serializer, ArrowSerializer):
+        if len(result) != sum(sizes):
+            raise _BatchSplitError(
+                f"Row count of the prediction result ({len(result)}) does not match"
+                f" the batch size of the request ({sum(sizes)})."
+            )
+        offsets = np.cumsum([0] + sizes)
+        if _is_pandas_dataframe(result):
+            return [
+                result.iloc[offsets[i] : offsets[i + 1]].reset_index(drop=True)
+                for i in range(len(sizes))
+            ]
+        return [result.slice(offsets[i], sizes[i]) for i in range(len(sizes))]
+    elif isinstance(serializer, JsonSerializer):
+        if not isinstance(result, list) or len(result) != sum(sizes):
+            raise _BatchSplitError(
+                "Prediction result of the batched request is not a list with the same"
+                " size as the request."
+            )
+        offsets = np.cumsum([0] + sizes)
+        return [result[offsets[i] : offsets[i + 1]] for i in range(len(sizes))]
+    elif isinstance(result, list):
+        split = [_split_array(value, sizes) for value in result]
+        return [[values[idx] for values in split] for idx in range(len(sizes))]
+    return _split_array(result, sizes)
+
+
+class _MicroBatcher(object):
+    """Coalesces concurrent prediction calls into batched prediction requests."""
+
+    def __init__(
+        self,
+        predict_fn: Callable[[Any], Any],
+        serializer: SerializerBase,
+        batch_config: BatchConfig,
+    ):
+        # Hold a weak reference to the predictor method so that the background
+        # thread does not keep the predictor alive.
+        self._predict_fn = weakref.WeakMethod(predict_fn)
+        self._serializer = serializer
+        self._config = batch_config
+        self._queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=batch_config.max_concurrency)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, data) -> Future:
+        future = Future()
+        # Calls are never queued after the stop signal put by `close`.
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Cannot submit prediction call to a closed batcher.")
+            self._queue.put((data, future))
+            if not self._thread:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        return future
+
+    def close(self):
+        """Stop accepting prediction calls, the queued calls are still flushed by the
+        background thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+            started = self._thread is not None
+        if not started:
+            self._executor.shutdown(wait=False)
+
+    def _run(self):
+        try:
+            self._batch_loop()
+        finally:
+            # Fail the calls that could not be flushed, so that the callers are
+            # never blocked.
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None and item[1].set_running_or_notify_cancel():
+                    item[1].set_exception(
+                        RuntimeError("The prediction batcher has been closed.")
+                    )
+            # The executor is shut down after the last batch is submitted, the
+            # submitted batches are still processed.
+            self._executor.shutdown(wait=False)
+
+    def _batch_loop(self):
+        max_wait = self._config.max_wait_ms / 1000
+        while True:
+            try:
+                item = self._queue.get(timeout=1)
+            except queue.Empty:
+                if self._predict_fn() is None:
+                    return
+                continue
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + max_wait
+            while len(batch) < self._config.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = (
+                        self._queue.get(timeout=remaining)
+                        if remaining > 0
+                        else self._queue.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                if item is None:
+                    # put back the stop signal, stop after the current batch.
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+            self._executor.submit(self._process, batch)
+
+    def _process(self, batch: List[Tuple[Any, Future]]):
+        batch = [(data, f) for data, f in batch if f.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        predict_fn = self._predict_fn()
+        try:
+            if predict_fn is None:
+                raise RuntimeError("The predictor has been garbage collected.")
+            if len(batch) == 1:
+                results = [predict_fn(batch[0][0])]
+            else:
+                data, sizes = _merge_batch(self._serializer, [d for d, _ in batch])
+                try:
+                    results = _split_batch(self._serializer, predict_fn(data), sizes)
+                except _BatchSplitError as e:
+                    logger.warning(
+                        "Failed to split the batched prediction result, send the"
+                        " calls without batching: %s",
+                        e,
+                    )
+                    results = [predict_fn(d) for d, _ in batch]
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+        else:
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+class LatencyHistogram(object):
+    """A histogram of latencies with log-linear buckets, in the style of
+    HdrHistogram.
+
+    Latencies are recorded in microseconds, each power-of-two range is divided into
+    linear sub-buckets, so that the relative error of the reported percentiles is
+    bounded (less than 1% by default), while the memory used by the histogram is
+    independent of the number of the recorded values.
+    """
+
+    def __init__(self, precision_bits: int = 8):
+        """LatencyHistogram initializer.
+
+        Args:
+            precision_bits (int): Each power-of-two range of the values is divided
+                into 2^(precision_bits - 1) sub-buckets (Default 8).
+        """
+        self._bits = precision_bits
+        self._counts: Dict[int, int] = collections.defaultdict(int)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _bucket_index(self, value: int) -> int:
+        if value < 1 << self._bits:
+            return value
+        shift = value.bit_length() - self._bits
+        return (shift << (self._bits - 1)) + (value >> shift)
+
+    def _bucket_value(self, index: int) -> float:
+        """Returns the midpoint of the bucket in microseconds."""
+        if index < 1 << self._bits:
+            return index
+        shift = (index >> (self._bits - 1)) - 1
+        return ((index - (shift << (self._bits - 1))) << shift) + (1 << shift) / 2
+
+    def record(self, latency: float):
+        """Record a latency in seconds."""
+        index = self._bucket_index(max(0, int(latency * 1e6)))
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total += latency
+            if self.min is None or latency < self.min:
+                self.min = latency
+            if self.max is None or latency > self.max:
+                self.max = latency
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Returns the p-th percentile of the recorded latencies in seconds."""
+        with self._lock:
+            if not self.count:
+                return
+            rank = max(1, math.ceil(self.count * p / 100))
+            seen = 0
+            for index in sorted(self._counts):
+                seen += self._counts[index]
+                if seen >= rank:
+                    value = self._bucket_value(index) / 1e6
+                    return min(max(value, self.min), self.max)
+
+    def summary(
+        self, percentiles: Tuple[float, ...] = (50, 90, 99, 99.9)
+    ) -> Dict[str, float]:
+        """Returns the count, mean, min, max and percentiles of the latencies."""
+        result = {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.min or 0.0,
+            "max": self.max or 0.0,
+        }
+        for p in percentiles:
+            result["p{:g}".format(p)] = self.percentile(p) or 0.0
+        return result
+
+
+class _Instrumentation(object):
+    """Aggregates the stage latencies of the prediction calls of a predictor."""
+
+    def __init__(self, callback: Optional[Callable[[Dict[str, float]], None]] = None):
+        self.callback = callback
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, timings: Dict[str, float]):
+        for stage, latency in timings.items():
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                with self._lock:
+                    histogram = self.histograms.setdefault(stage, LatencyHistogram())
+            histogram.record(latency)
+        if self.callback:
+            try:
+                self.callback(timings)
+            except Exception as e:
+                logger.warning("Instrumentation callback failed: %s", e)
+
+
+class _StageTimer(object):
+    """Measures the latencies of the stages of a prediction call."""
+
+    __slots__ = ("instrumentation", "timings", "_start", "_last", "_headers_time")
+
+    def __init__(self, instrumentation: _Instrumentation):
+        self.instrumentation = instrumentation
+        self.timings: Dict[str, float] = {}
+        self._start = self._last = time.perf_counter()
+        self._headers_time = None
+
+    def mark(self, stage: str):
+        """Record the time since the previous mark as the latency of the stage."""
+        now = time.perf_counter()
+        self.timings[stage] = self.timings.get(stage, 0.0) + now - self._last
+        self._last = now
+
+    def on_headers(self, *args, **kwargs):
+        """requests response hook, called when the response headers are received."""
+        self._headers_time = time.perf_counter()
+
+    def mark_response(self):
+        """Record the time to the response headers and the time to read the response
+        body, of a response that has been read."""
+        now = time.perf_counter()
+        headers_time = self._headers_time or now
+        self.timings["ttfb"] = max(
+            0.0, headers_time - self._last - self.timings.get("connect", 0.0)
+        )
+        self.timings["download"] = now - headers_time
+        self._last = now
+
+    def mark_headers(self):
+        """Record the time to the response headers, the connect time measured by the
+        trace of the request is excluded."""
+        self.mark("ttfb")
+        self.timings["ttfb"] = max(
+            0.0, self.timings["ttfb"] - self.timings.get("connect", 0.0)
+        )
+
+    def finish(self):
+        self.timings["total"] = time.perf_counter() - self._start
+        self.instrumentation.record(self.timings)
+
+
+async def _on_connection_create_start(session, context, params):
+    if isinstance(context.trace_request_ctx, _StageTimer):
+        context.connect_start = time.perf_counter()
+
+
+async def _on_connection_create_end(session, context, params):
+    if isinstance(context.trace_request_ctx, _StageTimer):
+        timings = context.trace_request_ctx.timings
+        timings["connect"] = timings.get("connect", 0.0) + (
+            time.perf_counter() - context.connect_start
+        )
+
+
+def _build_trace_config() -> aiohttp.TraceConfig:
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_start.append(_on_connection_create_start)
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    return trace_config
+
+
 class PredictorBase(ABC):
+    # Instrumentation of the prediction calls, None if it is disabled.
+    _instrumentation: Optional[_Instrumentation] = None
+
     @abstractmethod
     def predict(self, *args, **kwargs) -> Any:
         """Perform inference on the provided data and return prediction result."""
@@ -106,6 +1473,62 @@ class PredictorBase(ABC):
     ):
         pass
 
+    def enable_instrumentation(
+        self, callback: Optional[Callable[[Dict[str, float]], None]] = None
+    ):
+        """Enable the stage-level latency instrumentation of the prediction calls.
+
+        The latency of each stage of a `predict` call is recorded in seconds:
+        `serialize`, `connect` (establishing a new connection, measured by the async
+        calls only, otherwise included in `ttfb`), `ttfb` (from sending the request
+        to receiving the response headers, including the retries), `download`
+        (reading the response body), `queue` (waiting for the result of an
+        `AsyncPredictor` request), `deserialize` and `total`. The latencies are
+        aggregated into histograms per stage, which are returned by `stats`.
+
+        Args:
+            callback (Callable[[Dict[str, float]], None], optional): A callable that
+                receives the stage latencies of each call, such as an exporter to a
+                metrics system. It is called in the thread (or the event loop) that
+                makes the call, and should not block.
+        """
+        self._instrumentation = _Instrumentation(callback=callback)
+
+    def disable_instrumentation(self):
+        """Disable the instrumentation and discard the recorded latencies."""
+        self._instrumentation = None
+
+    def stats(
+        self, percentiles: Tuple[float, ...] = (50, 90, 99, 99.9)
+    ) -> Dict[str, Dict[str, float]]:
+        """Returns the latency statistics of each stage of the prediction calls,
+        empty if the instrumentation is not enabled.
+
+        Examples::
+
+            predictor.enable_instrumentation()
+            ...
+            print(predictor.stats()["ttfb"]["p99"])
+
+        Args:
+            percentiles (Tuple[float, ...]): Percentiles to be reported.
+
+        Returns:
+            Dict[str, Dict[str, float]]: A dict of stage name to its `count`,
+                `mean`, `min`, `max` and percentiles (such as `p99`) in seconds.
+        """
+        instrumentation = self._instrumentation
+        if not instrumentation:
+            return {}
+        return {
+            stage: histogram.summary(percentiles)
+            for stage, histogram in list(instrumentation.histograms.items())
+        }
+
+    def _start_timer(self) -> Optional[_StageTimer]:
+        instrumentation = self._instrumentation
+        return _StageTimer(instrumentation) if instrumentation else None
+
 
 class RawResponse(object):
     """Response object returned by the predictor.raw_predict."""
@@ -132,37 +1555,524 @@ class RawResponse(object):
         return json.loads(self.content)
 
 
-class _ServicePredictorMixin(object):
+class OffloadedRawResponse(RawResponse):
+    """Response object returned by the AsyncPredictor.raw_predict, whose content is
+    offloaded to OSS by the prediction service.
+
+    The content is fetched from OSS on the first access of `content`, or could be
+    streamed by `iter_content` without being held in memory.
+    """
+
+    def __init__(
+        self,
+        status_code: int,
+        headers: Dict[str, str],
+        payload_uri: str,
+        offload_config: "PayloadOffloadConfig",
+    ):
+        self.status_code = status_code
+        self.headers = headers
+        self.payload_uri = payload_uri
+        self._offload_config = offload_config
+        self._content = None
+
+    @property
+    def content(self) -> bytes:
+        if self._content is None:
+            with self._offload_config.open(self.payload_uri) as f:
+                self._content = f.read()
+        return self._content
+
+    def iter_content(self, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+        """Iterate over the content in chunks, streamed from OSS."""
+        if self._content is not None:
+            yield self._content
+            return
+        with self._offload_config.open(self.payload_uri) as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+
+class ServerSentEvent(object):
+    """An event received from a server-sent events (SSE) stream."""
+
+    def __init__(
+        self,
+        data: str = "",
+        event: Optional[str] = None,
+        id: Optional[str] = None,
+        retry: Optional[int] = None,
+    ):
+        self.data = data
+        self.event = event
+        self.id = id
+        self.retry = retry
+
+    def __repr__(self):
+        return "ServerSentEvent(event={}, id={}, data={})".format(
+            self.event, self.id, self.data
+        )
+
+    def json(self):
+        """Returns the json-encoded data of the event."""
+        return json.loads(self.data)
+
+
+class _SSEDecoder(object):
+    """Decode server-sent events from lines of the event stream, see:
+    https://html.spec.whatwg.org/multipage/server-sent-events.html"""
+
+    def __init__(self):
+        self._data = []
+        self._event = None
+        self._id = None
+        self._retry = None
+
+    def decode(self, line: str) -> Optional[ServerSentEvent]:
+        if not line:
+            # An empty line dispatches the event.
+            if not self._data and self._event is None and self._id is None:
+                return
+            event = ServerSentEvent(
+                data="\n".join(self._data),
+                event=self._event,
+                id=self._id,
+                retry=self._retry,
+            )
+            self._data, self._event, self._id, self._retry = [], None, None, None
+            return event
+        if line.startswith(":"):
+            # comment line.
+            return
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "data":
+            self._data.append(value)
+        elif field == "event":
+            self._event = value
+        elif field == "id":
+            self._id = value
+        elif field == "retry" and value.isdigit():
+            self._retry = int(value)
+
+
+def _iter_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    buf = b""
+    for chunk in chunks:
+        buf += chunk
+        lines = buf.split(b"\n")
+        buf = lines.pop()
+        for line in lines:
+            yield line[:-1] if line.endswith(b"\r") else line
+    if buf:
+        yield buf
+
+
+async def _aiter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    buf = b""
+    async for chunk in chunks:
+        buf += chunk
+        lines = buf.split(b"\n")
+        buf = lines.pop()
+        for line in lines:
+            yield line[:-1] if line.endswith(b"\r") else line
+    if buf:
+        yield buf
+
+
+class StreamingRawResponse(object):
+    """Streaming response object returned by the predictor.raw_predict with
+    `stream=True`.
+
+    The response body is not read until it is iterated, use it as a context manager,
+    or call `close` to release the connection if the body is not fully consumed.
+
+    Examples::
+
+        with predictor.raw_predict(data, stream=True) as resp:
+            for event in resp.iter_events():
+                print(event.data)
+            print("Time to first byte:", resp.time_to_first_byte)
+
+    """
+
+    def __init__(self, response: requests.Response, start_time: float):
+        """Initialize a StreamingRawResponse object.
+
+        Args:
+            response (requests.Response): The response of the streaming request.
+            start_time (float): Value of `time.perf_counter()` when the request was
+                sent.
+        """
+        self.status_code = response.status_code
+        self.headers = dict(response.headers)
+        self._response = response
+        self._start_time = start_time
+        self.time_to_headers = time.perf_counter() - start_time
+        self.time_to_first_byte = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Release the connection of the response."""
+        self._response.close()
+
+    def iter_content(self, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        """Iterate over the response body, chunks are yielded as they arrive if
+        chunk_size is None."""
+        for chunk in self._response.iter_content(chunk_size=chunk_size):
+            if self.time_to_first_byte is None:
+                self.time_to_first_byte = time.perf_counter() - self._start_time
+            yield chunk
+
+    def iter_lines(self) -> Iterator[str]:
+        """Iterate over the lines of the response body."""
+        for line in _iter_lines(self.iter_content()):
+            yield line.decode("utf-8")
+
+    def iter_events(self) -> Iterator[ServerSentEvent]:
+        """Iterate over the server-sent events of the response body."""
+        decoder = _SSEDecoder()
+        for line in self.iter_lines():
+            event = decoder.decode(line)
+            if event:
+                yield event
+        event = decoder.decode("")
+        if event:
+            yield event
+
+    def read(self) -> bytes:
+        """Read the remaining response body."""
+        return b"".join(self.iter_content())
+
+
+class AsyncStreamingRawResponse(object):
+    """Streaming response object returned by the predictor.raw_predict_async with
+    `stream=True`.
+
+    Examples::
+
+        async with await predictor.raw_predict_async(data, stream=True) as resp:
+            async for event in resp.iter_events():
+                print(event.data)
+
+    """
+
+    def __init__(self, response: aiohttp.ClientResponse, start_time: float):
+        """Initialize an AsyncStreamingRawResponse object.
+
+        Args:
+            response (aiohttp.ClientResponse): The response of the streaming request.
+            start_time (float): Value of `time.perf_counter()` when the request was
+                sent.
+        """
+        self.status_code = response.status
+        self.headers = dict(response.headers)
+        self._response = response
+        self._start_time = start_time
+        self.time_to_headers = time.perf_counter() - start_time
+        self.time_to_first_byte = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Release the connection of the response."""
+        self._response.release()
+
+    async def iter_content(self) -> AsyncIterator[bytes]:
+        """Iterate over the response body, chunks are yielded as they arrive."""
+        async for chunk in self._response.content.iter_any():
+            if self.time_to_first_byte is None:
+                self.time_to_first_byte = time.perf_counter() - self._start_time
+            yield chunk
+
+    async def iter_lines(self) -> AsyncIterator[str]:
+        """Iterate over the lines of the response body."""
+        async for line in _aiter_lines(self.iter_content()):
+            yield line.decode("utf-8")
+
+    async def iter_events(self) -> AsyncIterator[ServerSentEvent]:
+        """Iterate over the server-sent events of the response body."""
+        decoder = _SSEDecoder()
+        async for line in self.iter_lines():
+            event = decoder.decode(line)
+            if event:
+                yield event
+        event = decoder.decode("")
+        if event:
+            yield event
+
+    async def read(self) -> bytes:
+        """Read the remaining response body."""
+        return b"".join([chunk async for chunk in self.iter_content()])
+
+
+class _HTTPSessionMixin(object):
+    """Pooled HTTP sessions used by the predictors to send the requests."""
+
+    def _init_http_sessions(self, connection_config: Optional[ConnectionConfig]):
+        self.connection_config = connection_config or ConnectionConfig()
+        self._request_session = requests.Session()
+        self._request_session.mount(
+            "http://", self.connection_config.build_http_adapter()
+        )
+        self._request_session.mount(
+            "https://", self.connection_config.build_http_adapter()
+        )
+        # aiohttp.ClientSession is bound to the event loop it is created in, so the
+        # predictor keeps one pooled session per event loop, keyed weakly by the
+        # event loop.
+        self._async_sessions = weakref.WeakKeyDictionary()
+
+    def _get_async_session(self) -> aiohttp.ClientSession:
+        """Get the pooled aiohttp session for the running event loop, the session is
+        created lazily on first use."""
+        loop = asyncio.get_running_loop()
+        # Drop the sessions bound to event loops that have been closed, they could
+        # not be used anymore.
+        for closed_loop in [lp for lp in self._async_sessions if lp.is_closed()]:
+            self._async_sessions.pop(closed_loop)
+
+        session = self._async_sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=self.connection_config.build_connector(),
+                # Connect time is traced only if the instrumentation is enabled
+                # before the session is created.
+                trace_configs=[_build_trace_config()]
+                if self._instrumentation
+                else None,
+            )
+            self._async_sessions[loop] = session
+        return session
+
+    async def aclose(self):
+        """Close the pooled connections used by the async prediction calls, the
+        sessions created in other event loops are closed in their own event loops."""
+        current_loop = asyncio.get_running_loop()
+        sessions = getattr(self, "_async_sessions", None)
+        if not sessions:
+            return
+        items = list(sessions.items())
+        sessions.clear()
+        for loop, session in items:
+            if session.closed:
+                continue
+            if loop is current_loop:
+                await session.close()
+            elif loop.is_running() and not loop.is_closed():
+                await asyncio.wrap_future(
+                    asyncio.run_coroutine_threadsafe(session.close(), loop)
+                )
+            else:
+                logger.debug(
+                    "Drop the session of the event loop that is not running: %s", loop
+                )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+
+class _ServicePredictorMixin(_HTTPSessionMixin):
     def __init__(
         self,
         service_name: str,
         session: Optional[Session] = None,
         endpoint_type: str = EndpointType.INTERNET,
         serializer: Optional[SerializerBase] = None,
+        connection_config: Optional[ConnectionConfig] = None,
+        service_descriptor: Optional[Dict[str, Any]] = None,
+        retry_config: Optional[RetryConfig] = None,
+        load_balancer_config: Optional[LoadBalancerConfig] = None,
+        concurrency_limiter: Optional[ConcurrencyLimiter] = None,
+        compression_config: Optional[CompressionConfig] = None,
     ):
         self.service_name = service_name
         self.session = session or get_default_session()
-        self._service_api_object = self.describe_service()
+        if service_descriptor:
+            self._service_api_object = service_descriptor
+            service_descriptor_cache.put(
+                self.session.region_id, service_name, service_descriptor
+            )
+        else:
+            self._service_api_object = (
+                service_descriptor_cache.get(self.session.region_id, service_name)
+                or self.describe_service()
+            )
         self.endpoint_type = endpoint_type
         self.serializer = serializer or self._get_default_serializer()
-        self._request_session = requests.Session()
+        self.retry_config = retry_config
+        self.concurrency_limiter = concurrency_limiter
+        self.compression_config = compression_config
+        self._compression_stats = collections.Counter()
+        self._latencies = _LatencyWindow()
+        self._retry_stats = collections.Counter()
+        self._retry_stats_lock = threading.Lock()
+        # Created lazily by the first hedged request.
+        self._hedging_executor: Optional[ThreadPoolExecutor] = None
+        self._hedging_lock = threading.Lock()
+        self._balancer = (
+            _InstanceBalancer(
+                self.list_instances, load_balancer_config or LoadBalancerConfig()
+            )
+            if endpoint_type == EndpointType.DIRECT
+            else None
+        )
+        self._init_http_sessions(connection_config)
+
+    def __repr__(self):
+        return "{}(service_name={}, endpoint_type={})".format(
+            type(self).__name__,
+            self.service_name,
+            self.endpoint_type,
+        )
+
+    def __del__(self):
+        # The attributes may be missing if the initializer raised, for example,
+        # failed to describe the service.
+        if getattr(self, "_request_session", None):
+            self._request_session.close()
+        if getattr(self, "_hedging_executor", None):
+            self._hedging_executor.shutdown(wait=False)
+
+    def close(self):
+        """Release the pooled connections of the sync prediction calls and the
+        threads of the hedged requests."""
+        self._request_session.close()
+        with self._hedging_lock:
+            executor, self._hedging_executor = self._hedging_executor, None
+        if executor:
+            executor.shutdown(wait=False)
+
+    def _get_hedging_executor(self) -> ThreadPoolExecutor:
+        with self._hedging_lock:
+            if self._hedging_executor is None:
+                # Both the original and the hedged request of a call run in the
+                # pool, which is sized from the connection pool so that it does not
+                # limit the concurrency of the calls.
+                self._hedging_executor = ThreadPoolExecutor(
+                    max_workers=2 * self.connection_config.pool_size,
+                    thread_name_prefix="PredictorHedging",
+                )
+            return self._hedging_executor
+
+    @property
+    def retry_stats(self) -> Dict[str, int]:
+        """Counters of the requests sent by the predictor, includes `requests`
+        (requests sent by the caller), `retries` (retried attempts), `hedges`
+        (hedged requests sent) and `hedge_wins` (hedged requests that completed
+        first)."""
+        stats = {"requests": 0, "retries": 0, "hedges": 0, "hedge_wins": 0}
+        with self._retry_stats_lock:
+            stats.update(self._retry_stats)
+        return stats
+
+    @property
+    def compression_stats(self) -> Dict[str, Union[int, float]]:
+        """Statistics of the compression of the requests and responses, includes
+        `compressed_requests`, `request_bytes` and `request_compressed_bytes` (sizes
+        of the compressed request bodies before and after compression),
+        `compress_time` (seconds spent on compression), `compressed_responses`,
+        `response_bytes` and `response_compressed_bytes` (sizes of the compressed
+        response bodies after and before decoding, counted for the responses with
+        Content-Length that are not streamed)."""
+        stats = {
+            "compressed_requests": 0,
+            "request_bytes": 0,
+            "request_compressed_bytes": 0,
+            "compress_time": 0.0,
+            "compressed_responses": 0,
+            "response_bytes": 0,
+            "response_compressed_bytes": 0,
+        }
+        with self._retry_stats_lock:
+            stats.update(self._compression_stats)
+        return stats
+
+    def refresh(self):
+        self._invalidate_service_descriptor()
+        self._service_api_object = self.describe_service()
+
+    @property
+    def service_descriptor(self) -> Dict[str, Any]:
+        """The service descriptor used by the predictor, which could be used to
+        construct a predictor without calling the DescribeService API."""
+        return self._service_api_object
+
+    @property
+    def _service_config(self) -> Dict[str, Any]:
+        return _parse_service_config(self._service_api_object["ServiceConfig"])
+
+    @classmethod
+    def from_service_descriptor(
+        cls,
+        service_descriptor: Dict[str, Any],
+        session: Optional[Session] = None,
+        **kwargs,
+    ):
+        """Construct a predictor from a service descriptor without calling the
+        DescribeService API.
 
-    def __repr__(self):
-        return "{}(service_name={}, endpoint_type={})".format(
-            type(self).__name__,
-            self.service_name,
-            self.endpoint_type,
+        Examples::
+
+            descriptor = predictor.service_descriptor
+            # the descriptor is JSON serializable, and could be shared across
+            # processes.
+            p = Predictor.from_service_descriptor(descriptor)
+
+        Args:
+            service_descriptor (Dict[str, Any]): The service descriptor, which is the
+                response of the DescribeService API, such as
+                `predictor.service_descriptor`.
+            session (Session, optional): A PAI session object used for communicating
+                with PAI service.
+            **kwargs: Additional keyword arguments for the predictor initializer.
+
+        Returns:
+            A predictor object for the service.
+        """
+        return cls(
+            service_name=service_descriptor["ServiceName"],
+            session=session,
+            service_descriptor=service_descriptor,
+            **kwargs,
         )
 
-    def __del__(self):
-        self._request_session.close()
+    def _invalidate_service_descriptor(self):
+        service_descriptor_cache.invalidate(self.session.region_id, self.service_name)
 
-    def refresh(self):
-        self._service_api_object = self.describe_service()
+    def list_instances(self) -> List[Dict[str, Any]]:
+        """List the instances of the service."""
+        instances, page_number = [], 1
+        while True:
+            result = self.session.service_api.list_instances(
+                self.service_name, page_number=page_number, page_size=100
+            )
+            instances.extend(result.items)
+            if not result.items or len(instances) >= result.total_count:
+                return instances
+            page_number += 1
 
     @property
     def endpoint(self):
-        if self.endpoint_type == EndpointType.INTRANET:
+        # Requests of the DIRECT endpoint type are sent to the service instances
+        # with the path of the VPC endpoint.
+        if self.endpoint_type in (EndpointType.INTRANET, EndpointType.DIRECT):
             return self._service_api_object["IntranetEndpoint"]
         else:
             return self._service_api_object["InternetEndpoint"]
@@ -207,8 +2117,7 @@ class _ServicePredictorMixin(object):
         """Get default serializer for the predictor by inspecting the service config."""
         from pai.model._model import _BuiltinProcessor
 
-        service_config = json.loads(self._service_api_object["ServiceConfig"])
-        processor_code = service_config.get("processor")
+        processor_code = self._service_config.get("processor")
 
         # If the prediction service is serving with custom processor or custom
         # container, use JsonSerializer as default serializer.
@@ -251,8 +2160,7 @@ class _ServicePredictorMixin(object):
                 serving model.
 
         """
-        service_config = json.loads(self._service_api_object["ServiceConfig"])
-        processor_code = service_config.get("processor")
+        processor_code = self._service_config.get("processor")
 
         if processor_code and processor_code.startswith("tensorflow"):
             return TensorFlowSerializer.inspect_model_signature_def(
@@ -270,11 +2178,16 @@ class _ServicePredictorMixin(object):
             Dict[str, Any]: Response from PAI API service.
 
         """
-        return self.session.service_api.get(self.service_name)
+        descriptor = self.session.service_api.get(self.service_name)
+        service_descriptor_cache.put(
+            self.session.region_id, self.service_name, descriptor
+        )
+        return descriptor
 
     def start_service(self, wait=True):
         """Start the stopped service."""
         self.session.service_api.start(name=self.service_name)
+        self._invalidate_service_descriptor()
         if wait:
             status = ServiceStatus.Running
             unexpected_status = ServiceStatus.completed_status()
@@ -290,6 +2203,7 @@ class _ServicePredictorMixin(object):
     def stop_service(self, wait=True):
         """Stop the running service."""
         self.session.service_api.stop(name=self.service_name)
+        self._invalidate_service_descriptor()
         if wait:
             status = ServiceStatus.Stopped
             unexpected_status = ServiceStatus.completed_status()
@@ -307,6 +2221,7 @@ class _ServicePredictorMixin(object):
     def delete_service(self):
         """Delete the service."""
         self.session.service_api.delete(name=self.service_name)
+        self._invalidate_service_descriptor()
 
     def wait_for_ready(self):
         """Wait until the service enter running status.
@@ -315,6 +2230,8 @@ class _ServicePredictorMixin(object):
             RuntimeError: Raise if the service terminated unexpectedly.
 
         """
+        # The cached service descriptor may be stale.
+        self.refresh()
         if self.service_status == ServiceStatus.Running:
             return
 
@@ -450,6 +2367,7 @@ class _ServicePredictorMixin(object):
         if version > latest_version:
             raise ValueError("Target version greater than latest version.")
         self.session.service_api.update_version(self.service_name, version=version)
+        self.refresh()
 
     @classmethod
     def deploy(
@@ -497,12 +2415,16 @@ class _ServicePredictorMixin(object):
                 service_name=name,
                 endpoint_type=endpoint_type,
                 serializer=serializer,
+                session=session,
+                service_descriptor=service_api_obj,
             )
         else:
             p = Predictor(
                 service_name=name,
                 endpoint_type=endpoint_type,
                 serializer=serializer,
+                session=session,
+                service_descriptor=service_api_obj,
             )
 
         return p
@@ -529,8 +2451,19 @@ class _ServicePredictorMixin(object):
     def _handle_input(self, data):
         return self.serializer.serialize(data) if self.serializer else data
 
-    def _handle_output(self, content: bytes):
-        return self.serializer.deserialize(content) if self.serializer else content
+    def _handle_output(self, content: bytes, content_type: Optional[str] = None):
+        if not self.serializer:
+            return content
+        return self.serializer.deserialize_response(content, content_type=content_type)
+
+    def _serializer_headers(self) -> Optional[Dict[str, str]]:
+        """Returns the Content-Type and Accept headers declared by the serializer."""
+        headers = {}
+        if self.serializer and self.serializer.content_type:
+            headers["Content-Type"] = self.serializer.content_type
+        if self.serializer and self.serializer.accept:
+            headers["Accept"] = self.serializer.accept
+        return headers or None
 
     def _handle_raw_input(self, data):
         if isinstance(data, (IOBase, bytes, str)):
@@ -547,6 +2480,77 @@ class _ServicePredictorMixin(object):
     def _handle_raw_output(self, status_code: int, headers: dict, content: bytes):
         return RawResponse(status_code, headers, content)
 
+    def _incr_retry_stat(self, name: str):
+        with self._retry_stats_lock:
+            self._retry_stats[name] += 1
+
+    def _hedging_delay(self) -> Optional[float]:
+        """Returns the delay before a hedged request is sent, None if hedging is not
+        enabled or there are not enough latency samples."""
+        config = self.retry_config
+        if not config or not config.hedging:
+            return
+        if len(self._latencies) < config.hedging_min_samples:
+            return
+        return max(
+            config.hedging_min_delay,
+            self._latencies.percentile(config.hedging_percentile),
+        )
+
+    def _is_retryable_response(self, status_code: int) -> bool:
+        return status_code in self.retry_config.retry_status_codes
+
+    def _compress_request(
+        self, data, json_data, headers: Optional[Dict[str, str]], async_client: bool
+    ):
+        """Compress the request body if a compression config is provided, returns the
+        data, JSON data and headers of the request to be sent."""
+        config = self.compression_config
+        if not config:
+            return data, json_data, headers
+        headers = dict(headers or {})
+        if config.accept_compressed_response:
+            headers.setdefault("Accept-Encoding", _accept_encoding(async_client))
+        if json_data is not None:
+            payload = json.dumps(json_data).encode()
+        elif isinstance(data, str):
+            payload = data.encode()
+        else:
+            payload = data
+        if (
+            not isinstance(payload, bytes)
+            or len(payload) <= config.threshold
+            or "Content-Encoding" in headers
+        ):
+            return data, json_data, headers
+
+        start = time.perf_counter()
+        compressed = config.compress(payload)
+        elapsed = time.perf_counter() - start
+        with self._retry_stats_lock:
+            self._compression_stats["compress_time"] += elapsed
+        if len(compressed) >= len(payload):
+            return data, json_data, headers
+        with self._retry_stats_lock:
+            self._compression_stats["compressed_requests"] += 1
+            self._compression_stats["request_bytes"] += len(payload)
+            self._compression_stats["request_compressed_bytes"] += len(compressed)
+        if json_data is not None:
+            headers.setdefault("Content-Type", "application/json")
+        headers["Content-Encoding"] = config.algorithm
+        return compressed, None, headers
+
+    def _record_response_compression(self, headers, content: bytes):
+        if not self.compression_config or not headers.get("Content-Encoding"):
+            return
+        compressed_size = headers.get("Content-Length")
+        if compressed_size is None:
+            return
+        with self._retry_stats_lock:
+            self._compression_stats["compressed_responses"] += 1
+            self._compression_stats["response_bytes"] += len(content)
+            self._compression_stats["response_compressed_bytes"] += int(compressed_size)
+
     def _send_request(
         self,
         data=None,
@@ -558,7 +2562,11 @@ class _ServicePredictorMixin(object):
         **kwargs,
     ):
         url = self._build_url(path)
-        resp = self._request_session.request(
+        data, json, headers = self._compress_request(
+            data, json, headers, async_client=False
+        )
+        send = functools.partial(
+            self._send_request_once,
             url=url,
             json=json,
             data=data,
@@ -567,8 +2575,119 @@ class _ServicePredictorMixin(object):
             params=params,
             **kwargs,
         )
+        self._incr_retry_stat("requests")
+        config = self.retry_config
+        if not config or not config.is_retryable(method, data):
+            return self._check_response_compression(send(), **kwargs)
+
+        # Streaming response body is consumed by the caller, which should not be
+        # hedged.
+        hedging = not kwargs.get("stream")
+        attempt = 1
+        while True:
+            try:
+                resp = self._send_hedged_request(send) if hedging else send()
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+            ) as e:
+                if attempt >= config.max_attempts:
+                    raise
+                logger.debug("Retry the request on error: attempt=%s %s", attempt, e)
+            else:
+                if (
+                    not self._is_retryable_response(resp.status_code)
+                    or attempt >= config.max_attempts
+                ):
+                    return self._check_response_compression(resp, **kwargs)
+                logger.debug(
+                    "Retry the request on status code: attempt=%s status_code=%s",
+                    attempt,
+                    resp.status_code,
+                )
+                resp.close()
+            time.sleep(config.backoff(attempt))
+            attempt += 1
+            self._incr_retry_stat("retries")
+
+    def _check_response_compression(
+        self, resp: requests.Response, stream: bool = False, **kwargs
+    ) -> requests.Response:
+        # The content of the non-streaming response has been read by requests.
+        if not stream:
+            self._record_response_compression(resp.headers, resp.content)
         return resp
 
+    def _send_request_once(self, **kwargs) -> requests.Response:
+        limiter = self.concurrency_limiter
+        if limiter:
+            limiter.acquire()
+        start = time.perf_counter()
+        dropped = True
+        try:
+            if self._balancer:
+                resp = self._send_direct_request(**kwargs)
+            else:
+                resp = self._request_session.request(**kwargs)
+            dropped = resp.status_code in _OVERLOAD_STATUS_CODES
+        finally:
+            latency = time.perf_counter() - start
+            if limiter:
+                limiter.release(latency, dropped=dropped)
+        self._latencies.record(latency)
+        return resp
+
+    def _send_direct_request(self, url: str, **kwargs) -> requests.Response:
+        address = self._balancer.acquire()
+        success = False
+        try:
+            resp = self._request_session.request(
+                url=_replace_netloc(url, address), **kwargs
+            )
+            success = resp.status_code < 500
+            return resp
+        finally:
+            self._balancer.release(address, success)
+
+    def _send_hedged_request(self, send: Callable[[], requests.Response]):
+        delay = self._hedging_delay()
+        if delay is None:
+            return send()
+
+        executor = self._get_hedging_executor()
+        futures = [executor.submit(send)]
+        done, _ = wait(futures, timeout=delay)
+        if not done:
+            self._incr_retry_stat("hedges")
+            futures.append(executor.submit(send))
+
+        pending = list(futures)
+        while True:
+            done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+            pending = list(not_done)
+            for future in done:
+                if future.exception() is None and not self._is_retryable_response(
+                    future.result().status_code
+                ):
+                    if future is not futures[0]:
+                        self._incr_retry_stat("hedge_wins")
+                    self._release_hedged_responses(futures, winner=future)
+                    return future.result()
+            if not pending:
+                # All the requests failed, returns the result of the original request.
+                self._release_hedged_responses(futures, winner=futures[0])
+                return futures[0].result()
+
+    @classmethod
+    def _release_hedged_responses(cls, futures: List[Future], winner: Future):
+        """Release the connections of the requests that lose the race, including
+        the requests that are still running."""
+        for future in futures:
+            if future is not winner:
+                future.add_done_callback(
+                    lambda f: f.exception() is None and f.result().close()
+                )
+
     async def _send_request_async(
         self,
         data=None,
@@ -577,22 +2696,307 @@ class _ServicePredictorMixin(object):
         json=None,
         headers=None,
         params=None,
+        stream: bool = False,
+        idempotent: bool = True,
         **kwargs,
     ):
         url = self._build_url(path=path, params=params)
+        data, json, headers = self._compress_request(
+            data, json, headers, async_client=True
+        )
         headers = self._build_headers(headers)
-        async with aiohttp.ClientSession() as session:
-            return await session.request(
-                method=method,
-                url=url,
-                headers=headers,
-                data=data,
-                json=json,
-                **kwargs,
+        send = functools.partial(
+            self._send_request_once_async,
+            method=method,
+            url=url,
+            headers=headers,
+            data=data,
+            json=json,
+            **kwargs,
+        )
+        self._incr_retry_stat("requests")
+        config = self.retry_config
+        if not config or not config.is_retryable(method, data, idempotent=idempotent):
+            return await send()
+
+        # Streaming response body is consumed by the caller, which should not be
+        # hedged, and a hedged non-idempotent request is always duplicated.
+        hedging = not stream and idempotent
+        attempt = 1
+        while True:
+            try:
+                if hedging:
+                    resp = await self._send_hedged_request_async(send)
+                else:
+                    resp = await send()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= config.max_attempts:
+                    raise
+                logger.debug("Retry the request on error: attempt=%s %s", attempt, e)
+            else:
+                if (
+                    not self._is_retryable_response(resp.status)
+                    or attempt >= config.max_attempts
+                ):
+                    return resp
+                logger.debug(
+                    "Retry the request on status code: attempt=%s status_code=%s",
+                    attempt,
+                    resp.status,
+                )
+                resp.release()
+            await asyncio.sleep(config.backoff(attempt))
+            attempt += 1
+            self._incr_retry_stat("retries")
+
+    async def _send_request_once_async(self, **kwargs) -> aiohttp.ClientResponse:
+        limiter = self.concurrency_limiter
+        if limiter:
+            await limiter.acquire_async()
+        start = time.perf_counter()
+        dropped = True
+        try:
+            if self._balancer:
+                resp = await self._send_direct_request_async(**kwargs)
+            else:
+                resp = await self._get_async_session().request(**kwargs)
+            dropped = resp.status in _OVERLOAD_STATUS_CODES
+        finally:
+            latency = time.perf_counter() - start
+            if limiter:
+                limiter.release(latency, dropped=dropped)
+        self._latencies.record(latency)
+        return resp
+
+    async def _send_direct_request_async(
+        self, url: str, **kwargs
+    ) -> aiohttp.ClientResponse:
+        if self._balancer.needs_refresh():
+            # Do not block the event loop with the ListServiceInstances API call.
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._balancer.refresh
+            )
+        address = self._balancer.acquire()
+        success = False
+        try:
+            resp = await self._get_async_session().request(
+                url=_replace_netloc(url, address), **kwargs
             )
+            success = resp.status < 500
+            return resp
+        finally:
+            self._balancer.release(address, success)
+
+    async def _send_hedged_request_async(self, send: Callable):
+        delay = self._hedging_delay()
+        if delay is None:
+            return await send()
+
+        tasks = [asyncio.ensure_future(send())]
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            self._incr_retry_stat("hedges")
+            tasks.append(asyncio.ensure_future(send()))
+
+        pending = list(tasks)
+        while True:
+            done, not_done = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            pending = list(not_done)
+            for task in done:
+                if task.exception() is None and not self._is_retryable_response(
+                    task.result().status
+                ):
+                    if task is not tasks[0]:
+                        self._incr_retry_stat("hedge_wins")
+                    self._release_hedged_responses_async(tasks, winner=task)
+                    return task.result()
+            if not pending:
+                # All the requests failed, returns the result of the original request.
+                self._release_hedged_responses_async(tasks, winner=tasks[0])
+                return tasks[0].result()
+
+    @classmethod
+    def _release_hedged_responses_async(
+        cls, tasks: List[asyncio.Future], winner: asyncio.Future
+    ):
+        """Cancel the requests that lose the race, and release the connections of
+        the requests that have completed."""
+        for task in tasks:
+            if task is not winner:
+                task.cancel()
+                task.add_done_callback(
+                    lambda t: not t.cancelled()
+                    and t.exception() is None
+                    and t.result().release()
+                )
+
+
+class _BulkPredictionMixin(object):
+    """Concurrent predictions for a stream of input data, built on the `predict` and
+    `predict_async` methods of the predictor."""
+
+    def _post_init_serializer(self):
+        pass
+
+    def predict_many(
+        self,
+        data: Iterable[Any],
+        concurrency: int = 8,
+        ordered: bool = True,
+        return_exceptions: bool = True,
+    ) -> Iterator[Any]:
+        """Make predictions for a stream of input data concurrently.
+
+        Input data is consumed lazily from the iterable, and at most `concurrency`
+        prediction requests are in flight at any time, so the whole dataset is never
+        materialized in memory.
+
+        Examples::
+
+            for result in predictor.predict_many(read_rows(), concurrency=16):
+                if isinstance(result, Exception):
+                    ...
 
+        Args:
+            data (Iterable[Any]): An iterable of the input data, each item is sent
+                as the input data of a prediction request.
+            concurrency (int): The maximum number of prediction requests in flight
+                (Default 8).
+            ordered (bool): If True, results are yielded in the order of the input
+                data, otherwise results are yielded as they complete, as tuples of
+                (index of the input data, result) (Default True).
+            return_exceptions (bool): If True, the exception raised by a prediction
+                call is yielded in place of its result, otherwise the exception is
+                raised and the iteration stops (Default True).
+
+        Returns:
+            Iterator[Any]: An iterator over the prediction results.
+        """
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive integer.")
+        self._post_init_serializer()
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        items = enumerate(data)
+        pending = collections.deque()
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < concurrency:
+                    try:
+                        idx, item = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending.append((idx, executor.submit(self.predict, item)))
+                if not pending:
+                    return
+
+                if ordered:
+                    done = [pending.popleft()]
+                else:
+                    wait([f for _, f in pending], return_when=FIRST_COMPLETED)
+                    done = [(idx, f) for idx, f in pending if f.done()]
+                    pending = collections.deque(
+                        (idx, f) for idx, f in pending if not f.done()
+                    )
+                for idx, future in done:
+                    error = future.exception()
+                    if error is not None and not return_exceptions:
+                        raise error
+                    result = error if error is not None else future.result()
+                    yield result if ordered else (idx, result)
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    async def predict_many_async(
+        self,
+        data: Union[Iterable[Any], AsyncIterable[Any]],
+        concurrency: int = 8,
+        ordered: bool = True,
+        return_exceptions: bool = True,
+    ) -> AsyncIterator[Any]:
+        """Make predictions for a stream of input data concurrently using async API.
+
+        It is the asyncio counterpart of :meth:`predict_many`, the input data could
+        be an iterable or an async iterable.
+
+        Examples::
+
+            async for result in predictor.predict_many_async(rows, concurrency=64):
+                ...
+
+        Args:
+            data (Union[Iterable[Any], AsyncIterable[Any]]): An iterable or async
+                iterable of the input data.
+            concurrency (int): The maximum number of prediction requests in flight
+                (Default 8).
+            ordered (bool): If True, results are yielded in the order of the input
+                data, otherwise results are yielded as they complete, as tuples of
+                (index of the input data, result) (Default True).
+            return_exceptions (bool): If True, the exception raised by a prediction
+                call is yielded in place of its result, otherwise the exception is
+                raised and the iteration stops (Default True).
+
+        Returns:
+            AsyncIterator[Any]: An async iterator over the prediction results.
+        """
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive integer.")
 
-class Predictor(PredictorBase, _ServicePredictorMixin):
+        if isinstance(data, AsyncIterable):
+            items = data.__aiter__()
+        else:
+
+            async def _aiter():
+                for item in data:
+                    yield item
+
+            items = _aiter()
+
+        idx = 0
+        pending = collections.deque()
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < concurrency:
+                    try:
+                        item = await items.__anext__()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    task = asyncio.ensure_future(self.predict_async(item))
+                    pending.append((idx, task))
+                    idx += 1
+                if not pending:
+                    return
+
+                if ordered:
+                    done = [pending.popleft()]
+                    await asyncio.wait([done[0][1]])
+                else:
+                    await asyncio.wait(
+                        [t for _, t in pending], return_when=asyncio.FIRST_COMPLETED
+                    )
+                    done = [(i, t) for i, t in pending if t.done()]
+                    pending = collections.deque(
+                        (i, t) for i, t in pending if not t.done()
+                    )
+                for i, task in done:
+                    error = task.exception()
+                    if error is not None and not return_exceptions:
+                        raise error
+                    result = error if error is not None else task.result()
+                    yield result if ordered else (i, result)
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+
+class Predictor(PredictorBase, _ServicePredictorMixin, _BulkPredictionMixin):
     """Predictor is responsible for making prediction to an online service.
 
     The `predictor.predict` method sends the input data to the online prediction service
@@ -618,32 +3022,85 @@ class Predictor(PredictorBase, _ServicePredictorMixin):
         endpoint_type: str = EndpointType.INTERNET,
         serializer: Optional[SerializerBase] = None,
         session: Optional[Session] = None,
+        connection_config: Optional[ConnectionConfig] = None,
+        batch_config: Optional[BatchConfig] = None,
+        service_descriptor: Optional[Dict[str, Any]] = None,
+        retry_config: Optional[RetryConfig] = None,
+        load_balancer_config: Optional[LoadBalancerConfig] = None,
+        concurrency_limiter: Optional[ConcurrencyLimiter] = None,
+        compression_config: Optional[CompressionConfig] = None,
     ):
         """Construct a `Predictor` object using an existing prediction service.
 
         Args:
             service_name (str): Name of the existing prediction service.
             endpoint_type (str): Selects the endpoint used by the predictor, which
-                should be one of `INTERNET` or `INTRANET`. The `INTERNET` endpoint type
-                means that the predictor calls the service over a public endpoint, while
-                the `INTRANET` endpoint type is over a VPC endpoint.
+                should be one of `INTERNET`, `INTRANET` or `DIRECT`. The `INTERNET`
+                endpoint type means that the predictor calls the service over a public
+                endpoint, the `INTRANET` endpoint type is over a VPC endpoint, while
+                the `DIRECT` endpoint type sends requests directly to the service
+                instances from the VPC, with client-side load balancing.
             serializer (SerializerBase, optional): A serializer object that transforms
                 the input Python object for data transmission and deserialize the
                 response data to Python object.
             session (Session, optional): A PAI session object used for communicating
                 with PAI service.
+            connection_config (ConnectionConfig, optional): Config of the connection
+                pools used by the predictor.
+            batch_config (BatchConfig, optional): If provided, concurrent `predict`
+                calls are coalesced into batched prediction requests.
+            service_descriptor (Dict[str, Any], optional): The service descriptor
+                (response of the DescribeService API) used to construct the predictor.
+                If not provided, the descriptor is fetched from the shared
+                `service_descriptor_cache` or the DescribeService API.
+            retry_config (RetryConfig, optional): Retry and hedging policy of the
+                requests sent by the predictor. If not provided, failed requests are
+                not retried.
+            load_balancer_config (LoadBalancerConfig, optional): Client-side load
+                balancing policy used by the `DIRECT` endpoint type.
+            concurrency_limiter (ConcurrencyLimiter, optional): If provided, the
+                number of in-flight requests sent by the predictor is bounded by the
+                limiter, excess calls are queued or shed client-side.
+            compression_config (CompressionConfig, optional): If provided, large
+                request bodies are compressed, and compressed responses are accepted.
         """
         super(Predictor, self).__init__(
             service_name=service_name,
             session=session or get_default_session(),
             endpoint_type=endpoint_type,
             serializer=serializer,
+            connection_config=connection_config,
+            service_descriptor=service_descriptor,
+            retry_config=retry_config,
+            load_balancer_config=load_balancer_config,
+            concurrency_limiter=concurrency_limiter,
+            compression_config=compression_config,
+        )
+        self._batcher = (
+            _MicroBatcher(
+                predict_fn=self._predict_fn,
+                serializer=self.serializer,
+                batch_config=batch_config,
+            )
+            if batch_config
+            else None
         )
         self._check()
 
+    def __del__(self):
+        if getattr(self, "_batcher", None):
+            self._batcher.close()
+        super(Predictor, self).__del__()
+
+    def close(self):
+        """Release the resources used by the predictor, the batched prediction calls
+        that are queued are still flushed."""
+        if self._batcher:
+            self._batcher.close()
+        super(Predictor, self).close()
+
     def _check(self):
-        config = json.loads(self._service_api_object["ServiceConfig"])
-        if config.get("metadata", {}).get("type") == ServiceType.Async:
+        if self._service_config.get("metadata", {}).get("type") == ServiceType.Async:
             logger.warning(
                 "Predictor is not recommended to make prediction to a async"
                 " prediction service."
@@ -671,15 +3128,74 @@ class Predictor(PredictorBase, _ServicePredictorMixin):
                 not equal 2xx.
         """
         self._post_init_serializer()
+        if self._batcher:
+            return self._batcher.submit(data).result()
+        return self._predict_fn(data)
+
+    def _predict_fn(self, data):
+        timer = self._start_timer()
         data = self._handle_input(data)
-        resp = self._send_request(
-            data,
-        )
+        if not timer:
+            resp = self._send_request(data, headers=self._serializer_headers())
+        else:
+            timer.mark("serialize")
+            resp = self._send_request(
+                data,
+                headers=self._serializer_headers(),
+                hooks={"response": timer.on_headers},
+            )
+            timer.mark_response()
         if resp.status_code // 100 != 2:
             raise PredictionException(resp.status_code, resp.content)
-        return self._handle_output(
-            resp.content,
+        result = self._handle_output(
+            resp.content, content_type=resp.headers.get("Content-Type")
+        )
+        if timer:
+            timer.mark("deserialize")
+            timer.finish()
+        return result
+
+    async def predict_async(self, data):
+        """Make a prediction with the online prediction service using async API.
+
+        Args:
+            data: The input data for the prediction. It will be serialized using the
+                serializer of the predictor before transmitted to the prediction
+                service.
+
+        Returns:
+            object: Prediction result.
+
+        Raises:
+            PredictionException: Raise if status code of the prediction response does
+                not equal 2xx.
+        """
+        self._post_init_serializer()
+        timer = self._start_timer()
+        data = self._handle_input(data)
+        if not timer:
+            resp = await self._send_request_async(
+                data=data, headers=self._serializer_headers()
+            )
+            content = await resp.read()
+        else:
+            timer.mark("serialize")
+            resp = await self._send_request_async(
+                data=data, headers=self._serializer_headers(), trace_request_ctx=timer
+            )
+            timer.mark_headers()
+            content = await resp.read()
+            timer.mark("download")
+        if resp.status // 100 != 2:
+            raise PredictionException(resp.status, content)
+        self._record_response_compression(resp.headers, content)
+        result = self._handle_output(
+            content, content_type=resp.headers.get("Content-Type")
         )
+        if timer:
+            timer.mark("deserialize")
+            timer.finish()
+        return result
 
     def raw_predict(
         self,
@@ -688,8 +3204,9 @@ class Predictor(PredictorBase, _ServicePredictorMixin):
         headers: Optional[Dict[str, str]] = None,
         method: str = "POST",
         timeout: Optional[Union[float, Tuple[float, float]]] = None,
+        stream: bool = False,
         **kwargs,
-    ) -> RawResponse:
+    ) -> Union[RawResponse, StreamingRawResponse]:
         """Make a prediction with the online prediction service.
 
         Args:
@@ -703,15 +3220,20 @@ class Predictor(PredictorBase, _ServicePredictorMixin):
             method (str, optional): Request method, default to 'POST'.
             timeout(float, tuple(float, float), optional): Timeout setting for the
                 request (Default 10).
+            stream (bool): If True, returns a :class:`StreamingRawResponse` without
+                reading the response body, which could be iterated by chunks or
+                server-sent events as they arrive (Default False).
             **kwargs: Additional keyword arguments for the request.
         Returns:
-            RawResponse: Prediction response from the service.
+            Union[RawResponse, StreamingRawResponse]: Prediction response from the
+                service.
 
         Raises:
             PredictionException: Raise if status code of the prediction response does
                 not equal 2xx.
         """
         json_data, data = self._handle_raw_input(data)
+        start_time = time.perf_counter()
         resp = self._send_request(
             data=data,
             json=json_data,
@@ -719,11 +3241,14 @@ class Predictor(PredictorBase, _ServicePredictorMixin):
             path=path,
             headers=headers,
             timeout=timeout,
+            stream=stream,
             **kwargs,
         )
         if resp.status_code // 100 != 2:
             raise PredictionException(resp.status_code, resp.content)
 
+        if stream:
+            return StreamingRawResponse(resp, start_time=start_time)
         resp = RawResponse(
             status_code=resp.status_code,
             content=resp.content,
@@ -731,6 +3256,61 @@ class Predictor(PredictorBase, _ServicePredictorMixin):
         )
         return resp
 
+    async def raw_predict_async(
+        self,
+        data: Any = None,
+        path: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        method: str = "POST",
+        stream: bool = False,
+        **kwargs,
+    ) -> Union[RawResponse, AsyncStreamingRawResponse]:
+        """Make a prediction with the online prediction service using async API.
+
+        Args:
+            data (Any): Input data to be sent to the prediction service. If it is a
+                file-like object, bytes, or string, it will be sent as the request body.
+                Otherwise, it will be treated as a JSON serializable object and sent as
+                JSON.
+            path (str, optional): Path for the request to be sent to. If it is provided,
+                it will be appended to the endpoint URL (Default None).
+            headers (dict, optional): Request headers.
+            method (str, optional): Request method, default to 'POST'.
+            stream (bool): If True, returns a :class:`AsyncStreamingRawResponse`
+                without reading the response body (Default False).
+            **kwargs: Additional keyword arguments for the request.
+        Returns:
+            Union[RawResponse, AsyncStreamingRawResponse]: Prediction response from
+                the service.
+
+        Raises:
+            PredictionException: Raise if status code of the prediction response does
+                not equal 2xx.
+        """
+        json_data, data = self._handle_raw_input(data)
+        start_time = time.perf_counter()
+        resp = await self._send_request_async(
+            data=data,
+            json=json_data,
+            method=method,
+            path=path,
+            headers=headers,
+            stream=stream,
+            **kwargs,
+        )
+        if resp.status // 100 != 2:
+            raise PredictionException(resp.status, await resp.read())
+
+        if stream:
+            return AsyncStreamingRawResponse(resp, start_time=start_time)
+        content = await resp.read()
+        self._record_response_compression(resp.headers, content)
+        return RawResponse(
+            status_code=resp.status,
+            content=content,
+            headers=dict(resp.headers),
+        )
+
     def openai(self, url_suffix: str = "v1", **kwargs) -> "OpenAI":
         """Initialize an OpenAI client from the predictor.
 
@@ -764,13 +3344,323 @@ class Predictor(PredictorBase, _ServicePredictorMixin):
 
 class WaitConfig(object):
     """WaitConfig is used to set polling configurations for waiting for asynchronous
-    requests to complete."""
+    requests to complete.
+
+    By default, the result is polled at a fixed `interval`. If `min_interval` is
+    provided, the polling interval starts from `min_interval` and grows
+    exponentially with jitter, up to `interval`. If `adaptive` is True, the first
+    poll is delayed until shortly before the completion time estimated from the
+    recent requests of the predictor.
+
+    Examples::
+
+        # Poll the result with exponential backoff from 100ms up to 5s, and give up
+        # after 10 minutes.
+        wait_config = WaitConfig(min_interval=0.1, interval=5, timeout=600)
+        result = await async_predictor.predict_async(data, wait_config=wait_config)
+
+    """
+
+    # Ratio of the estimated completion time that the first poll is delayed by in
+    # the adaptive mode. The observed completion times are upper bounds of the real
+    # ones, polling earlier keeps the estimate from drifting upwards.
+    _ADAPTIVE_DELAY_RATIO = 0.8
+
+    def __init__(
+        self,
+        max_attempts: int = 0,
+        interval: float = 5,
+        min_interval: Optional[float] = None,
+        multiplier: float = 2,
+        jitter: float = 0.1,
+        adaptive: bool = False,
+        timeout: Optional[float] = None,
+    ):
+        """WaitConfig initializer.
 
-    def __init__(self, max_attempts: int = 0, interval: int = 5):
+        Args:
+            max_attempts (int): The maximum number of polls, 0 means no limit
+                (Default 0).
+            interval (float): Seconds between the polls, or the maximum seconds
+                between the polls if `min_interval` is provided (Default 5).
+            min_interval (float, optional): If provided, the seconds between the
+                polls start from `min_interval` and grow exponentially.
+            multiplier (float): The growth factor of the interval (Default 2).
+            jitter (float): The interval is randomized by the given ratio to
+                spread the polls of concurrent requests (Default 0.1).
+            adaptive (bool): Whether to delay the first poll by the completion time
+                estimated from the recent requests (Default False).
+            timeout (float, optional): The maximum seconds to wait for the result.
+        """
         if interval <= 0:
             raise ValueError("interval must be positive integer.")
+        if min_interval is not None and not 0 < min_interval <= interval:
+            raise ValueError("min_interval must be in range (0, interval].")
+        if multiplier < 1:
+            raise ValueError("multiplier must not be less than 1.")
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be in range [0, 1).")
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout must be positive.")
         self.max_attempts = max_attempts
         self.interval = interval
+        self.min_interval = min_interval
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.adaptive = adaptive
+        self.timeout = timeout
+
+    def intervals(self, estimate: Optional[float] = None) -> Iterator[float]:
+        """Yields the seconds to wait before each poll.
+
+        Args:
+            estimate (float, optional): The estimated completion time of the request,
+                used to delay the first poll in the adaptive mode.
+        """
+        if self.adaptive and estimate:
+            yield estimate * self._ADAPTIVE_DELAY_RATIO
+        else:
+            yield 0
+        if self.min_interval is None:
+            while True:
+                yield self.interval
+        interval = self.min_interval
+        while True:
+            yield min(
+                self.interval,
+                interval * random.uniform(1 - self.jitter, 1 + self.jitter),
+            )
+            interval = min(self.interval, interval * self.multiplier)
+
+
+async def _new_semaphore(value: int) -> asyncio.Semaphore:
+    # Semaphore should be created in the event loop it is used in.
+    return asyncio.Semaphore(value)
+
+
+async def _cancel_tasks(tasks: Set[asyncio.Task]):
+    tasks = list(tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class PayloadOffloadConfig(object):
+    """PayloadOffloadConfig is used to offload the large payloads of the async
+    prediction requests to OSS.
+
+    A request payload larger than `threshold` is uploaded to OSS under `oss_path`,
+    and a JSON document `{"payload_uri": "oss://<bucket>/<key>"}` referencing it is
+    sent through the queue instead. The prediction service should resolve the
+    reference, and it may return a result reference in the same format, which is
+    fetched from OSS by the predictor.
+
+    The uploaded request payload is deleted once the result of the request is
+    retrieved. It is kept if the request fails before that, e.g. polling the result
+    times out or is cancelled, since the queued request may still be processed by
+    the service. Configure an OSS lifecycle rule on `oss_path` to expire these
+    payloads.
+
+    Examples::
+
+        predictor = AsyncPredictor(
+            "example_service",
+            offload_config=PayloadOffloadConfig("oss://my-bucket/async-payloads/"),
+        )
+
+    """
+
+    def __init__(
+        self,
+        oss_path: Union[str, OssUriObj],
+        threshold: int = 1024 * 1024,
+        bucket: Optional[oss2.Bucket] = None,
+        delete_request_payload: bool = True,
+    ):
+        """PayloadOffloadConfig initializer.
+
+        Args:
+            oss_path (Union[str, OssUriObj]): The OSS path that the request payloads
+                are uploaded to.
+            threshold (int): Payloads larger than the given bytes are offloaded to
+                OSS (Default 1MiB).
+            bucket (oss2.Bucket, optional): OSS bucket used to store the payloads. If
+                it is not provided, OSS bucket of the default session will be used.
+            delete_request_payload (bool): Whether to delete the uploaded request
+                payload after the result of the request is retrieved, the payload of
+                a request whose result is not retrieved is always kept
+                (Default True).
+        """
+        if threshold < 0:
+            raise ValueError("threshold must be non-negative integer.")
+        self.oss_path = oss_path
+        self.threshold = threshold
+        self.bucket = bucket
+        self.delete_request_payload = delete_request_payload
+
+    def _resolve(self, oss_path: str):
+        if not is_oss_uri(oss_path):
+            return oss_path, self.bucket
+        uri_obj = OssUriObj(oss_path)
+        if self.bucket and self.bucket.bucket_name == uri_obj.bucket_name:
+            return uri_obj.object_key, self.bucket
+        return uri_obj, None
+
+    def upload(self, data: bytes) -> str:
+        """Upload the payload to OSS, returns the OSS URI of the payload."""
+        oss_path = self.oss_path
+        if isinstance(oss_path, OssUriObj):
+            oss_path = oss_path.uri
+        oss_path, bucket = self._resolve(posixpath.join(oss_path, uuid.uuid4().hex))
+        return put_object(data, oss_path, bucket=bucket)
+
+    def open(self, uri: str):
+        """Open the payload in OSS for streaming read."""
+        oss_path, bucket = self._resolve(uri)
+        return get_object(oss_path, bucket=bucket)
+
+    def delete(self, uri: str):
+        """Delete the payload in OSS."""
+        oss_path, bucket = self._resolve(uri)
+        delete_object(oss_path, bucket=bucket)
+
+    @classmethod
+    def make_reference(cls, uri: str) -> bytes:
+        return json.dumps({_PAYLOAD_URI_KEY: uri}).encode()
+
+    @classmethod
+    def parse_reference(cls, content: bytes) -> Optional[str]:
+        """Returns the OSS URI if the content is a payload reference."""
+        # Payload reference is a small JSON document.
+        if not content or len(content) > 4096 or not content.lstrip().startswith(b"{"):
+            return
+        try:
+            data = json.loads(content)
+        except ValueError:
+            return
+        if isinstance(data, dict) and list(data.keys()) == [_PAYLOAD_URI_KEY]:
+            uri = data[_PAYLOAD_URI_KEY]
+            return uri if is_oss_uri(uri) else None
+
+
+class _AsyncPredictionEngine(object):
+    """A background event loop that runs the prediction calls submitted to an
+    AsyncPredictor.
+
+    All the outstanding calls, including the polling of their results, are
+    multiplexed on the event loop of a single thread, and the concurrent HTTP calls
+    made by them are bounded by `max_concurrency`. The callbacks of the calls run in
+    a separate thread pool, so that a slow or blocking callback does not stall the
+    event loop.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._callback_executor: Optional[ThreadPoolExecutor] = None
+        self._callback_local = threading.local()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop:
+                return self._loop
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                # Semaphore should be created in the event loop it is used in.
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                ready.set()
+                try:
+                    loop.run_forever()
+                finally:
+                    loop.run_until_complete(loop.shutdown_asyncgens())
+                    loop.close()
+
+            self._thread = threading.Thread(
+                target=run, name="AsyncPredictionEngine", daemon=True
+            )
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+            return loop
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        return self._semaphore
+
+    def in_engine(self) -> bool:
+        """Whether the caller is running in the event loop of the engine."""
+        try:
+            return self._loop is not None and asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def submit(self, coro) -> Future:
+        """Run the coroutine in the engine, returns a future of its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_started())
+
+    def add_done_callback(self, future: Future, fn: Callable[[Future], Any]):
+        """Call the function with the future once it is done, in the callback thread
+        pool instead of the thread of the event loop."""
+        with self._lock:
+            if self._callback_executor is None:
+                self._callback_executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency,
+                    thread_name_prefix="AsyncPredictionCallback",
+                )
+            executor = self._callback_executor
+
+        def _run_callback(f: Future):
+            self._callback_local.in_callback = True
+            return fn(f)
+
+        future.add_done_callback(lambda f: executor.submit(_run_callback, f))
+
+    def close(self, wait: bool = True, cleanup: Optional[Callable] = None):
+        """Stop the event loop of the engine.
+
+        Args:
+            wait (bool): Whether to wait for the outstanding calls to complete.
+            cleanup (Callable, optional): A coroutine function run in the event loop
+                before it stops, such as closing the connections.
+        """
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+            executor, self._callback_executor = self._callback_executor, None
+        try:
+            if not loop:
+                return
+            if threading.current_thread() is thread:
+                loop.stop()
+                return
+
+            async def shutdown():
+                if wait:
+                    tasks = [
+                        t
+                        for t in asyncio.all_tasks()
+                        if t is not asyncio.current_task()
+                    ]
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                if cleanup:
+                    await cleanup()
+
+            asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+        finally:
+            # The callback thread could not be joined by the callback itself.
+            if executor:
+                executor.shutdown(
+                    wait=wait
+                    and not getattr(self._callback_local, "in_callback", False)
+                )
 
 
 class AsyncTask(object):
@@ -814,6 +3704,185 @@ class AsyncTask(object):
         return self.future.cancelled()
 
 
+class _SubmitCheckpoint(object):
+    """An append-only JSON lines journal of the requests submitted by
+    `AsyncPredictor.submit_many`, which records the request id of each submitted
+    input and the inputs whose results have been collected."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.submitted: Dict[int, str] = {}
+        self.completed: Set[int] = set()
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # The last line may be partially written if the producer is
+                        # interrupted.
+                        continue
+                    if record.get("completed"):
+                        self.completed.add(record["index"])
+                    else:
+                        self.submitted[record["index"]] = record["request_id"]
+        self._lock = threading.Lock()
+        self._file = open(path, "a")
+
+    def _write(self, record: Dict[str, Any]):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+
+    def record_submitted(self, index: int, request_id: str):
+        self._write({"index": index, "request_id": request_id})
+
+    def record_completed(self, index: int):
+        self._write({"index": index, "completed": True})
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class _SinkResultTracker(object):
+    """Tracks the outstanding requests of an AsyncPredictor in an event loop, and
+    retrieves their results from the sink queue of the service in bulk.
+
+    A single polling task reads the sink queue in pages from a cursor, routes the
+    results to the futures of the outstanding requests by the request id, and
+    deletes the consumed results from the queue. Results of the requests that are
+    not tracked, such as the requests sent by other clients, are left in the queue.
+    The recent untracked results are also kept in a bounded buffer, because the
+    result of a request could arrive before the request is tracked. If the queue
+    service does not support reading by index, the results of the
+    outstanding requests are polled by request id.
+    """
+
+    def __init__(
+        self,
+        predictor: "AsyncPredictor",
+        batch_size: int,
+        min_interval: float = 0.05,
+        max_interval: float = 1,
+        max_untracked: int = 1024,
+    ):
+        # Polling task holds a weak reference, the tracker is owned by the predictor.
+        self._predictor = weakref.proxy(predictor)
+        self.batch_size = batch_size
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_untracked = max_untracked
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._untracked: Dict[str, Dict[str, Any]] = collections.OrderedDict()
+        self._cursor = 0
+        self._by_index = True
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def outstanding(self) -> int:
+        """Number of the outstanding requests."""
+        return len(self._futures)
+
+    def track(self, request_id: str) -> asyncio.Future:
+        """Track the request, returns a future of its encapsulated result."""
+        future = asyncio.get_running_loop().create_future()
+        item = self._untracked.pop(request_id, None)
+        if item is not None:
+            # The result arrived before the request is tracked.
+            future.set_result(self._predictor._parse_encapsulated_response(item))
+            asyncio.ensure_future(self._delete_results([item["index"]]))
+            return future
+        self._futures[request_id] = future
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return future
+
+    def untrack(self, request_id: str):
+        self._futures.pop(request_id, None)
+
+    async def _run(self):
+        interval = self.min_interval
+        while self._futures:
+            try:
+                if self._by_index:
+                    count = await self._poll_by_index()
+                else:
+                    count = await self._poll_by_request_id()
+            except Exception as e:
+                logger.warning("Failed to retrieve the prediction results: %s", e)
+                count = 0
+            if count >= self.batch_size:
+                # More results are available, read the next page immediately.
+                continue
+            interval = (
+                self.min_interval if count else min(self.max_interval, interval * 2)
+            )
+            if self._futures:
+                await asyncio.sleep(interval)
+
+    def _resolve(self, request_id: str, result) -> bool:
+        future = self._futures.pop(request_id, None)
+        if future is None or future.done():
+            return False
+        future.set_result(result)
+        return True
+
+    async def _poll_by_index(self) -> int:
+        items = await self._predictor._get_results_async(
+            index=self._cursor, length=self.batch_size
+        )
+        if items is None:
+            logger.info(
+                "Reading the sink queue by index is not supported, poll the"
+                " prediction results by request id."
+            )
+            self._by_index = False
+            return 0
+        consumed = []
+        for item in items:
+            self._cursor = max(self._cursor, int(item["index"]) + 1)
+            request_id = item.get("tags", {}).get("requestId")
+            if request_id in self._futures:
+                if self._resolve(
+                    request_id, self._predictor._parse_encapsulated_response(item)
+                ):
+                    consumed.append(item["index"])
+            elif request_id:
+                self._untracked[request_id] = item
+                while len(self._untracked) > self.max_untracked:
+                    self._untracked.popitem(last=False)
+        if consumed:
+            await self._predictor._delete_results_async(consumed)
+        return len(items)
+
+    async def _delete_results(self, indexes: List[str]):
+        try:
+            await self._predictor._delete_results_async(indexes)
+        except Exception as e:
+            logger.warning("Failed to delete the prediction results: %s", e)
+
+    async def _poll_by_request_id(self) -> int:
+        request_ids = list(self._futures)
+        results = await asyncio.gather(
+            *[self._predictor._get_result_async(rid) for rid in request_ids],
+            return_exceptions=True,
+        )
+        count = 0
+        for request_id, result in zip(request_ids, results):
+            if isinstance(result, Exception):
+                logger.warning(
+                    "Failed to retrieve the prediction result: request_id=%s %s",
+                    request_id,
+                    result,
+                )
+            elif result and self._resolve(request_id, result):
+                count += 1
+        return count
+
+
 class AsyncPredictor(PredictorBase, _ServicePredictorMixin):
     """A class that facilitates making predictions to asynchronous prediction service.
 
@@ -830,6 +3899,15 @@ class AsyncPredictor(PredictorBase, _ServicePredictorMixin):
         import asyncio
         result = asyncio.run(async_predictor.predict_async(data="YourPredictionData"))
 
+        # Connections used by the async API are pooled, use the predictor as an
+        # async context manager to release them when done.
+        async def predict_many(items):
+            async with async_predictor:
+                return await asyncio.gather(
+                    *[async_predictor.predict_async(item) for item in items]
+                )
+
+
     """
 
     def __init__(
@@ -839,13 +3917,22 @@ class AsyncPredictor(PredictorBase, _ServicePredictorMixin):
         endpoint_type: str = EndpointType.INTERNET,
         serializer: Optional[SerializerBase] = None,
         session: Optional[Session] = None,
+        connection_config: Optional[ConnectionConfig] = None,
+        service_descriptor: Optional[Dict[str, Any]] = None,
+        retry_config: Optional[RetryConfig] = None,
+        concurrency_limiter: Optional[ConcurrencyLimiter] = None,
+        result_batch_size: Optional[int] = None,
+        offload_config: Optional[PayloadOffloadConfig] = None,
+        compression_config: Optional[CompressionConfig] = None,
     ):
         """Construct a `AsyncPredictor` object using an existing async prediction service.
 
         Args:
             service_name (str): Name of the existing prediction service.
-            max_workers (int): The maximum number of threads that can be used to
-                execute the given prediction calls.
+            max_workers (int): The maximum number of concurrent HTTP calls made by
+                the prediction calls submitted by `predict` and `raw_predict`, which
+                run in a background event loop. The number of outstanding prediction
+                calls is not limited (Default 30).
             endpoint_type (str): Selects the endpoint used by the predictor, which
                 should be one of `INTERNET` or `INTRANET`. The `INTERNET` endpoint type
                 means that the predictor calls the service over a public endpoint, while
@@ -855,78 +3942,110 @@ class AsyncPredictor(PredictorBase, _ServicePredictorMixin):
                 response data to Python object.
             session (Session, optional): A PAI session object used for communicating
                 with PAI service.
+            connection_config (ConnectionConfig, optional): Config of the connection
+                pools used by the predictor.
+            service_descriptor (Dict[str, Any], optional): The service descriptor
+                (response of the DescribeService API) used to construct the predictor.
+                If not provided, the descriptor is fetched from the shared
+                `service_descriptor_cache` or the DescribeService API.
+            retry_config (RetryConfig, optional): Retry and hedging policy of the
+                requests sent by the predictor. If not provided, failed requests are
+                not retried.
+            concurrency_limiter (ConcurrencyLimiter, optional): If provided, the
+                number of in-flight requests sent by the predictor is bounded by the
+                limiter, excess calls are queued or shed client-side.
+            result_batch_size (int, optional): If provided, the results of the
+                outstanding requests are retrieved from the sink queue in bulk, up to
+                the given number of results per request, by a polling task shared by
+                the outstanding requests, instead of polling the result of each
+                request separately. The polling intervals in `WaitConfig` are not
+                used in this mode, while `timeout` and `max_attempts * interval` are
+                still used as the deadline of a request.
+            offload_config (PayloadOffloadConfig, optional): If provided, request
+                payloads larger than the threshold are uploaded to OSS and a reference
+                to the OSS object is sent instead, and results returned as a
+                reference are fetched from OSS.
+            compression_config (CompressionConfig, optional): If provided, large
+                request bodies are compressed, and compressed responses are accepted.
         """
 
+        if endpoint_type == EndpointType.DIRECT:
+            raise ValueError(
+                "AsyncPredictor does not support the DIRECT endpoint type, requests"
+                " are sent to the queue service of the async prediction service."
+            )
         super(AsyncPredictor, self).__init__(
             service_name=service_name,
             session=session or get_default_session(),
             endpoint_type=endpoint_type,
             serializer=serializer,
+            connection_config=connection_config,
+            service_descriptor=service_descriptor,
+            retry_config=retry_config,
+            concurrency_limiter=concurrency_limiter,
+            compression_config=compression_config,
+        )
+        self._engine = _AsyncPredictionEngine(
+            max_concurrency=max_workers or _DEFAULT_ASYNC_WORKER_COUNT
         )
-        self._max_workers = max_workers
-        self.executor = ThreadPoolExecutor(max_workers=self._max_workers)
+        # Time from the submission of the recent requests to the retrieval of their
+        # results.
+        self._completion_times = _LatencyWindow(size=100, refresh_interval=10)
+        if result_batch_size is not None and result_batch_size <= 0:
+            raise ValueError("result_batch_size must be positive integer.")
+        self._result_batch_size = result_batch_size
+        self._result_trackers: Dict[asyncio.AbstractEventLoop, _SinkResultTracker] = {}
+        self.offload_config = offload_config
         self._check()
 
     @property
-    def max_workers(self):
-        return self._max_workers
+    def max_workers(self) -> int:
+        """The maximum number of concurrent HTTP calls made by the `predict` and
+        `raw_predict` calls."""
+        return self._engine.max_concurrency
 
     @max_workers.setter
     def max_workers(self, n: int):
-        if hasattr(self, "executor"):
+        if hasattr(self, "_engine"):
             logger.info("Waiting for all submitted tasks in the queue to complete...")
-            self.executor.shutdown()
-        self._max_workers = n
-        self.executor = ThreadPoolExecutor(max_workers=self._max_workers)
+            self._engine.close(cleanup=self.aclose)
+        self._engine = _AsyncPredictionEngine(max_concurrency=n)
+
+    def close(self):
+        """Wait for all the submitted tasks to complete and release the resources
+        used by the predictor."""
+        self._engine.close(cleanup=self.aclose)
+        super(AsyncPredictor, self).close()
 
     def __del__(self):
         """wait for all pending tasks to complete before exit."""
-        if hasattr(self, "executor"):
+        if hasattr(self, "_engine"):
             logger.info("Waiting for all pending tasks to complete...")
-            self.executor.shutdown()
+            self._engine.close(cleanup=self.aclose)
         super(AsyncPredictor, self).__del__()
 
+    async def _send_request_once_async(self, **kwargs) -> aiohttp.ClientResponse:
+        if not self._engine.in_engine():
+            return await super(AsyncPredictor, self)._send_request_once_async(**kwargs)
+        # HTTP calls made by the tasks running in the engine are bounded by
+        # max_workers, the response body is read before the semaphore is released,
+        # it is cached by the response for the caller.
+        async with self._engine.semaphore:
+            resp = await super(AsyncPredictor, self)._send_request_once_async(**kwargs)
+            try:
+                await resp.read()
+            except BaseException:
+                resp.release()
+                raise
+            return resp
+
     def _check(self):
-        config = json.loads(self._service_api_object["ServiceConfig"])
-        if config.get("metadata", {}).get("type") != ServiceType.Async:
+        if self._service_config.get("metadata", {}).get("type") != ServiceType.Async:
             logger.warning(
                 "AsyncPredictor is not recommended to make prediction to a standard "
                 " prediction service."
             )
 
-    def _get_result(
-        self, request_id: str
-    ) -> Optional[Tuple[int, Dict[str, str], bytes]]:
-        resp = self._send_request(
-            method="GET",
-            path=_QUEUE_SERVICE_SINK_PATH,
-            params={
-                "requestId": request_id,
-                # _raw_ is false because we want to get the encapsulated prediction
-                # result in response body.
-                "_raw_": "false",
-            },
-        )
-        logger.debug(
-            "Poll prediction result: request_id=%s status_code=%s, content=%s",
-            request_id,
-            resp.status_code,
-            resp.content,
-        )
-        if resp.status_code == 204:
-            # Status code 204 means could not find prediction response for the specific
-            # request id.
-            return
-
-        # Raise exception if status code is not 2xx.
-        if resp.status_code // 100 != 2:
-            raise RuntimeError(
-                "Pulling prediction result failed: status_code={} content={}".format(
-                    resp.status_code, resp.content.decode("utf-8")
-                )
-            )
-        return self._parse_encapsulated_response(resp.json()[0])
-
     def _parse_encapsulated_response(self, data) -> Tuple[int, Dict[str, str], bytes]:
         tags = data["tags"]
         # If the status code from prediction service is not 200, a tag with
@@ -971,78 +4090,137 @@ class AsyncPredictor(PredictorBase, _ServicePredictorMixin):
         data = (await resp.json())[0]
         return self._parse_encapsulated_response(data)
 
-    def _poll_result(
-        self, request_id: str, wait_config: WaitConfig
-    ) -> Tuple[int, Dict[str, str], bytes]:
-        # if max_attempts is negative or zero, then wait forever
-        attempts = -1 if wait_config.max_attempts <= 0 else wait_config.max_attempts
-        while attempts != 0:
-            attempts -= 1
-            result = self._get_result(request_id=request_id)
-            if not result:
-                time.sleep(wait_config.interval)
-                continue
-            status_code, headers, content = result
-            # check real prediction response
-            if status_code // 100 != 2:
-                raise PredictionException(
-                    code=status_code,
-                    message=f"Prediction failed: status_code={status_code}"
-                    f" content={content.decode()}",
+    async def _get_results_async(
+        self, index: int, length: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Read the results in the sink queue from the given index, returns None if
+        reading by index is not supported."""
+        resp = await self._send_request_async(
+            method="GET",
+            path=_QUEUE_SERVICE_SINK_PATH,
+            params={
+                "_index_": str(index),
+                "_length_": str(length),
+                "_raw_": "false",
+                # Results of the requests not tracked by the predictor are kept.
+                "_auto_delete_": "false",
+            },
+        )
+        content = await resp.read()
+        if resp.status == 204:
+            return []
+        if resp.status // 100 == 4:
+            logger.debug(
+                "Read sink queue by index failed: status_code=%s content=%s",
+                resp.status,
+                content,
+            )
+            return
+        if resp.status // 100 != 2:
+            raise RuntimeError(
+                "Pulling prediction results failed: status_code={} content={}".format(
+                    resp.status, content.decode("utf-8")
                 )
-            return status_code, headers, content
+            )
+        return json.loads(content) if content else []
 
-        # Polling prediction result timeout.
-        raise RuntimeError(
-            f"Polling prediction result timeout: request_id={request_id}, "
-            f"total_time={wait_config.max_attempts * wait_config.interval}"
+    async def _delete_results_async(self, indexes: List[int]):
+        resp = await self._send_request_async(
+            method="DELETE",
+            path=_QUEUE_SERVICE_SINK_PATH,
+            params={"_indexes_": ",".join(str(idx) for idx in indexes)},
         )
+        content = await resp.read()
+        if resp.status // 100 != 2:
+            logger.warning(
+                "Delete prediction results failed: status_code=%s content=%s",
+                resp.status,
+                content,
+            )
 
-    async def _poll_result_async(
-        self, request_id, wait_config: WaitConfig
-    ) -> Tuple[int, Dict[str, str], bytes]:
-        # if max_attempts is negative or zero, then wait forever
-        attempts = -1 if wait_config.max_attempts <= 0 else wait_config.max_attempts
-        while attempts != 0:
-            attempts -= 1
-            result = await self._get_result_async(request_id)
-            if not result:
-                await asyncio.sleep(wait_config.interval)
-                continue
-            status_code, headers, content = result
-            # check real prediction response
-            if status_code // 100 != 2:
-                raise PredictionException(
-                    f"Prediction failed: status_code={status_code} content={content.decode()}"
-                )
-            return status_code, headers, content
+    def _get_result_tracker(self) -> _SinkResultTracker:
+        loop = asyncio.get_running_loop()
+        for closed_loop in [lp for lp in self._result_trackers if lp.is_closed()]:
+            self._result_trackers.pop(closed_loop)
+        tracker = self._result_trackers.get(loop)
+        if tracker is None:
+            tracker = _SinkResultTracker(self, batch_size=self._result_batch_size)
+            self._result_trackers[loop] = tracker
+        return tracker
+
+    async def _wait_tracked_result(
+        self, request_id: str, wait_config: WaitConfig
+    ) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        timeout = wait_config.timeout
+        if timeout is None and wait_config.max_attempts > 0:
+            timeout = wait_config.max_attempts * wait_config.interval
+        tracker = self._get_result_tracker()
+        try:
+            return await asyncio.wait_for(tracker.track(request_id), timeout)
+        except asyncio.TimeoutError:
+            return
+        finally:
+            tracker.untrack(request_id)
 
-        # Polling prediction result timeout.
-        raise RuntimeError(
-            f"Polling prediction result timeout: request_id={request_id}, "
-            f"total_time={wait_config.max_attempts * wait_config.interval}"
+    async def _wait_polled_result(
+        self, request_id: str, wait_config: WaitConfig
+    ) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        deadline = (
+            time.monotonic() + wait_config.timeout if wait_config.timeout else None
         )
+        attempts = 0
+        for interval in wait_config.intervals(self._estimate_completion_time()):
+            if deadline is not None:
+                interval = min(interval, deadline - time.monotonic())
+                if interval < 0:
+                    return
+            if interval > 0:
+                await asyncio.sleep(interval)
+            result = await self._get_result_async(request_id)
+            attempts += 1
+            if result:
+                return result
+            # if max_attempts is negative or zero, then wait forever
+            if 0 < wait_config.max_attempts <= attempts:
+                return
 
-    def _get_request_id(self, resp: requests.models.Response) -> str:
-        if resp.status_code // 100 != 2:
+    async def _poll_result_async(
+        self, request_id, wait_config: WaitConfig, payload_uri: Optional[str] = None
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """Poll the result of the request.
+
+        The offloaded request payload is deleted once the result is retrieved. It is
+        kept if the polling times out or is cancelled, because the request may still
+        be processed by the service.
+        """
+        start = time.monotonic()
+        if self._result_batch_size:
+            result = await self._wait_tracked_result(request_id, wait_config)
+        else:
+            result = await self._wait_polled_result(request_id, wait_config)
+        if not result:
+            # Polling prediction result timeout.
             raise RuntimeError(
-                f"Send prediction request failed. status_code={resp.status_code} "
-                f"message={resp.text}"
+                f"Polling prediction result timeout: request_id={request_id}, "
+                f"total_time={time.monotonic() - start:.3f}"
             )
-
-        if _QUEUE_SERVICE_REQUEST_ID_HEADER not in resp.headers:
-            logger.error(
-                f"Send prediction request failed. Missing request id."
-                f" status_code={resp.status_code} content={resp.text}"
+        self._completion_times.record(time.monotonic() - start)
+        await self._release_request_payload(payload_uri)
+        status_code, headers, content = result
+        # check real prediction response
+        if status_code // 100 != 2:
+            raise PredictionException(
+                code=status_code,
+                message=f"Prediction failed: status_code={status_code}"
+                f" content={content.decode()}",
             )
-            raise RuntimeError("Missing request id in response header.")
+        return status_code, headers, content
 
-        request_id = resp.headers[_QUEUE_SERVICE_REQUEST_ID_HEADER]
-        logger.debug(
-            f"Send prediction request successfully. request_id={request_id}"
-            f" status_code={resp.status_code}",
-        )
-        return request_id
+    def _estimate_completion_time(self) -> Optional[float]:
+        """Estimate the completion time of a request from the recent requests."""
+        if len(self._completion_times) < _MIN_COMPLETION_TIME_SAMPLES:
+            return
+        return self._completion_times.percentile(50)
 
     async def _get_request_id_async(self, resp: aiohttp.ClientResponse) -> str:
         content = await resp.read()
@@ -1065,23 +4243,6 @@ class AsyncPredictor(PredictorBase, _ServicePredictorMixin):
         )
         return request_id
 
-    def _predict_fn(
-        self,
-        data,
-    ):
-        """Make a prediction with the async prediction service."""
-        # serialize input data
-        data = self._handle_input(data)
-        resp = self._send_request(data=data)
-        request_id = self._get_request_id(resp)
-        logger.debug("Async prediction RequestId: ", request_id)
-        # poll prediction result
-        status, headers, content = self._poll_result(
-            request_id=request_id, wait_config=WaitConfig()
-        )
-
-        return self._handle_output(content)
-
     def _wrap_callback_fn(self, cb: Callable):
         """Wrap the callback function to handle the prediction result."""
 
@@ -1095,6 +4256,7 @@ class AsyncPredictor(PredictorBase, _ServicePredictorMixin):
         self,
         data,
         callback: Optional[Union[Callable, List[Callable]]] = None,
+        wait_config: Optional[WaitConfig] = None,
     ):
         """Make a prediction with the async prediction service.
 
@@ -1108,20 +4270,26 @@ class AsyncPredictor(PredictorBase, _ServicePredictorMixin):
                 service.
             callback (Union[Callable, List[Callable]], optional): A Callback function,
                 or a list of callback functions used to process the prediction result.
+                Callbacks are invoked in a thread pool of the predictor, apart from
+                the background event loop that sends the requests.
+            wait_config (WaitConfig, optional): A config object that controls the
+                behavior of polling the prediction result.
 
         Returns:
             AsyncTask: The task object that can be used to retrieve the prediction
                 result.
         """
         self._post_init_serializer()
-        future = self.executor.submit(self._predict_fn, data)
+        future = self._engine.submit(
+            self.predict_async(data, wait_config=wait_config or WaitConfig())
+        )
 
         if isinstance(callback, Callable):
             callback = [callback]
 
         if callback:
             for cb in callback:
-                future.add_done_callback(self._wrap_callback_fn(cb))
+                self._engine.add_done_callback(future, self._wrap_callback_fn(cb))
 
         return AsyncTask(future=future)
 
@@ -1146,30 +4314,191 @@ class AsyncPredictor(PredictorBase, _ServicePredictorMixin):
 
         """
         self._post_init_serializer()
+        timer = self._start_timer()
         data = self._handle_input(data)
-        resp = await self._send_request_async(data=data)
+        if timer:
+            timer.mark("serialize")
+        data, _, payload_uri = await self._offload_request(data)
+        kwargs = {}
+        if timer:
+            if payload_uri:
+                timer.mark("offload")
+            kwargs["trace_request_ctx"] = timer
+        resp = await self._send_request_async(
+            data=data,
+            headers=self._offloaded_headers(self._serializer_headers(), payload_uri),
+            idempotent=False,
+            **kwargs,
+        )
+        if timer:
+            timer.mark_headers()
         request_id = await self._get_request_id_async(resp)
+        if timer:
+            timer.mark("download")
 
         status_code, headers, content = await self._poll_result_async(
-            request_id=request_id, wait_config=wait_config
+            request_id=request_id, wait_config=wait_config, payload_uri=payload_uri
         )
-        return self._handle_output(content)
+        content = await self._fetch_offloaded_content(content)
+        if timer:
+            timer.mark("queue")
+        result = self._handle_output(content, content_type=headers.get("Content-Type"))
+        if timer:
+            timer.mark("deserialize")
+            timer.finish()
+        return result
+
+    def submit_many(
+        self,
+        data: Iterable[Any],
+        concurrency: int = 32,
+        ordered: bool = True,
+        return_exceptions: bool = True,
+        max_outstanding: int = 1000,
+        checkpoint: Optional[str] = None,
+        wait_config: Optional[WaitConfig] = None,
+    ) -> Iterator[Any]:
+        """Submit a stream of input data to the async prediction service, and
+        iterate over the prediction results.
+
+        Input data is consumed lazily from the iterable. The prediction requests are
+        sent by the background event loop of the predictor over pooled connections,
+        with at most `concurrency` requests being sent at any time, and at most
+        `max_outstanding` inputs whose results are not yet yielded.
+
+        If a checkpoint file is provided, the request ids of the submitted inputs
+        and the inputs whose results are yielded are persisted to the file. An
+        interrupted producer could resume by calling `submit_many` with the same
+        input data and checkpoint file: the inputs already submitted are not sent
+        again, their results are collected by the request ids, and the inputs whose
+        results have been yielded are skipped. Inputs being sent when the producer
+        is interrupted may be sent again.
+
+        Examples::
+
+            for idx, result in predictor.submit_many(
+                read_rows(), concurrency=64, ordered=False, checkpoint="ckpt.jsonl"
+            ):
+                ...
 
-    def _raw_predict_fn(self, data, method, path, headers, **kwargs):
-        json_data, data = self._handle_raw_input(data)
-        resp = self._send_request(
-            path=path,
-            json=json_data,
-            data=data,
-            headers=self._build_headers(headers),
-            method=method,
-            **kwargs,
-        )
-        request_id = self._get_request_id(resp)
-        status, headers, content = self._poll_result(
-            request_id, wait_config=WaitConfig()
-        )
-        return RawResponse(status, headers, content)
+        Args:
+            data (Iterable[Any]): An iterable of the input data, each item is sent
+                as the input data of a prediction request.
+            concurrency (int): The maximum number of prediction requests being sent
+                at any time (Default 32).
+            ordered (bool): If True, results are yielded in the order of the input
+                data, otherwise results are yielded as they complete, as tuples of
+                (index of the input data, result) (Default True).
+            return_exceptions (bool): If True, the exception raised by a prediction
+                call is yielded in place of its result, otherwise the exception is
+                raised and the iteration stops (Default True).
+            max_outstanding (int): The maximum number of submitted inputs whose
+                results are not yet yielded (Default 1000).
+            checkpoint (str, optional): Path of a local file that the submitted
+                request ids are persisted to.
+            wait_config (WaitConfig, optional): A config object that controls the
+                behavior of polling the prediction results.
+
+        Returns:
+            Iterator[Any]: An iterator over the prediction results.
+        """
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive integer.")
+        if max_outstanding <= 0:
+            raise ValueError("max_outstanding must be positive integer.")
+        self._post_init_serializer()
+        wait_config = wait_config or WaitConfig()
+        journal = _SubmitCheckpoint(checkpoint) if checkpoint else None
+        semaphore = self._engine.submit(_new_semaphore(concurrency)).result()
+        running = set()
+        items = enumerate(data)
+        pending = collections.deque()
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < max_outstanding:
+                    try:
+                        idx, item = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if journal and idx in journal.completed:
+                        continue
+                    coro = self._submit_and_wait(
+                        idx,
+                        item,
+                        semaphore=semaphore,
+                        wait_config=wait_config,
+                        journal=journal,
+                        running=running,
+                    )
+                    pending.append((idx, self._engine.submit(coro)))
+                if not pending:
+                    return
+
+                if ordered:
+                    done = [pending.popleft()]
+                else:
+                    wait([f for _, f in pending], return_when=FIRST_COMPLETED)
+                    done = [(idx, f) for idx, f in pending if f.done()]
+                    pending = collections.deque(
+                        (idx, f) for idx, f in pending if not f.done()
+                    )
+                for idx, future in done:
+                    error = future.exception()
+                    if error is not None and not return_exceptions:
+                        raise error
+                    result = error if error is not None else future.result()
+                    if journal:
+                        journal.record_completed(idx)
+                    yield result if ordered else (idx, result)
+        finally:
+            for _, future in pending:
+                future.cancel()
+            # Wait for the cancelled calls to exit, so that the request ids of the
+            # submitted inputs are persisted before the checkpoint is closed.
+            self._engine.submit(_cancel_tasks(running)).result()
+            if journal:
+                journal.close()
+
+    async def _submit_and_wait(
+        self,
+        index: int,
+        data: Any,
+        semaphore: asyncio.Semaphore,
+        wait_config: WaitConfig,
+        running: Set[asyncio.Task],
+        journal: Optional[_SubmitCheckpoint] = None,
+    ):
+        task = asyncio.current_task()
+        running.add(task)
+        payload_uri = None
+        try:
+            request_id = journal.submitted.get(index) if journal else None
+            if not request_id:
+                async with semaphore:
+                    data, _, payload_uri = await self._offload_request(
+                        self._handle_input(data)
+                    )
+                    resp = await self._send_request_async(
+                        data=data,
+                        headers=self._offloaded_headers(
+                            self._serializer_headers(), payload_uri
+                        ),
+                        idempotent=False,
+                    )
+                    request_id = await self._get_request_id_async(resp)
+                if journal:
+                    journal.record_submitted(index, request_id)
+            status_code, headers, content = await self._poll_result_async(
+                request_id=request_id, wait_config=wait_config, payload_uri=payload_uri
+            )
+            return self._handle_output(
+                await self._fetch_offloaded_content(content),
+                content_type=headers.get("Content-Type"),
+            )
+        finally:
+            running.discard(task)
 
     def raw_predict(
         self,
@@ -1178,6 +4507,7 @@ class AsyncPredictor(PredictorBase, _ServicePredictorMixin):
         method: str = "POST",
         path: Optional[str] = None,
         headers: Optional[Dict[str, str]] = None,
+        wait_config: Optional[WaitConfig] = None,
         **kwargs,
     ) -> AsyncTask:
         """Make a prediction with the online prediction service.
@@ -1189,10 +4519,14 @@ class AsyncPredictor(PredictorBase, _ServicePredictorMixin):
                 JSON.
             callback (Union[Callable, List[Callable]], optional): A Callback function,
                 or a list of callback functions used to process the prediction result.
+                Callbacks are invoked in a thread pool of the predictor, apart from
+                the background event loop that sends the requests.
             path (str, optional): Path for the request to be sent to. If it is provided,
                 it will be appended to the endpoint URL (Default None).
             headers (dict, optional): Request headers.
             method (str, optional): Request method, default to 'POST'.
+            wait_config (WaitConfig, optional): A config object that controls the
+                behavior of polling the prediction result.
             **kwargs: Additional keyword arguments for the request.
         Returns:
             AsyncTask: The task object that can be used to retrieve the prediction
@@ -1208,13 +4542,20 @@ class AsyncPredictor(PredictorBase, _ServicePredictorMixin):
 
         """
 
-        future = self.executor.submit(
-            self._raw_predict_fn, data, method, path, headers, **kwargs
+        future = self._engine.submit(
+            self._raw_predict_coro(
+                data,
+                wait_config=wait_config or WaitConfig(),
+                method=method,
+                headers=headers,
+                path=path,
+                **kwargs,
+            )
         )
         cbs = [callback] if isinstance(callback, Callable) else callback
         if cbs:
             for cb in cbs:
-                future.add_done_callback(self._wrap_callback_fn(cb))
+                self._engine.add_done_callback(future, self._wrap_callback_fn(cb))
 
         return AsyncTask(future=future)
 
@@ -1247,32 +4588,122 @@ class AsyncPredictor(PredictorBase, _ServicePredictorMixin):
         """
         if self.service_status not in ServiceStatus.completed_status():
             self.wait_for_ready()
-        json_data, data = self._handle_raw_input(data)
+        return await self._raw_predict_coro(
+            data,
+            wait_config=wait_config,
+            method=method,
+            headers=headers,
+            path=path,
+            **kwargs,
+        )
 
+    async def _raw_predict_coro(
+        self,
+        data,
+        wait_config: WaitConfig,
+        method: str = "POST",
+        headers: Optional[Dict[str, str]] = None,
+        path: Optional[str] = None,
+        **kwargs,
+    ) -> RawResponse:
+        json_data, data = self._handle_raw_input(data)
+        data, json_data, payload_uri = await self._offload_request(data, json_data)
         resp = await self._send_request_async(
             data=data,
             method=method,
             json=json_data,
             path=path,
-            headers=headers,
+            headers=self._offloaded_headers(headers, payload_uri),
+            idempotent=False,
             **kwargs,
         )
         request_id = await self._get_request_id_async(resp)
         # Polling the prediction result.
         status_code, headers, content = await self._poll_result_async(
-            request_id=request_id, wait_config=wait_config
+            request_id=request_id, wait_config=wait_config, payload_uri=payload_uri
         )
+        result_uri = self.offload_config and self.offload_config.parse_reference(
+            content
+        )
+        if result_uri:
+            return OffloadedRawResponse(
+                status_code, headers, result_uri, offload_config=self.offload_config
+            )
         return self._handle_raw_output(status_code, headers, content)
 
+    async def _offload_request(
+        self, data: Any, json_data: Any = None
+    ) -> Tuple[Any, Any, Optional[str]]:
+        """Upload the request payload to OSS if it exceeds the offload threshold.
+
+        Returns the data and JSON data to be sent, and the OSS URI of the uploaded
+        payload, which is None if the payload is sent inline.
+        """
+        config = self.offload_config
+        if not config:
+            return data, json_data, None
+        payload = json.dumps(json_data).encode() if json_data is not None else data
+        if isinstance(payload, str):
+            payload = payload.encode()
+        if not isinstance(payload, bytes) or len(payload) <= config.threshold:
+            return data, json_data, None
+        loop = asyncio.get_running_loop()
+        payload_uri = await loop.run_in_executor(None, config.upload, payload)
+        logger.debug("Request payload is offloaded to OSS: %s", payload_uri)
+        return config.make_reference(payload_uri), None, payload_uri
+
+    @classmethod
+    def _offloaded_headers(
+        cls, headers: Optional[Dict[str, str]], payload_uri: Optional[str]
+    ) -> Optional[Dict[str, str]]:
+        """Returns the request headers, the content type of an offloaded request is
+        JSON, which is the format of the payload reference."""
+        if not payload_uri:
+            return headers
+        headers = {
+            k: v for k, v in (headers or {}).items() if k.lower() != "content-type"
+        }
+        headers["Content-Type"] = "application/json"
+        return headers
+
+    async def _release_request_payload(self, payload_uri: Optional[str]):
+        if not payload_uri or not self.offload_config.delete_request_payload:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self.offload_config.delete, payload_uri)
+        except Exception as e:
+            logger.warning(
+                "Failed to delete the offloaded request payload %s: %s", payload_uri, e
+            )
+
+    async def _fetch_offloaded_content(self, content: bytes) -> bytes:
+        """Fetch the result from OSS if the content is a payload reference."""
+        config = self.offload_config
+        payload_uri = config and config.parse_reference(content)
+        if not payload_uri:
+            return content
 
-class LocalPredictor(PredictorBase):
-    """Perform prediction to a local service running with docker."""
+        def _read():
+            with config.open(payload_uri) as f:
+                return f.read()
+
+        return await asyncio.get_running_loop().run_in_executor(None, _read)
+
+
+class LocalPredictor(PredictorBase, _HTTPSessionMixin, _BulkPredictionMixin):
+    """Perform prediction to a local service running with docker.
+
+    Requests are sent through pooled HTTP sessions, so that the connections to the
+    local service are reused by the successive and concurrent prediction calls.
+    """
 
     def __init__(
         self,
         port: int,
         container_id: Optional[str] = None,
         serializer: Optional[SerializerBase] = None,
+        connection_config: Optional[ConnectionConfig] = None,
     ):
         """LocalPredictor initializer.
 
@@ -1280,6 +4711,8 @@ class LocalPredictor(PredictorBase):
             port (int): The port of the local service.
             container_id (str, optional): The container id of the local service.
             serializer (SerializerBase, optional): A serializer object that transforms.
+            connection_config (ConnectionConfig, optional): Config of the connection
+                pools used by the predictor.
         """
         self.container_id = container_id
         self.port = port
@@ -1289,6 +4722,11 @@ class LocalPredictor(PredictorBase):
             if self.container_id
             else None
         )
+        self._init_http_sessions(connection_config)
+
+    def __del__(self):
+        if getattr(self, "_request_session", None):
+            self._request_session.close()
 
     @classmethod
     def _build_container_run(cls, container_id, port):
@@ -1301,17 +4739,34 @@ class LocalPredictor(PredictorBase):
 
         return ContainerRun(container=container, port=port)
 
+    def _serializer_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.serializer.content_type:
+            headers["Content-Type"] = self.serializer.content_type
+        if self.serializer.accept:
+            headers["Accept"] = self.serializer.accept
+        return self._build_headers(headers)
+
     def predict(self, data) -> Any:
         """Perform prediction with the given data.
 
         Args:
             data: The data to be predicted.
         """
+        timer = self._start_timer()
         request_data = self.serializer.serialize(data=data)
-        response = requests.post(
-            url="http://127.0.0.1:{port}/".format(port=self._container_run.port),
+        kwargs = {}
+        if timer:
+            timer.mark("serialize")
+            kwargs["hooks"] = {"response": timer.on_headers}
+        response = self._request_session.post(
+            url=self._build_url(),
             data=request_data,
+            headers=self._serializer_headers(),
+            **kwargs,
         )
+        if timer:
+            timer.mark_response()
 
         if response.status_code // 100 != 2:
             raise PredictionException(
@@ -1319,7 +4774,48 @@ class LocalPredictor(PredictorBase):
                 message=response.content,
             )
 
-        return self.serializer.deserialize(response.content)
+        result = self.serializer.deserialize_response(
+            response.content, content_type=response.headers.get("Content-Type")
+        )
+        if timer:
+            timer.mark("deserialize")
+            timer.finish()
+        return result
+
+    async def predict_async(self, data) -> Any:
+        """Perform prediction with the given data using async API.
+
+        Args:
+            data: The data to be predicted.
+        """
+        timer = self._start_timer()
+        request_data = self.serializer.serialize(data=data)
+        kwargs = {}
+        if timer:
+            timer.mark("serialize")
+            kwargs["trace_request_ctx"] = timer
+        async with self._get_async_session().post(
+            url=self._build_url(),
+            data=request_data,
+            headers=self._serializer_headers(),
+            **kwargs,
+        ) as response:
+            if timer:
+                timer.mark_headers()
+            content = await response.read()
+            if timer:
+                timer.mark("download")
+
+        if response.status // 100 != 2:
+            raise PredictionException(code=response.status, message=content)
+
+        result = self.serializer.deserialize_response(
+            content, content_type=response.headers.get("Content-Type")
+        )
+        if timer:
+            timer.mark("deserialize")
+            timer.finish()
+        return result
 
     def _build_headers(
         self, headers: Optional[Dict[str, str]] = None
@@ -1336,6 +4832,16 @@ class LocalPredictor(PredictorBase):
             url = posixpath.join(url, path)
         return url
 
+    @classmethod
+    def _handle_raw_input(cls, data):
+        if isinstance(data, (IOBase, bytes, str)):
+            # if data is a file-like object, bytes, or string, it will be sent as
+            # request body
+            return None, data
+        # otherwise, it will be treated as a JSON serializable object and sent as
+        # JSON.
+        return data, None
+
     def raw_predict(
         self,
         data: Any = None,
@@ -1365,21 +4871,12 @@ class LocalPredictor(PredictorBase):
             PredictionException: Raise if status code of the prediction response does
                 not equal 2xx.
         """
-        if isinstance(data, (IOBase, bytes, str)):
-            # if data is a file-like object, bytes, or string, it will be sent as
-            # request body
-            json_data, data = None, data
-        else:
-            # otherwise, it will be treated as a JSON serializable object and sent as
-            # JSON.
-            json_data, data = data, None
-        header = self._build_headers(headers=headers)
-        url = self._build_url(path)
-        resp = requests.request(
-            url=url,
+        json_data, data = self._handle_raw_input(data)
+        resp = self._request_session.request(
+            url=self._build_url(path),
             json=json_data,
             data=data,
-            headers=header,
+            headers=self._build_headers(headers=headers),
             method=method,
             timeout=timeout,
             **kwargs,
@@ -1393,6 +4890,51 @@ class LocalPredictor(PredictorBase):
             raise PredictionException(resp.status_code, resp.content)
         return resp
 
+    async def raw_predict_async(
+        self,
+        data: Any = None,
+        path: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        method: str = "POST",
+        **kwargs,
+    ) -> RawResponse:
+        """Make a prediction with the online prediction service using async API.
+
+        Args:
+            data (Any): Input data to be sent to the prediction service. If it is a
+                file-like object, bytes, or string, it will be sent as the request body.
+                Otherwise, it will be treated as a JSON serializable object and sent as
+                JSON.
+            path (str, optional): Path for the request to be sent to. If it is provided,
+                it will be appended to the endpoint URL (Default None).
+            headers (dict, optional): Request headers.
+            method (str, optional): Request method, default to 'POST'.
+            **kwargs: Additional keyword arguments for the request.
+        Returns:
+            RawResponse: Prediction response from the service.
+
+        Raises:
+            PredictionException: Raise if status code of the prediction response does
+                not equal 2xx.
+        """
+        json_data, data = self._handle_raw_input(data)
+        async with self._get_async_session().request(
+            url=self._build_url(path),
+            json=json_data,
+            data=data,
+            headers=self._build_headers(headers=headers),
+            method=method,
+            **kwargs,
+        ) as response:
+            resp = RawResponse(
+                status_code=response.status,
+                content=await response.read(),
+                headers=dict(response.headers),
+            )
+        if resp.status_code // 100 != 2:
+            raise PredictionException(resp.status_code, resp.content)
+        return resp
+
     def delete_service(self):
         """Delete the docker container that running the service."""
         if self._container_run:
@@ -12,10 +12,17 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
+import base64
+import datetime
+import hashlib
+import importlib
 import json
+import os
+import tempfile
+import threading
 import urllib.request
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 from urllib.error import HTTPError
 
 import backoff
@@ -25,6 +32,7 @@ import six
 from eas_prediction import pytorch_predict_pb2 as pt_pb
 from eas_prediction import tf_request_pb2 as tf_pb
 
+from .common.consts import SIGNATURE_DEF_CACHE_DIR
 from .common.logging import get_logger
 from .session import Session, get_default_session
 
@@ -58,6 +66,239 @@ def _is_pandas_dataframe(data) -> bool:
         return False
 
 
+# Protobuf wire types, see: https://protobuf.dev/programming-guides/encoding/
+_WIRE_TYPE_VARINT = 0
+_WIRE_TYPE_FIXED64 = 1
+_WIRE_TYPE_LENGTH_DELIMITED = 2
+_WIRE_TYPE_FIXED32 = 5
+
+# Values of ArrayProto fields with fixed-width encoding are stored as packed
+# little-endian buffer, which could be built from/read into numpy array directly.
+_PACKED_ARRAY_VALUE_FIELDS = {
+    "DT_FLOAT": ("float_val", "<f4"),
+    "DT_DOUBLE": ("double_val", "<f8"),
+    "DT_BOOL": ("bool_val", "u1"),
+}
+
+
+def _encode_varint(value: int) -> bytes:
+    if value < 0:
+        # negative int64 is encoded as 10 bytes two's complement varint.
+        value += 1 << 64
+    buf = bytearray()
+    while value > 0x7F:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+    return bytes(buf)
+
+
+def _decode_varint(buf: memoryview, pos: int) -> Tuple[int, int]:
+    result, shift = 0, 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if not b & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _length_delimited_header(field_number: int, length: int) -> bytes:
+    return _encode_varint(field_number << 3 | _WIRE_TYPE_LENGTH_DELIMITED) + (
+        _encode_varint(length)
+    )
+
+
+def _iter_proto_fields(buf: memoryview) -> Iterator[Tuple[int, int, Any]]:
+    """Iterate the (field_number, wire_type, value) of an encoded protobuf message,
+    the value of a length-delimited field is a memoryview of the given buffer."""
+    pos, end = 0, len(buf)
+    while pos < end:
+        key, pos = _decode_varint(buf, pos)
+        field_number, wire_type = key >> 3, key & 0x07
+        if wire_type == _WIRE_TYPE_VARINT:
+            value, pos = _decode_varint(buf, pos)
+        elif wire_type == _WIRE_TYPE_LENGTH_DELIMITED:
+            length, pos = _decode_varint(buf, pos)
+            value = buf[pos : pos + length]
+            pos += length
+        elif wire_type == _WIRE_TYPE_FIXED64:
+            value = buf[pos : pos + 8]
+            pos += 8
+        elif wire_type == _WIRE_TYPE_FIXED32:
+            value = buf[pos : pos + 4]
+            pos += 4
+        else:
+            raise ValueError(f"Unsupported protobuf wire type: {wire_type}")
+        yield field_number, wire_type, value
+
+
+def _packed_value_field(pb_module, data_type) -> Optional[Tuple[int, str]]:
+    """Returns the field number and buffer dtype of the packed ArrayProto value field
+    for the data type, None if the values could not be encoded as raw buffer."""
+    data_type_name = pb_module.ArrayDataType.Name(data_type)
+    if data_type_name not in _PACKED_ARRAY_VALUE_FIELDS:
+        return
+    field_name, buffer_dtype = _PACKED_ARRAY_VALUE_FIELDS[data_type_name]
+    field = pb_module.ArrayProto.DESCRIPTOR.fields_by_name.get(field_name)
+    if not field:
+        return
+    return field.number, buffer_dtype
+
+
+def _encode_packed_array_proto(
+    pb_module, data_type, value: np.ndarray
+) -> Optional[List[Union[bytes, memoryview]]]:
+    """Encode the numpy array to ArrayProto chunks using the raw buffer of the array.
+
+    Returns None if the data type requires element-wise encoding.
+    """
+    packed_field = _packed_value_field(pb_module, data_type)
+    if not packed_field:
+        return
+    field_number, buffer_dtype = packed_field
+    array_proto = pb_module.ArrayProto(dtype=data_type)
+    array_proto.array_shape.dim.extend(value.shape)
+    buffer = memoryview(np.ascontiguousarray(value, dtype=buffer_dtype)).cast("B")
+    return [
+        array_proto.SerializeToString(),
+        _length_delimited_header(field_number, buffer.nbytes),
+        buffer,
+    ]
+
+
+def _decode_packed_array_proto(
+    pb_module, buf: memoryview, np_dtype_mapping: Dict[str, Any]
+) -> Optional[np.ndarray]:
+    """Decode the encoded ArrayProto into numpy array without per-element Python
+    work.
+
+    Returns None if the ArrayProto requires element-wise decoding.
+    """
+    data_type, shape, value_fields = 0, [], []
+    for field_number, wire_type, value in _iter_proto_fields(buf):
+        if field_number == 1 and wire_type == _WIRE_TYPE_VARINT:
+            data_type = value
+        elif field_number == 2 and wire_type == _WIRE_TYPE_LENGTH_DELIMITED:
+            for _, dim_wire_type, dim in _iter_proto_fields(value):
+                if dim_wire_type == _WIRE_TYPE_VARINT:
+                    dims = [dim]
+                else:
+                    dims, pos = [], 0
+                    while pos < len(dim):
+                        d, pos = _decode_varint(dim, pos)
+                        dims.append(d)
+                # int64 dimension is encoded as two's complement varint.
+                shape.extend(d - (1 << 64) if d >= 1 << 63 else d for d in dims)
+        else:
+            value_fields.append((field_number, wire_type, value))
+
+    packed_field = _packed_value_field(pb_module, data_type)
+    if not packed_field or not value_fields:
+        return
+    field_number, buffer_dtype = packed_field
+    if any(
+        f != field_number or w != _WIRE_TYPE_LENGTH_DELIMITED
+        for f, w, _ in value_fields
+    ):
+        return
+
+    chunks = [np.frombuffer(v, dtype=buffer_dtype) for _, _, v in value_fields]
+    value = chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+    np_dtype = np_dtype_mapping[pb_module.ArrayDataType.Name(data_type)]
+    if np_dtype is np.bool_:
+        if value.size and value.max() > 1:
+            return
+        value = value.view(np.bool_)
+    return value.astype(np_dtype, copy=False).reshape(shape)
+
+
+class _SignatureDefCache(object):
+    """Cache of the model signature definitions of TensorFlow prediction services.
+
+    Signature definitions are cached in memory, and in the given cache directory
+    so that they could be reused across processes. The cache key is computed from
+    the service version and config, so a new signature definition is fetched only
+    if the service is updated.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (region_id, service_name) => (cache_key, signature_def)
+        self._entries: Dict[Tuple[str, str], Tuple[str, Dict[str, Any]]] = {}
+
+    @classmethod
+    def make_key(cls, region_id: str, service_api_object: Dict[str, Any]) -> str:
+        raw = "/".join(
+            [
+                str(region_id),
+                service_api_object["ServiceName"],
+                str(service_api_object.get("CurrentVersion")),
+                service_api_object.get("ServiceConfig", ""),
+            ]
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    @classmethod
+    def _cache_file(cls, cache_dir: str, service_name: str, key: str) -> str:
+        return os.path.join(cache_dir, f"{service_name}-{key[:16]}.json")
+
+    def get(
+        self,
+        region_id: str,
+        service_name: str,
+        key: str,
+        cache_dir: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get((region_id, service_name))
+        if entry and entry[0] == key:
+            return entry[1]
+        if not cache_dir:
+            return
+
+        cache_file = self._cache_file(cache_dir, service_name, key)
+        try:
+            with open(cache_file, "r") as f:
+                signature_def = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            self._entries[(region_id, service_name)] = (key, signature_def)
+        return signature_def
+
+    def put(
+        self,
+        region_id: str,
+        service_name: str,
+        key: str,
+        signature_def: Dict[str, Any],
+        cache_dir: Optional[str] = None,
+    ):
+        with self._lock:
+            self._entries[(region_id, service_name)] = (key, signature_def)
+        if not cache_dir:
+            return
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # write to a temporary file then rename it, so that concurrent readers
+            # never see a partially written file.
+            fd, tmp_file = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(signature_def, f)
+            os.replace(tmp_file, self._cache_file(cache_dir, service_name, key))
+        except OSError as e:
+            logger.warning("Failed to persist the model signature definition: %s", e)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_signature_def_cache = _SignatureDefCache()
+
+
 class TensorFlowIOSpec(object):
     def __init__(self, name: str, shape: Tuple, data_type: tf_pb.ArrayDataType):
         """A class represents TensorFlow inputs/outputs spec.
@@ -75,6 +316,13 @@ class TensorFlowIOSpec(object):
 class SerializerBase(ABC):
     """Abstract class for creating a Serializer class for predictor."""
 
+    # Media type of the serialized data, sent as the Content-Type header of the
+    # prediction request if provided.
+    content_type: Optional[str] = None
+    # Media types of the prediction result accepted by the serializer, sent as the
+    # Accept header of the prediction request if provided.
+    accept: Optional[str] = None
+
     @abstractmethod
     def serialize(self, data) -> bytes:
         """Serialize the input data to bytes for transmitting."""
@@ -83,6 +331,14 @@ class SerializerBase(ABC):
     def deserialize(self, data: bytes):
         """Deserialize the data from raw bytes to Python object ."""
 
+    def deserialize_response(self, data: bytes, content_type: Optional[str] = None):
+        """Deserialize the prediction result with the Content-Type of the response.
+
+        Serializers that accept multiple media types of the prediction result should
+        override the method, by default it is the same as `deserialize`.
+        """
+        return self.deserialize(data)
+
     def inspect_from_service(
         self, service_name: str, *, session: Optional[Session] = None
     ):
@@ -133,6 +389,186 @@ class JsonSerializer(SerializerBase):
         return json.loads(data)
 
 
+def _encode_default(obj):
+    """Encode the objects that are not natively supported by JSON/msgpack."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif isinstance(obj, np.generic):
+        return obj.item()
+    elif isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        return base64.b64encode(obj).decode()
+    elif _is_pandas_dataframe(obj):
+        return obj.to_numpy().tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable.")
+
+
+def _import_optional(name: str):
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return
+
+
+class FastJsonSerializer(JsonSerializer):
+    """A JSON serializer that natively encodes numpy arrays and scalars, datetime and
+    bytes objects.
+
+    `orjson <https://github.com/ijl/orjson>`_ is used if it is installed, which is
+    several times faster than the `json` module in the standard library, otherwise
+    the standard library is used. numpy arrays are encoded as nested lists, datetime
+    objects in ISO 8601 format and bytes in base64.
+
+    """
+
+    content_type = "application/json"
+
+    def __init__(self):
+        self._orjson = _import_optional("orjson")
+
+    def serialize(self, data) -> bytes:
+        if isinstance(data, str):
+            return data.encode()
+        elif isinstance(data, bytes):
+            return data
+
+        if _is_pandas_dataframe(data):
+            data = data.to_numpy()
+        if self._orjson:
+            orjson = self._orjson
+            return orjson.dumps(
+                data,
+                default=_encode_default,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            )
+        return json.dumps(data, default=_encode_default, separators=(",", ":")).encode()
+
+    def deserialize(self, data):
+        if self._orjson:
+            return self._orjson.loads(data)
+        return json.loads(data)
+
+
+# Layout of the encoded numpy array, which is compatible with msgpack-numpy: a map
+# with bytes keys, the keys are str in the payloads encoded by the earlier versions.
+_MSGPACK_NDARRAY_KEYS = [
+    (b"nd", b"type", b"kind", b"shape", b"data"),
+    ("nd", "type", "kind", "shape", "data"),
+]
+
+
+def _msgpack_default(obj):
+    if isinstance(obj, np.ndarray) and obj.dtype.kind in "biufc":
+        return {
+            b"nd": True,
+            b"type": obj.dtype.str,
+            b"kind": b"",
+            b"shape": list(obj.shape),
+            b"data": np.ascontiguousarray(obj).tobytes(),
+        }
+    return _encode_default(obj)
+
+
+def _msgpack_ndarray_dtype(descr, kind) -> Optional[np.dtype]:
+    if kind in (b"V", "V") and isinstance(descr, (list, tuple)):
+        # Structured array, the type is the interface description of the dtype.
+        descr = [
+            tuple(t.decode() if isinstance(t, bytes) else t for t in field)
+            for field in descr
+        ]
+    elif kind not in (b"", "") or not isinstance(descr, (bytes, str)):
+        return None
+    try:
+        dtype = np.dtype(descr.decode() if isinstance(descr, bytes) else descr)
+    except (TypeError, ValueError):
+        return None
+    return None if dtype.hasobject else dtype
+
+
+def _msgpack_object_hook(obj):
+    """Decode the maps encoded from numpy arrays and scalars by `_msgpack_default`
+    or msgpack-numpy, the other maps are left unchanged."""
+    for nd, type_, kind, shape, data in _MSGPACK_NDARRAY_KEYS:
+        if not isinstance(obj.get(data), bytes):
+            continue
+        keys = set(obj.keys())
+        if obj.get(nd) is True and keys == {nd, type_, kind, shape, data}:
+            dims = obj[shape]
+            if not isinstance(dims, (list, tuple)) or not all(
+                isinstance(d, int) and not isinstance(d, bool) and d >= 0 for d in dims
+            ):
+                return obj
+            dtype = _msgpack_ndarray_dtype(obj[type_], obj[kind])
+            if dtype is None or len(obj[data]) != dtype.itemsize * int(
+                np.prod(dims, dtype=np.int64)
+            ):
+                return obj
+            return np.frombuffer(obj[data], dtype=dtype).reshape(dims).copy()
+        elif obj.get(nd) is False and keys == {nd, type_, data}:
+            # numpy scalar encoded by msgpack-numpy.
+            dtype = _msgpack_ndarray_dtype(obj[type_], b"")
+            if dtype is None or len(obj[data]) != dtype.itemsize:
+                return obj
+            return np.frombuffer(obj[data], dtype=dtype)[0]
+    return obj
+
+
+class MsgPackSerializer(SerializerBase):
+    """A serializer that transforms data in `MessagePack <https://msgpack.org/>`_
+    format, which is more compact and faster to encode than JSON.
+
+    numpy arrays of numeric types are encoded as raw buffers in the map layout used
+    by msgpack-numpy, ``{b"nd": True, b"type": <dtype>, b"kind": b"", b"shape":
+    <shape>, b"data": <bytes>}``, and decoded back into numpy arrays. datetime objects are
+    encoded in ISO 8601 format.
+
+    The request is sent with ``Content-Type: application/msgpack``, and the prediction
+    service may return the result in either msgpack or JSON format, which is decoded
+    according to the Content-Type of the response. If the msgpack package is not
+    installed, the serializer falls back to JSON with ``Content-Type:
+    application/json``.
+
+    """
+
+    MSGPACK_CONTENT_TYPE = "application/msgpack"
+    JSON_CONTENT_TYPE = "application/json"
+
+    def __init__(self):
+        self._msgpack = _import_optional("msgpack")
+        self._json_serializer = FastJsonSerializer()
+        if self._msgpack:
+            self.content_type = self.MSGPACK_CONTENT_TYPE
+            self.accept = f"{self.MSGPACK_CONTENT_TYPE}, {self.JSON_CONTENT_TYPE}"
+        else:
+            logger.warning(
+                "msgpack is not installed, MsgPackSerializer falls back to JSON."
+            )
+            self.content_type = self.accept = self.JSON_CONTENT_TYPE
+
+    def serialize(self, data) -> bytes:
+        if not self._msgpack:
+            return self._json_serializer.serialize(data)
+        if _is_pandas_dataframe(data):
+            data = data.to_numpy()
+        return self._msgpack.packb(data, default=_msgpack_default, use_bin_type=True)
+
+    def deserialize(self, data: bytes):
+        if not self._msgpack:
+            return self._json_serializer.deserialize(data)
+        return self._msgpack.unpackb(
+            data,
+            raw=False,
+            object_hook=_msgpack_object_hook,
+            strict_map_key=False,
+        )
+
+    def deserialize_response(self, data: bytes, content_type: Optional[str] = None):
+        if content_type and content_type.split(";")[0].strip().lower().endswith("json"):
+            return self._json_serializer.deserialize(data)
+        return self.deserialize(data)
+
+
 class TensorFlowSerializer(SerializerBase):
     """A Serializer class that responsible for transforming input/output data for
     TensorFlow processor service."""
@@ -150,6 +586,10 @@ class TensorFlowSerializer(SerializerBase):
         "DT_STRING": np.str_,
     }
 
+    # Directory used to persist the model signature definitions across processes,
+    # default to the environment variable `PAI_SIGNATURE_DEF_CACHE_DIR`.
+    signature_def_cache_dir: Optional[str] = SIGNATURE_DEF_CACHE_DIR
+
     def __init__(
         self,
     ):
@@ -212,15 +652,39 @@ class TensorFlowSerializer(SerializerBase):
                 ]
             }
 
+        The signature definition is cached in memory, and on disk if
+        `signature_def_cache_dir` is set, it is fetched from the service again only
+        if the version or the config of the service is changed.
+
         Returns:
             A dictionary that represents the model signature definition.
 
         """
-        from pai.predictor import ServiceStatus
+        from pai.predictor import ServiceStatus, service_descriptor_cache
 
         session = session or get_default_session()
 
-        service_api_object = session.service_api.get(service_name)
+        service_api_object = service_descriptor_cache.get(
+            session.region_id, service_name
+        )
+        if not service_api_object or (
+            service_api_object["Status"] != ServiceStatus.Running
+        ):
+            service_api_object = session.service_api.get(service_name)
+            service_descriptor_cache.put(
+                session.region_id, service_name, service_api_object
+            )
+
+        cache_key = _SignatureDefCache.make_key(session.region_id, service_api_object)
+        signature_def = _signature_def_cache.get(
+            session.region_id,
+            service_name,
+            key=cache_key,
+            cache_dir=cls.signature_def_cache_dir,
+        )
+        if signature_def:
+            return signature_def
+
         if service_api_object["Status"] != ServiceStatus.Running:
             raise RuntimeError(
                 f"Service is not ready, cannot send request to the service to inspect "
@@ -249,6 +713,13 @@ class TensorFlowSerializer(SerializerBase):
 
         resp = _send_request()
         signature_def = json.load(resp)
+        _signature_def_cache.put(
+            session.region_id,
+            service_name,
+            key=cache_key,
+            signature_def=signature_def,
+            cache_dir=cls.signature_def_cache_dir,
+        )
         return signature_def
 
     def serialize(self, data: Union[Dict[str, Any], tf_pb.PredictRequest]) -> bytes:
@@ -261,6 +732,7 @@ class TensorFlowSerializer(SerializerBase):
             for output_name in self._output_filter:
                 request.output_filter.append(output_name)
 
+        inputs = []
         if not isinstance(data, dict):
             if not self._input_specs or len(self._input_specs) > 1:
                 raise ValueError(
@@ -285,13 +757,7 @@ class TensorFlowSerializer(SerializerBase):
                     if input_spec and input_spec.data_type is not None
                     else self._np_dtype_to_tf_dtype(value.dtype.type)
                 )
-                self._put_value(
-                    request=request,
-                    name=input_spec.name,
-                    data_type=data_type,
-                    shape=value.shape,
-                    data=np.ravel(value).tolist(),
-                )
+                inputs.append((input_spec.name, data_type, value))
         else:
             input_specs_dict = (
                 {input_spec.name: input_spec for input_spec in self._input_specs}
@@ -314,15 +780,27 @@ class TensorFlowSerializer(SerializerBase):
                     and len([dim for dim in input_spec.shape if dim == -1]) == 1
                 ):
                     value = value.reshape(input_spec.shape)
-                self._put_value(
-                    request=request,
-                    name=input_spec.name,
-                    data_type=data_type,
-                    shape=value.shape,
-                    data=np.ravel(value).tolist(),
-                )
-
-        return request.SerializeToString()
+                inputs.append((name, data_type, value))
+
+        # Inputs are entries of map field `PredictRequest.inputs` (field number 2),
+        # which are appended to the encoded request as raw chunks so that the
+        # tensor buffers are copied only once.
+        chunks = [request.SerializeToString()]
+        for name, data_type, value in inputs:
+            key = name.encode()
+            array_chunks = self._encode_value(data_type=data_type, value=value)
+            array_length = sum(len(c) for c in array_chunks)
+            entry_chunks = [
+                _length_delimited_header(1, len(key)),
+                key,
+                _length_delimited_header(2, array_length),
+                *array_chunks,
+            ]
+            chunks.append(
+                _length_delimited_header(2, sum(len(c) for c in entry_chunks))
+            )
+            chunks.extend(entry_chunks)
+        return b"".join(chunks)
 
     def _init_from_signature_def(self, signature_def):
         """Build TensorFlowSerializer from signature def.
@@ -365,15 +843,21 @@ class TensorFlowSerializer(SerializerBase):
             self._output_filter = [spec.name for spec in output_specs]
 
     def deserialize(self, data: bytes):
-        response = tf_pb.PredictResponse()
-        response.ParseFromString(data)
-        output_names = response.outputs.keys()
         results = {}
-        for name in output_names:
-            results[name] = self._get_value(
-                response=response,
-                name=name,
-            )
+        # Copy the response into a writable buffer once, the decoded numpy arrays
+        # share memory with the buffer.
+        buf = memoryview(bytearray(data))
+        for field_number, wire_type, entry in _iter_proto_fields(buf):
+            # Entries of map field `PredictResponse.outputs` (field number 1).
+            if field_number != 1 or wire_type != _WIRE_TYPE_LENGTH_DELIMITED:
+                continue
+            name, value = "", memoryview(b"")
+            for entry_field_number, _, entry_value in _iter_proto_fields(entry):
+                if entry_field_number == 1:
+                    name = bytes(entry_value).decode()
+                elif entry_field_number == 2:
+                    value = entry_value
+            results[name] = self._decode_value(value)
         return results
 
     def _np_dtype_to_tf_dtype(self, np_dtype):
@@ -393,11 +877,24 @@ class TensorFlowSerializer(SerializerBase):
             )
         return self.NUMPY_DATA_TYPE_MAPPING.get(data_type_name)
 
-    def _put_value(
-        self, request: tf_pb.PredictRequest, name: str, data_type, shape, data
-    ):
-        request.inputs[name].dtype = data_type
-        request.inputs[name].array_shape.dim.extend(shape)
+    def _encode_value(
+        self, data_type, value: np.ndarray
+    ) -> List[Union[bytes, memoryview]]:
+        """Encode the input value to chunks of an encoded ArrayProto."""
+        chunks = _encode_packed_array_proto(tf_pb, data_type, value)
+        if chunks is not None:
+            return chunks
+        return [
+            self._build_array_proto(
+                data_type=data_type,
+                shape=value.shape,
+                data=np.ravel(value).tolist(),
+            ).SerializeToString()
+        ]
+
+    def _build_array_proto(self, data_type, shape, data) -> tf_pb.ArrayProto:
+        array_proto = tf_pb.ArrayProto(dtype=data_type)
+        array_proto.array_shape.dim.extend(shape)
 
         integer_types = [
             tf_pb.DT_INT8,
@@ -412,31 +909,37 @@ class TensorFlowSerializer(SerializerBase):
             tf_pb.DT_QUINT16,
         ]
         if data_type == tf_pb.DT_FLOAT:
-            request.inputs[name].float_val.extend(data)
+            array_proto.float_val.extend(data)
         elif data_type == tf_pb.DT_DOUBLE:
-            request.inputs[name].double_val.extend(data)
+            array_proto.double_val.extend(data)
         elif data_type in integer_types:
-            request.inputs[name].int_val.extend(data)
+            array_proto.int_val.extend(data)
         elif data_type == tf_pb.DT_INT64:
-            request.inputs[name].int64_val.extend(data)
+            array_proto.int64_val.extend(data)
         elif data_type == tf_pb.DT_BOOL:
-            request.inputs[name].bool_val.extend(data)
+            array_proto.bool_val.extend(data)
         elif data_type == tf_pb.DT_STRING:
-            request.inputs[name].string_val.extend(data)
+            array_proto.string_val.extend(
+                [d.encode() if isinstance(d, str) else d for d in data]
+            )
         else:
             raise ValueError(
                 f"Not supported input data type for TensorFlow PredictRequest: {data_type}"
             )
+        return array_proto
 
-    def _get_value(self, response: tf_pb.PredictResponse, name):
-        output = response.outputs[name]
+    def _decode_value(self, buf: memoryview):
+        """Decode the encoded ArrayProto into numpy array."""
+        value = _decode_packed_array_proto(
+            tf_pb, buf, np_dtype_mapping=self.NUMPY_DATA_TYPE_MAPPING
+        )
+        if value is not None:
+            return value
 
-        if (
-            name not in response.outputs
-            or tf_pb.DT_INVALID == response.outputs[name].dtype
-        ):
+        output = tf_pb.ArrayProto.FromString(bytes(buf))
+        if tf_pb.DT_INVALID == output.dtype:
             return
-        np_dtype = self._tf_dtype_to_np_dtype(response.outputs[name].dtype)
+        np_dtype = self._tf_dtype_to_np_dtype(output.dtype)
         shape = list(output.array_shape.dim)
 
         if output.dtype == tf_pb.DT_FLOAT:
@@ -497,7 +1000,6 @@ class PyTorchSerializer(SerializerBase):
         return self.NUMPY_DATA_TYPE_MAPPING.get(data_type_name)
 
     def serialize(self, data: Union[np.ndarray, List, Tuple]) -> bytes:
-        request = pt_pb.PredictRequest()
         if _is_pil_image(data):
             data = np.asarray(data)
         elif isinstance(data, (bytes, str)):
@@ -506,70 +1008,96 @@ class PyTorchSerializer(SerializerBase):
         if isinstance(data, np.ndarray):
             # if input data type is np.ndarray, we assume there is only one input data
             # for the prediction request.
-            self._put_value(
-                request,
-                index=0,
-                shape=data.shape,
-                data_type=self._np_dtype_to_torch_dtype(data.dtype.type),
-                data=np.ravel(data).tolist(),
-            )
+            inputs = [data]
         elif isinstance(data, (List, Tuple)):
             # if input data type is List or Tuple, we assume there is multi input data.
             # for the prediction request.
-            for idx, item in enumerate(data):
+            inputs = []
+            for item in data:
                 if not isinstance(item, np.ndarray):
                     item = np.asarray(item)
-                if not item:
+                if not item.size:
                     continue
-                self._put_value(
-                    request,
-                    index=0,
-                    shape=item.shape,
-                    data_type=self._np_dtype_to_torch_dtype(item.dtype.type),
-                    data=np.ravel(item).tolist(),
-                )
+                inputs.append(item)
         else:
             raise ValueError(
                 "PyTorchSerializer accept List, Tuple as input request data."
             )
-        return request.SerializeToString()
+
+        # Inputs are items of repeated field `PredictRequest.inputs` (field number
+        # 1), which are appended as raw chunks so that the tensor buffers are copied
+        # only once.
+        chunks = [pt_pb.PredictRequest().SerializeToString()]
+        for item in inputs:
+            array_chunks = self._encode_value(
+                data_type=self._np_dtype_to_torch_dtype(item.dtype.type),
+                value=item,
+            )
+            chunks.append(
+                _length_delimited_header(1, sum(len(c) for c in array_chunks))
+            )
+            chunks.extend(array_chunks)
+        return b"".join(chunks)
 
     def deserialize(self, data: bytes):
-        resp = pt_pb.PredictResponse()
-        resp.ParseFromString(data)
-        if len(resp.outputs) > 1:
-            results = []
-            for idx in range(resp.outputs):
-                results.append(self._get_value(resp, idx))
+        # Copy the response into a writable buffer once, the decoded numpy arrays
+        # share memory with the buffer.
+        buf = memoryview(bytearray(data))
+        results = [
+            self._decode_value(value)
+            for field_number, wire_type, value in _iter_proto_fields(buf)
+            # Items of repeated field `PredictResponse.outputs` (field number 1).
+            if field_number == 1 and wire_type == _WIRE_TYPE_LENGTH_DELIMITED
+        ]
+        if len(results) > 1:
             return results
-        elif len(resp.outputs) == 1:
-            return self._get_value(resp, index=0)
+        elif len(results) == 1:
+            return results[0]
+
+    def _encode_value(
+        self, data_type, value: np.ndarray
+    ) -> List[Union[bytes, memoryview]]:
+        """Encode the input value to chunks of an encoded ArrayProto."""
+        chunks = _encode_packed_array_proto(pt_pb, data_type, value)
+        if chunks is not None:
+            return chunks
+        return [
+            self._build_array_proto(
+                shape=value.shape,
+                data_type=data_type,
+                data=np.ravel(value).tolist(),
+            ).SerializeToString()
+        ]
 
-    def _put_value(
-        self, request: pt_pb.PredictRequest, index: int, shape, data_type, data
-    ):
-        while len(request.inputs) < index + 1:
-            request.inputs.add()
-        request.inputs[index].dtype = data_type
-        request.inputs[index].array_shape.dim.extend(shape)
+    def _build_array_proto(self, shape, data_type, data) -> pt_pb.ArrayProto:
+        array_proto = pt_pb.ArrayProto(dtype=data_type)
+        array_proto.array_shape.dim.extend(shape)
         if data_type == pt_pb.DT_FLOAT:
-            request.inputs[index].float_val.extend(data)
+            array_proto.float_val.extend(data)
         elif data_type == pt_pb.DT_DOUBLE:
-            request.inputs[index].double_val.extend(data)
+            array_proto.double_val.extend(data)
         elif data_type in (
             pt_pb.DT_INT8,
             pt_pb.DT_INT16,
             pt_pb.DT_INT32,
             pt_pb.DT_UINT8,
         ):
-            request.inputs[index].int_val.extend(data)
+            array_proto.int_val.extend(data)
         elif data_type == pt_pb.DT_INT64:
-            request.inputs[index].int64_val.extend(data)
+            array_proto.int64_val.extend(data)
         else:
             raise ValueError(f"Not supported PyTorch request data type: {data_type}")
+        return array_proto
+
+    def _decode_value(self, buf: memoryview):
+        """Decode the encoded ArrayProto into numpy array."""
+        value = _decode_packed_array_proto(
+            pt_pb, buf, np_dtype_mapping=self.NUMPY_DATA_TYPE_MAPPING
+        )
+        if value is not None:
+            return value
 
-    def _get_value(self, response: pt_pb.PredictResponse, index: int):
-        output = response.outputs[index]
+        output = pt_pb.ArrayProto.FromString(bytes(buf))
         if output.dtype == pt_pb.DT_INVALID:
             return
 
@@ -592,3 +1120,141 @@ class PyTorchSerializer(SerializerBase):
             raise ValueError(
                 f"Not supported PyTorch response data type: {output.dtype}"
             )
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "ArrowSerializer requires pyarrow, please install it with `pip install"
+            " pyarrow`."
+        ) from e
+    return pyarrow
+
+
+class ArrowSerializer(SerializerBase):
+    """A serializer that transforms columnar data in Apache Arrow format.
+
+    Input data is serialized column by column, without converting each row into
+    Python objects, which is much faster and more compact than `JsonSerializer` for
+    batch inference on tabular data. Supported input data includes pandas DataFrame,
+    pyarrow Table/RecordBatch, numpy structured (record) array, 2-D numpy array and
+    dict of columns.
+
+    The prediction service is expected to read the request body as an Arrow IPC
+    stream (or a Parquet file if `format="parquet"`), and return the prediction
+    result in the same format.
+
+    Examples::
+
+        predictor = Predictor("example_service", serializer=ArrowSerializer())
+        result_df = predictor.predict(df)
+
+    """
+
+    ARROW_STREAM = "stream"
+    PARQUET = "parquet"
+
+    ARROW_STREAM_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+    PARQUET_CONTENT_TYPE = "application/vnd.apache.parquet"
+
+    _PARQUET_MAGIC = b"PAR1"
+
+    def __init__(
+        self,
+        format: str = ARROW_STREAM,
+        compression: Optional[str] = None,
+        return_type: str = "pandas",
+    ):
+        """ArrowSerializer initializer.
+
+        Args:
+            format (str): Format of the serialized data, could be "stream" (Arrow IPC
+                streaming format) or "parquet" (Default "stream").
+            compression (str, optional): Compression codec of the serialized data,
+                such as "lz4", "zstd" ("snappy" and "gzip" are also supported by
+                Parquet). Default to no compression for the Arrow IPC stream, and the
+                default compression of pyarrow for Parquet.
+            return_type (str): Type of the deserialized prediction result, could be
+                "pandas" (pandas.DataFrame), "arrow" (pyarrow.Table) or "numpy" (dict
+                of column name to numpy array) (Default "pandas").
+        """
+        if format not in (self.ARROW_STREAM, self.PARQUET):
+            raise ValueError(f"Not supported format: {format}")
+        if return_type not in ("pandas", "arrow", "numpy"):
+            raise ValueError(f"Not supported return type: {return_type}")
+        self._pa = _import_pyarrow()
+        self.format = format
+        self.compression = compression
+        self.return_type = return_type
+        # The prediction result could be in either format, which is detected when
+        # it is deserialized.
+        if format == self.PARQUET:
+            self.content_type = self.PARQUET_CONTENT_TYPE
+            self.accept = (
+                f"{self.PARQUET_CONTENT_TYPE}, {self.ARROW_STREAM_CONTENT_TYPE}"
+            )
+        else:
+            self.content_type = self.ARROW_STREAM_CONTENT_TYPE
+            self.accept = (
+                f"{self.ARROW_STREAM_CONTENT_TYPE}, {self.PARQUET_CONTENT_TYPE}"
+            )
+
+    def _to_table(self, data):
+        pa = self._pa
+        if isinstance(data, pa.Table):
+            return data
+        elif isinstance(data, pa.RecordBatch):
+            return pa.Table.from_batches([data])
+        elif _is_pandas_dataframe(data):
+            return pa.Table.from_pandas(data, preserve_index=False)
+        elif isinstance(data, dict):
+            return pa.table(data)
+        elif _is_numpy_ndarray(data):
+            if data.dtype.names:
+                return pa.table({name: data[name] for name in data.dtype.names})
+            elif data.ndim == 2:
+                return pa.table(
+                    {str(idx): data[:, idx] for idx in range(data.shape[1])}
+                )
+            elif data.ndim == 1:
+                return pa.table({"0": data})
+        raise ValueError(
+            f"Not supported input data type for ArrowSerializer: {type(data)}"
+        )
+
+    def serialize(self, data) -> bytes:
+        table = self._to_table(data)
+        sink = self._pa.BufferOutputStream()
+        if self.format == self.PARQUET:
+            import pyarrow.parquet as pq
+
+            pq.write_table(table, sink, compression=self.compression or "snappy")
+        else:
+            options = self._pa.ipc.IpcWriteOptions(compression=self.compression)
+            with self._pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+                writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    def deserialize(self, data: bytes):
+        # Wrap the response body without copying, the columns of the table are
+        # views of the buffer.
+        buf = self._pa.py_buffer(data)
+        if data[:4] == self._PARQUET_MAGIC:
+            import pyarrow.parquet as pq
+
+            table = pq.read_table(self._pa.BufferReader(buf))
+        else:
+            table = self._pa.ipc.open_stream(buf).read_all()
+
+        if self.return_type == "arrow":
+            return table
+        elif self.return_type == "numpy":
+            return {
+                name: column.to_numpy()
+                for name, column in zip(table.column_names, table.columns)
+            }
+        # split_blocks avoids consolidating the columns into 2-D blocks, allowing
+        # zero-copy conversion of the numeric columns without nulls.
+        return table.to_pandas(split_blocks=True)
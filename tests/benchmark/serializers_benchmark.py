@@ -0,0 +1,233 @@
+#  Copyright 2023 Alibaba, Inc. or its affiliates.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       https://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Micro-benchmark for the serializers.
+
+The ArrowSerializer benchmark requires pandas and pyarrow, and is skipped if they are
+not installed.
+
+Usage::
+
+    python -m tests.benchmark.serializers_benchmark
+
+"""
+
+import timeit
+
+import numpy as np
+from eas_prediction import pytorch_predict_pb2 as pt_pb
+from eas_prediction import tf_request_pb2 as tf_pb
+
+from pai.serializers import (
+    ArrowSerializer,
+    FastJsonSerializer,
+    JsonSerializer,
+    MsgPackSerializer,
+    PyTorchSerializer,
+    TensorFlowSerializer,
+)
+
+
+def _elementwise_tf_serialize(data):
+    request = tf_pb.PredictRequest()
+    for name, value in data.items():
+        request.inputs[name].dtype = tf_pb.DT_FLOAT
+        request.inputs[name].array_shape.dim.extend(value.shape)
+        request.inputs[name].float_val.extend(np.ravel(value).tolist())
+    return request.SerializeToString()
+
+
+def _elementwise_tf_deserialize(data):
+    response = tf_pb.PredictResponse()
+    response.ParseFromString(data)
+    return {
+        name: np.asarray(output.float_val, np.float32).reshape(
+            list(output.array_shape.dim)
+        )
+        for name, output in response.outputs.items()
+    }
+
+
+def _elementwise_pt_serialize(data):
+    request = pt_pb.PredictRequest()
+    array_proto = request.inputs.add()
+    array_proto.dtype = pt_pb.DT_FLOAT
+    array_proto.array_shape.dim.extend(data.shape)
+    array_proto.float_val.extend(np.ravel(data).tolist())
+    return request.SerializeToString()
+
+
+def _elementwise_pt_deserialize(data):
+    response = pt_pb.PredictResponse()
+    response.ParseFromString(data)
+    output = response.outputs[0]
+    return np.asarray(output.float_val, np.float32).reshape(
+        list(output.array_shape.dim)
+    )
+
+
+def _tf_response(value):
+    response = tf_pb.PredictResponse()
+    response.outputs["output"].dtype = tf_pb.DT_FLOAT
+    response.outputs["output"].array_shape.dim.extend(value.shape)
+    response.outputs["output"].float_val.extend(np.ravel(value).tolist())
+    return response.SerializeToString()
+
+
+def _pt_response(value):
+    response = pt_pb.PredictResponse()
+    output = response.outputs.add()
+    output.dtype = pt_pb.DT_FLOAT
+    output.array_shape.dim.extend(value.shape)
+    output.float_val.extend(np.ravel(value).tolist())
+    return response.SerializeToString()
+
+
+def _report(
+    name, number, elementwise_fn, fast_fn, baseline="element-wise", candidate="packed"
+):
+    elementwise = min(timeit.repeat(elementwise_fn, number=number, repeat=3)) / number
+    fast = min(timeit.repeat(fast_fn, number=number, repeat=3)) / number
+    print(
+        f"{name:<32} {baseline}: {elementwise * 1000:9.3f} ms"
+        f"  {candidate}: {fast * 1000:9.3f} ms  speedup: {elementwise / fast:7.1f}x"
+    )
+
+
+def json_benchmark(size: int = 100_000, number: int = 5):
+    data = {
+        "embedding": np.random.rand(size // 100, 100).astype(np.float32),
+        "ids": np.arange(size // 100),
+    }
+    json_serializer = JsonSerializer()
+    fast_serializer = FastJsonSerializer()
+    msgpack_serializer = MsgPackSerializer()
+
+    def to_lists():
+        return {name: value.tolist() for name, value in data.items()}
+
+    print(f"dict of numpy arrays with {size} elements:")
+    _report(
+        "FastJsonSerializer.serialize",
+        number,
+        lambda: json_serializer.serialize(to_lists()),
+        lambda: fast_serializer.serialize(data),
+        baseline="json",
+        candidate="fast-json",
+    )
+    _report(
+        "MsgPackSerializer.serialize",
+        number,
+        lambda: json_serializer.serialize(to_lists()),
+        lambda: msgpack_serializer.serialize(data),
+        baseline="json",
+        candidate="msgpack",
+    )
+    json_payload = json_serializer.serialize(to_lists())
+    msgpack_payload = msgpack_serializer.serialize(data)
+    _report(
+        "MsgPackSerializer.deserialize",
+        number,
+        lambda: json_serializer.deserialize(json_payload),
+        lambda: msgpack_serializer.deserialize(msgpack_payload),
+        baseline="json",
+        candidate="msgpack",
+    )
+
+
+def arrow_benchmark(rows: int = 10_000, number: int = 5):
+    try:
+        import pandas as pd
+
+        arrow_serializer = ArrowSerializer()
+    except ImportError as e:
+        print(f"Skip ArrowSerializer benchmark: {e}")
+        return
+
+    df = pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "score": np.random.rand(rows),
+            "feature": np.random.rand(rows).astype(np.float32),
+            "flag": np.random.rand(rows) > 0.5,
+            "category": np.random.choice(["a", "b", "c"], rows),
+        }
+    )
+    json_serializer = JsonSerializer()
+    json_payload = json_serializer.serialize(df)
+    arrow_payload = arrow_serializer.serialize(df)
+
+    print(f"DataFrame with {rows} rows and {len(df.columns)} columns:")
+    print(
+        f"{'payload size':<32} json: {len(json_payload) / 1024:9.1f} KiB"
+        f"  arrow: {len(arrow_payload) / 1024:9.1f} KiB"
+    )
+    _report(
+        "ArrowSerializer.serialize",
+        number,
+        lambda: json_serializer.serialize(df),
+        lambda: arrow_serializer.serialize(df),
+        baseline="json",
+        candidate="arrow",
+    )
+    _report(
+        "ArrowSerializer.deserialize",
+        number,
+        lambda: pd.DataFrame(
+            json_serializer.deserialize(json_payload), columns=df.columns
+        ),
+        lambda: arrow_serializer.deserialize(arrow_payload),
+        baseline="json",
+        candidate="arrow",
+    )
+
+
+def main(size: int = 100_000, number: int = 5):
+    value = np.random.rand(size // 100, 100).astype(np.float32)
+    tf_serializer = TensorFlowSerializer()
+    pt_serializer = PyTorchSerializer()
+    tf_response = _tf_response(value)
+    pt_response = _pt_response(value)
+
+    print(f"float32 tensor with {value.size} elements:")
+    _report(
+        "TensorFlowSerializer.serialize",
+        number,
+        lambda: _elementwise_tf_serialize({"input": value}),
+        lambda: tf_serializer.serialize({"input": value}),
+    )
+    _report(
+        "TensorFlowSerializer.deserialize",
+        number,
+        lambda: _elementwise_tf_deserialize(tf_response),
+        lambda: tf_serializer.deserialize(tf_response),
+    )
+    _report(
+        "PyTorchSerializer.serialize",
+        number,
+        lambda: _elementwise_pt_serialize(value),
+        lambda: pt_serializer.serialize(value),
+    )
+    _report(
+        "PyTorchSerializer.deserialize",
+        number,
+        lambda: _elementwise_pt_deserialize(pt_response),
+        lambda: pt_serializer.deserialize(pt_response),
+    )
+
+
+if __name__ == "__main__":
+    main()
+    json_benchmark()
+    arrow_benchmark()
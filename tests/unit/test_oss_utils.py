@@ -0,0 +1,716 @@
+#  Copyright 2023 Alibaba, Inc. or its affiliates.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       https://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import gzip
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+from unittest.mock import patch
+
+import oss2
+
+from pai.common import oss_utils
+from tests.unit import BaseUnitTestCase
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class FakeBucket(object):
+    """An in-memory OSS bucket."""
+
+    def __init__(self, bucket_name="test-bucket"):
+        self.bucket_name = bucket_name
+        self.objects = {}
+        self.requests = []
+        self._uploads = {}
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self.max_inflight = 0
+
+    def _request(self, name, *args):
+        with self._lock:
+            self.requests.append((name,) + args)
+            self._inflight += 1
+            self.max_inflight = max(self.max_inflight, self._inflight)
+
+    def _done(self):
+        with self._lock:
+            self._inflight -= 1
+
+    def put_object_from_file(self, key, filename, progress_callback=None):
+        self._request("put_object", key)
+        try:
+            with open(filename, "rb") as f:
+                data = f.read()
+            self.objects[key] = data
+            if progress_callback:
+                progress_callback(len(data), len(data))
+        finally:
+            self._done()
+
+    def init_multipart_upload(self, key):
+        self._request("init_multipart_upload", key)
+        self._done()
+        upload_id = uuid.uuid4().hex
+        self._uploads[upload_id] = {}
+        return _MockResp(upload_id=upload_id)
+
+    def upload_part(self, key, upload_id, part_number, data, progress_callback=None):
+        self._request("upload_part", key, part_number)
+        try:
+            content = data if isinstance(data, bytes) else data.read()
+            self._uploads[upload_id][part_number] = content
+            if progress_callback:
+                progress_callback(len(content), len(content))
+            return _MockResp(etag=str(part_number))
+        finally:
+            self._done()
+
+    def complete_multipart_upload(self, key, upload_id, parts):
+        self._request("complete_multipart_upload", key)
+        self._done()
+        uploaded = self._uploads.pop(upload_id)
+        self.objects[key] = b"".join(uploaded[p.part_number] for p in parts)
+
+    def abort_multipart_upload(self, key, upload_id):
+        self._uploads.pop(upload_id, None)
+
+    def list_objects_v2(self, prefix="", continuation_token="", max_keys=100, **kwargs):
+        self._request("list_objects_v2", prefix, continuation_token)
+        self._done()
+        keys = sorted(
+            k for k in self.objects if k.startswith(prefix) and k > continuation_token
+        )
+        page = keys[:max_keys]
+        result = _MockResp()
+        result.object_list = [
+            oss2.models.SimplifiedObjectInfo(
+                key=k,
+                last_modified=0,
+                etag=self._etag(k),
+                type="Normal",
+                size=len(self.objects[k]),
+                storage_class="Standard",
+            )
+            for k in page
+        ]
+        result.prefix_list = []
+        result.is_truncated = len(keys) > max_keys
+        result.next_continuation_token = page[-1] if result.is_truncated else ""
+        return result
+
+    def object_exists(self, key):
+        return key in self.objects
+
+    def get_object_meta(self, key):
+        self._request("get_object_meta", key)
+        self._done()
+        result = _MockResp(etag=self._etag(key))
+        result.content_length = len(self.objects[key])
+        return result
+
+    def _etag(self, key):
+        return str(hash(self.objects[key]))
+
+    def _read(self, key, byte_range, headers, progress_callback):
+        if headers and headers.get("If-Match") != self._etag(key):
+            raise oss2.exceptions.PreconditionFailed(412, {}, "", {})
+        if key not in self.objects:
+            raise oss2.exceptions.NoSuchKey(404, {}, "", {})
+        data = self.objects[key]
+        if byte_range:
+            data = data[byte_range[0] : byte_range[1] + 1]
+        if progress_callback:
+            progress_callback(len(data), len(data))
+        return data
+
+    def get_object(self, key, byte_range=None, headers=None, progress_callback=None):
+        self._request("get_object", key, byte_range)
+        try:
+            return io.BytesIO(self._read(key, byte_range, headers, progress_callback))
+        finally:
+            self._done()
+
+    def get_object_to_file(
+        self, key, filename, byte_range=None, headers=None, progress_callback=None
+    ):
+        self._request("get_object", key, byte_range)
+        try:
+            with open(filename, "wb") as f:
+                f.write(self._read(key, byte_range, headers, progress_callback))
+        finally:
+            self._done()
+
+    def put_object(self, key, data, progress_callback=None):
+        self._request("put_object", key)
+        self._done()
+        self.objects[key] = data.encode() if isinstance(data, str) else data
+
+    def copy_object(self, source_bucket_name, source_key, target_key):
+        self._request("copy_object", source_key, target_key)
+        self._done()
+        if source_key not in self.objects:
+            raise oss2.exceptions.NoSuchKey(404, {}, "", {})
+        self.objects[target_key] = self.objects[source_key]
+
+
+class _MockResp(object):
+    def __init__(self, upload_id=None, etag=None):
+        self.upload_id = upload_id
+        self.etag = etag
+        self.request_id = "request-id"
+        self.status = 200
+        self.headers = {}
+
+
+def make_source_dir(test_case):
+    source_dir = tempfile.mkdtemp()
+    test_case.addCleanup(shutil.rmtree, source_dir)
+    files = {"a.bin": os.urandom(3000), "sub/b.txt": b"b" * 5000}
+    for name, content in files.items():
+        path = os.path.join(source_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+    return source_dir, files
+
+
+class TestUpload(BaseUnitTestCase):
+    def test_upload_directory(self):
+        bucket = FakeBucket()
+        with tempfile.TemporaryDirectory() as source_dir:
+            files = {"large.bin": os.urandom(2500)}
+            for i in range(50):
+                files["dir-{}/file-{}.txt".format(i % 3, i)] = os.urandom(i)
+            for name, content in files.items():
+                path = os.path.join(source_dir, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(content)
+
+            with patch.object(oss_utils, "_MULTIPART_THRESHOLD", 1024), patch.multiple(
+                oss2.defaults, part_size=1000, min_part_size=1000
+            ):
+                uri = oss_utils.upload(
+                    source_dir, "prefix/data", bucket=bucket, max_workers=4
+                )
+
+        self.assertEqual(uri, "oss://test-bucket/prefix/data/")
+        self.assertEqual(
+            bucket.objects, {"prefix/data/" + k: v for k, v in files.items()}
+        )
+        parts = [r for r in bucket.requests if r[0] == "upload_part"]
+        self.assertEqual(len(parts), 3)
+        self.assertNotIn(("put_object", "prefix/data/large.bin"), bucket.requests)
+        self.assertLessEqual(bucket.max_inflight, 4)
+
+    def test_upload_files_failed(self):
+        source_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source_dir)
+        files = []
+        for name in ["a.bin", "b.bin", "c.bin"]:
+            with open(os.path.join(source_dir, name), "wb") as f:
+                f.write(os.urandom(2500))
+            files.append((os.path.join(source_dir, name), "prefix/" + name))
+        bucket = FakeBucket()
+        upload_part = bucket.upload_part
+
+        def failed_upload_part(key, *args, **kwargs):
+            if key == "prefix/b.bin":
+                raise oss2.exceptions.RequestError(None)
+            return upload_part(key, *args, **kwargs)
+
+        with patch.object(
+            bucket, "upload_part", side_effect=failed_upload_part
+        ), patch.object(oss_utils, "_MULTIPART_THRESHOLD", 1024), patch.multiple(
+            oss2.defaults, part_size=1000, min_part_size=1000
+        ):
+            with self.assertRaises(oss2.exceptions.RequestError):
+                oss_utils._upload_files(
+                    files, bucket=bucket, desc="Uploading", max_workers=1
+                )
+        # the incomplete uploads of the other files are aborted.
+        self.assertEqual(bucket._uploads, {})
+        self.assertEqual(list(bucket.objects), ["prefix/a.bin"])
+
+    def extract(self, data, mode):
+        with tarfile.open(fileobj=io.BytesIO(data), mode=mode) as tar:
+            return {m.name: tar.extractfile(m).read() for m in tar if m.isfile()}
+
+    def test_upload_tar_stream(self):
+        source_dir, files = make_source_dir(self)
+        bucket = FakeBucket()
+        with patch.multiple(oss2.defaults, part_size=1000):
+            uri = oss_utils.upload(source_dir, "prefix/", bucket=bucket, is_tar=True)
+        self.assertEqual(uri, "oss://test-bucket/prefix/source.tar.gz")
+        self.assertGreater(len(self.requests_of(bucket, "upload_part")), 1)
+        # the archive is a single gzip stream, which could be read in stream mode.
+        self.assertEqual(
+            self.extract(bucket.objects["prefix/source.tar.gz"], "r|gz"), files
+        )
+
+        with patch.multiple(oss2.defaults, part_size=1000):
+            uri = oss_utils.upload(
+                source_dir,
+                "prefix/parallel/",
+                bucket=bucket,
+                is_tar=True,
+                tar_compression="parallel_gzip",
+            )
+        self.assertEqual(uri, "oss://test-bucket/prefix/parallel/source.tar.gz")
+        self.assertEqual(
+            self.extract(bucket.objects["prefix/parallel/source.tar.gz"], "r:gz"),
+            files,
+        )
+
+        # small archive is uploaded with a single request.
+        uri = oss_utils.upload(
+            os.path.join(source_dir, "sub/b.txt"),
+            "prefix/b.tar.gz",
+            bucket=bucket,
+            is_tar=True,
+        )
+        self.assertEqual(uri, "oss://test-bucket/prefix/b.tar.gz")
+        self.assertEqual(
+            self.extract(bucket.objects["prefix/b.tar.gz"], "r:gz"),
+            {"b.txt": files["sub/b.txt"]},
+        )
+
+    @unittest.skipIf(zstandard is None, "zstandard is not available.")
+    def test_upload_tar_stream_zstd(self):
+        source_dir, files = make_source_dir(self)
+        bucket = FakeBucket()
+        uri = oss_utils.upload(
+            source_dir, "prefix/", bucket=bucket, is_tar=True, tar_compression="zstd"
+        )
+        self.assertEqual(uri, "oss://test-bucket/prefix/source.tar.zst")
+        data = zstandard.ZstdDecompressor().stream_reader(
+            io.BytesIO(bucket.objects["prefix/source.tar.zst"])
+        )
+        self.assertEqual(self.extract(data.read(), "r:"), files)
+
+    def test_upload_tar_stream_failed(self):
+        source_dir, _ = make_source_dir(self)
+        bucket = FakeBucket()
+        with patch.object(
+            bucket, "upload_part", side_effect=oss2.exceptions.RequestError(None)
+        ), patch.object(bucket, "abort_multipart_upload") as abort, patch.multiple(
+            oss2.defaults, part_size=1000
+        ):
+            with self.assertRaises(oss2.exceptions.RequestError):
+                oss_utils.upload(source_dir, "prefix/", bucket=bucket, is_tar=True)
+        abort.assert_called_once()
+        self.assertNotIn("prefix/source.tar.gz", bucket.objects)
+
+    def test_parallel_gzip_writer(self):
+        data = os.urandom(1000) * 10
+        output = io.BytesIO()
+        writer = oss_utils._ParallelGzipWriter(output, chunk_size=1024, max_workers=2)
+        for i in range(0, len(data), 300):
+            writer.write(data[i : i + 300])
+        writer.close()
+        self.assertEqual(gzip.decompress(output.getvalue()), data)
+
+    def test_parallel_gzip_writer_tar_stream(self):
+        source_dir, files = make_source_dir(self)
+        output = io.BytesIO()
+        writer = oss_utils._ParallelGzipWriter(output, chunk_size=1024)
+        with tarfile.open(fileobj=writer, mode="w|") as tar:
+            tar.add(source_dir, arcname="")
+        writer.close()
+        self.assertGreater(writer._members, 1)
+
+        # the gzip members are read in stream mode through gzip.GzipFile.
+        fileobj = gzip.GzipFile(fileobj=io.BytesIO(output.getvalue()))
+        with tarfile.open(fileobj=fileobj, mode="r|") as tar:
+            result = {m.name: tar.extractfile(m).read() for m in tar if m.isfile()}
+        self.assertEqual(result, files)
+
+    def test_upload_tar_stream_complete_failed(self):
+        source_dir, _ = make_source_dir(self)
+        bucket = FakeBucket()
+        with patch.object(
+            bucket,
+            "complete_multipart_upload",
+            side_effect=oss2.exceptions.RequestError(None),
+        ), patch.object(bucket, "abort_multipart_upload") as abort, patch.multiple(
+            oss2.defaults, part_size=1000
+        ):
+            with self.assertRaises(oss2.exceptions.RequestError):
+                oss_utils.upload(source_dir, "prefix/", bucket=bucket, is_tar=True)
+        abort.assert_called_once()
+
+    def test_upload_tar_stream_add_failed(self):
+        source_dir, _ = make_source_dir(self)
+        bucket = FakeBucket()
+        writers = []
+
+        class GzipWriter(oss_utils._ParallelGzipWriter):
+            def __init__(self, *args, **kwargs):
+                super(GzipWriter, self).__init__(*args, **kwargs)
+                writers.append(self)
+
+        with patch.object(oss_utils, "_ParallelGzipWriter", GzipWriter), patch.object(
+            tarfile.TarFile, "add", side_effect=OSError("Permission denied")
+        ):
+            with self.assertRaises(OSError):
+                oss_utils.upload(
+                    source_dir,
+                    "prefix/",
+                    bucket=bucket,
+                    is_tar=True,
+                    tar_compression="parallel_gzip",
+                )
+        self.assertEqual(len(writers), 1)
+        self.assertTrue(writers[0]._executor._shutdown)
+
+    def test_upload_tar_stream_buffered_parts(self):
+        bucket = FakeBucket()
+        upload_part = bucket.upload_part
+        lock = threading.Lock()
+        inflight = []
+        max_inflight = []
+
+        def slow_upload_part(*args, **kwargs):
+            with lock:
+                inflight.append(None)
+                max_inflight.append(len(inflight))
+            threading.Event().wait(0.01)
+            try:
+                return upload_part(*args, **kwargs)
+            finally:
+                with lock:
+                    inflight.pop()
+
+        with patch.object(
+            bucket, "upload_part", side_effect=slow_upload_part
+        ), patch.multiple(oss2.defaults, part_size=1000, min_part_size=1000):
+            with oss_utils._MultipartUploadWriter(
+                bucket, "data.bin", desc="Uploading", max_workers=32
+            ) as writer:
+                writer.write(os.urandom(20000))
+        self.assertEqual(len(bucket.objects["data.bin"]), 20000)
+        self.assertLessEqual(max(max_inflight), 4)
+
+    @classmethod
+    def requests_of(cls, bucket, name):
+        return [r for r in bucket.requests if r[0] == name]
+
+
+class TestDownload(BaseUnitTestCase):
+    def test_download_directory(self):
+        bucket = FakeBucket()
+        bucket.objects = {
+            "model/large.bin": os.urandom(2500),
+            "model/sub/": b"",
+        }
+        for i in range(150):
+            bucket.objects["model/sub/file-{}.txt".format(i)] = os.urandom(i)
+
+        with tempfile.TemporaryDirectory() as target_dir, patch.object(
+            oss_utils, "_RANGED_DOWNLOAD_THRESHOLD", 1024
+        ), patch.object(oss2.defaults, "multiget_part_size", 1000):
+            result = oss_utils.download(
+                "model", target_dir, bucket=bucket, max_workers=4
+            )
+            self.assertEqual(result, target_dir)
+            for key, content in bucket.objects.items():
+                if key.endswith("/"):
+                    continue
+                with open(
+                    os.path.join(target_dir, os.path.relpath(key, "model/")), "rb"
+                ) as f:
+                    self.assertEqual(f.read(), content)
+
+        gets = [r for r in bucket.requests if r[0] == "get_object"]
+        self.assertEqual(len(gets), 153)
+        self.assertIn(("get_object", "model/large.bin", (2000, 2499)), bucket.requests)
+        self.assertLessEqual(bucket.max_inflight, 4)
+        # transfers start before the listing is finished.
+        first_get = min(
+            i for i, r in enumerate(bucket.requests) if r[0] == "get_object"
+        )
+        last_list = max(
+            i for i, r in enumerate(bucket.requests) if r[0] == "list_objects_v2"
+        )
+        self.assertLess(first_get, last_list)
+
+    def test_download_failed(self):
+        bucket = FakeBucket()
+        bucket.objects = {"model/large.bin": os.urandom(2500)}
+        get_object = bucket.get_object
+
+        def failed_get_object(key, byte_range=None, **kwargs):
+            if byte_range[0] == 2000:
+                raise oss2.exceptions.RequestError(None)
+            return get_object(key, byte_range=byte_range, **kwargs)
+
+        with tempfile.TemporaryDirectory() as target_dir, patch.object(
+            bucket, "get_object", side_effect=failed_get_object
+        ), patch.object(oss_utils, "_RANGED_DOWNLOAD_THRESHOLD", 1024), patch.object(
+            oss2.defaults, "multiget_part_size", 1000
+        ):
+            with self.assertRaises(oss2.exceptions.RequestError):
+                oss_utils.download("model", target_dir, bucket=bucket, max_workers=1)
+            # no file that looks complete is left by the failed download.
+            self.assertEqual(os.listdir(target_dir), [])
+
+
+class TestSync(BaseUnitTestCase):
+    def setUp(self):
+        super(TestSync, self).setUp()
+        self.bucket = FakeBucket()
+        self.source_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source_dir)
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.cache_path = os.path.join(cache_dir, "file_hashes.json")
+        for name in ["train.py", "utils/a.py", "utils/b.py"]:
+            self.write(name, name.encode())
+
+    def write(self, name, content, mtime_ns=None):
+        path = os.path.join(self.source_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        # files modified recently are not cached by the file hash cache.
+        if mtime_ns is None:
+            mtime_ns = time.time_ns() - 60 * 10**9
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def sync(self):
+        self.bucket.requests.clear()
+        return oss_utils.sync(
+            self.source_dir,
+            "pai/training_src/sha256",
+            bucket=self.bucket,
+            hash_cache_path=self.cache_path,
+        )
+
+    def requests_of(self, name):
+        return [r for r in self.bucket.requests if r[0] == name]
+
+    def test_sync(self):
+        uri = self.sync()
+        prefix = oss_utils.OssUriObj(uri).object_key
+        self.assertTrue(prefix.startswith("pai/training_src/sha256/"))
+        self.assertEqual(self.bucket.objects[prefix + "utils/a.py"], b"utils/a.py")
+        self.assertIn(prefix + ".pai_manifest.json", self.bucket.objects)
+
+        # unchanged source is not uploaded again, and files are not hashed again.
+        with patch.object(
+            oss_utils._FileHashCache, "_hash_file", side_effect=AssertionError
+        ):
+            self.assertEqual(self.sync(), uri)
+        self.assertEqual(self.requests_of("put_object"), [])
+
+        # only the changed file is uploaded, unchanged files are copied.
+        self.write("utils/b.py", b"changed")
+        new_uri = self.sync()
+        self.assertNotEqual(new_uri, uri)
+        new_prefix = oss_utils.OssUriObj(new_uri).object_key
+        self.assertEqual(self.bucket.objects[new_prefix + "utils/b.py"], b"changed")
+        self.assertEqual(self.bucket.objects[new_prefix + "train.py"], b"train.py")
+        uploaded = [r[1] for r in self.requests_of("put_object")]
+        self.assertEqual(
+            uploaded[:2], [new_prefix + "utils/b.py", new_prefix + ".pai_manifest.json"]
+        )
+        self.assertTrue(uploaded[2].startswith("pai/training_src/sha256/.latest-"))
+        self.assertEqual(len(self.requests_of("copy_object")), 2)
+
+        # the previous source path is reused if the change is reverted.
+        self.write("utils/b.py", b"utils/b.py")
+        self.assertEqual(self.sync(), uri)
+
+    def test_racy_mtime(self):
+        cache = oss_utils._FileHashCache()
+        path = os.path.join(self.source_dir, "train.py")
+        mtime_ns = time.time_ns()
+        self.write("train.py", b"version1", mtime_ns=mtime_ns)
+        digest = cache.digest(path)
+        # a same-size edit within the granularity of the modification time.
+        self.write("train.py", b"version2", mtime_ns=mtime_ns)
+        self.assertNotEqual(cache.digest(path), digest)
+
+        self.write("utils/a.py", b"settled")
+        with patch.object(
+            oss_utils._FileHashCache, "_hash_file", wraps=cache._hash_file
+        ) as hash_file:
+            cache.digest(os.path.join(self.source_dir, "utils/a.py"))
+            cache.digest(os.path.join(self.source_dir, "utils/a.py"))
+        self.assertEqual(hash_file.call_count, 1)
+
+    def test_sync_file(self):
+        uri = oss_utils.sync(
+            os.path.join(self.source_dir, "train.py"),
+            "pai/input_data/sha256/",
+            bucket=self.bucket,
+            hash_cache_path=None,
+        )
+        self.assertTrue(uri.endswith("/train.py"))
+        self.assertEqual(
+            self.bucket.objects[oss_utils.OssUriObj(uri).object_key], b"train.py"
+        )
+
+
+class TestDownloadAndExtract(BaseUnitTestCase):
+    def test_download_and_extract(self):
+        source_dir, files = make_source_dir(self)
+        bucket = FakeBucket()
+        with patch.multiple(oss2.defaults, part_size=1000):
+            oss_utils.upload(
+                source_dir, "model/model.tar.gz", bucket=bucket, is_tar=True
+            )
+            if zstandard is not None:
+                oss_utils.upload(
+                    source_dir,
+                    "model/model.tar.zst",
+                    bucket=bucket,
+                    is_tar=True,
+                    tar_compression="zstd",
+                )
+
+        for key in ["model/model.tar.gz", "model/model.tar.zst"]:
+            if key not in bucket.objects:
+                continue
+            bucket.requests.clear()
+            with tempfile.TemporaryDirectory() as target_dir, patch.object(
+                oss2.defaults, "multiget_part_size", 1000
+            ):
+                self.assertEqual(
+                    oss_utils.download(key, target_dir, bucket=bucket, un_tar=True),
+                    target_dir,
+                )
+                for name, content in files.items():
+                    with open(os.path.join(target_dir, name), "rb") as f:
+                        self.assertEqual(f.read(), content)
+            ranges = [r[2] for r in bucket.requests if r[0] == "get_object"]
+            self.assertGreater(len(ranges), 1)
+            self.assertEqual(ranges[0], (0, 999))
+
+    def test_download_and_extract_multiple_members(self):
+        source_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source_dir)
+        # larger than a chunk of _ParallelGzipWriter, compressed into multiple
+        # gzip members.
+        files = {"model.bin": os.urandom(9 * 1024 * 1024), "config.json": b"{}"}
+        for name, content in files.items():
+            with open(os.path.join(source_dir, name), "wb") as f:
+                f.write(content)
+        bucket = FakeBucket()
+        oss_utils.upload(
+            source_dir,
+            "model/model.tar.gz",
+            bucket=bucket,
+            is_tar=True,
+            tar_compression="parallel_gzip",
+        )
+
+        with tempfile.TemporaryDirectory() as target_dir, patch.object(
+            oss2.defaults, "multiget_part_size", 1024 * 1024
+        ):
+            oss_utils.download(
+                "model/model.tar.gz", target_dir, bucket=bucket, un_tar=True
+            )
+            for name, content in files.items():
+                with open(os.path.join(target_dir, name), "rb") as f:
+                    self.assertEqual(f.read(), content)
+
+    def test_range_prefetch_reader(self):
+        bucket = FakeBucket()
+        bucket.objects["data.bin"] = os.urandom(20000)
+        reads = []
+        get_object = bucket.get_object
+
+        def record_get_object(key, byte_range=None, **kwargs):
+            reads.append(byte_range)
+            return get_object(key, byte_range=byte_range, **kwargs)
+
+        with patch.object(bucket, "get_object", side_effect=record_get_object):
+            with oss_utils._RangePrefetchReader(
+                bucket,
+                "data.bin",
+                size=20000,
+                etag=bucket._etag("data.bin"),
+                chunk_size=1000,
+                max_workers=32,
+            ) as reader:
+                self.assertEqual(reader.read(10), bucket.objects["data.bin"][:10])
+                # the ranges buffered ahead of the reads are bounded.
+                self.assertLessEqual(len(reads), 4)
+                self.assertEqual(reader.read(), bucket.objects["data.bin"][10:])
+
+    def test_extract_failed_cleanup(self):
+        output = io.BytesIO()
+        with tarfile.open(fileobj=output, mode="w:gz") as tar:
+            for name in ["a.txt", "sub/b.txt", "../escaped.txt"]:
+                info = tarfile.TarInfo(name)
+                info.size = 1
+                tar.addfile(info, io.BytesIO(b"x"))
+
+        with tempfile.TemporaryDirectory() as target_dir:
+            with open(os.path.join(target_dir, "existing.txt"), "wb") as f:
+                f.write(b"existing")
+            with self.assertRaises(ValueError):
+                oss_utils._extract_tar_stream(io.BytesIO(output.getvalue()), target_dir)
+            self.assertEqual(os.listdir(target_dir), ["existing.txt"])
+
+            dest = os.path.join(target_dir, "new/dest")
+            with self.assertRaises(ValueError):
+                oss_utils._extract_tar_stream(io.BytesIO(output.getvalue()), dest)
+            self.assertEqual(os.listdir(target_dir), ["existing.txt"])
+
+    def test_extract_unsafe_member(self):
+        def make_tar(*members):
+            output = io.BytesIO()
+            with tarfile.open(fileobj=output, mode="w:gz") as tar:
+                for info in members:
+                    tar.addfile(info, io.BytesIO(b"x" * info.size))
+            return output.getvalue()
+
+        def file_member(name):
+            info = tarfile.TarInfo(name)
+            info.size = 1
+            return info
+
+        def link_member(name, target, type=tarfile.SYMTYPE):
+            info = tarfile.TarInfo(name)
+            info.type = type
+            info.linkname = target
+            return info
+
+        cases = [
+            [file_member("../escaped.txt")],
+            [file_member("/tmp/escaped.txt")],
+            [link_member("link", "/etc/passwd")],
+            [link_member("link", "../../etc/passwd", tarfile.LNKTYPE)],
+            [link_member("dir", ".."), file_member("dir/escaped.txt")],
+        ]
+        for members in cases:
+            with tempfile.TemporaryDirectory() as target_dir:
+                dest = os.path.join(target_dir, "dest")
+                with self.assertRaises((ValueError, tarfile.TarError)):
+                    oss_utils._extract_tar_stream(io.BytesIO(make_tar(*members)), dest)
+                self.assertFalse(
+                    os.path.exists(os.path.join(target_dir, "escaped.txt"))
+                )
@@ -0,0 +1,1644 @@
+#  Copyright 2023 Alibaba, Inc. or its affiliates.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       https://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import asyncio
+import base64
+import gzip
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import Future, ThreadPoolExecutor
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+import requests
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from pai.api.base import PaginatedResult
+from pai.exception import ConcurrencyLimitExceededException, PredictionException
+from pai.predictor import (
+    AIMDLimit,
+    AsyncPredictor,
+    BatchConfig,
+    CompressionConfig,
+    ConcurrencyLimiter,
+    ConnectionConfig,
+    EndpointType,
+    GradientLimit,
+    LatencyHistogram,
+    LoadBalancerConfig,
+    LocalPredictor,
+    OffloadedRawResponse,
+    PayloadOffloadConfig,
+    Predictor,
+    RetryConfig,
+    ServiceDescriptorCache,
+    StreamingRawResponse,
+    WaitConfig,
+    _InstanceBalancer,
+    _merge_batch,
+    _SinkResultTracker,
+    _split_batch,
+    service_descriptor_cache,
+)
+from pai.serializers import (
+    ArrowSerializer,
+    JsonSerializer,
+    MsgPackSerializer,
+    PyTorchSerializer,
+    TensorFlowSerializer,
+    _signature_def_cache,
+)
+from tests.unit import BaseUnitTestCase
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def make_mock_session(endpoint="http://127.0.0.1", service_config=None):
+    session = MagicMock()
+    session.region_id = "cn-hangzhou"
+    session.service_api.get.return_value = {
+        "ServiceName": "mock_service",
+        "InternetEndpoint": endpoint,
+        "IntranetEndpoint": endpoint,
+        "AccessToken": "mock_token",
+        "Status": "Running",
+        "ServiceConfig": json.dumps(service_config or {}),
+        "CurrentVersion": 1,
+        "LatestVersion": 1,
+    }
+    return session
+
+
+class BasePredictorTestCase(BaseUnitTestCase):
+    def setUp(self):
+        super(BasePredictorTestCase, self).setUp()
+        service_descriptor_cache.clear()
+
+
+class TestPredictorAsyncSession(BasePredictorTestCase):
+    def test_reuse_pooled_session(self):
+        async def handler(request):
+            return web.Response(body=b"ok")
+
+        async def run():
+            app = web.Application()
+            app.router.add_route("*", "/{tail:.*}", handler)
+            server = TestServer(app)
+            await server.start_server()
+            predictor = Predictor(
+                "mock_service",
+                session=make_mock_session(endpoint=str(server.make_url("/"))),
+                connection_config=ConnectionConfig(limit=8, limit_per_host=4),
+            )
+            async with predictor:
+                for _ in range(3):
+                    resp = await predictor._send_request_async(data=b"data")
+                    self.assertEqual(await resp.read(), b"ok")
+                session = predictor._get_async_session()
+                self.assertIs(session, predictor._get_async_session())
+                self.assertEqual(session.connector.limit, 8)
+                self.assertEqual(session.connector.limit_per_host, 4)
+            self.assertTrue(session.closed)
+            await server.close()
+
+        asyncio.run(run())
+
+    def test_session_per_event_loop(self):
+        predictor = Predictor("mock_service", session=make_mock_session())
+
+        async def get_session():
+            return predictor._get_async_session()
+
+        loop = asyncio.new_event_loop()
+        try:
+            s1 = loop.run_until_complete(get_session())
+            self.assertIs(s1, loop.run_until_complete(get_session()))
+            loop.run_until_complete(predictor.aclose())
+            self.assertTrue(s1.closed)
+        finally:
+            loop.close()
+
+        async def get_and_close_session():
+            async with predictor:
+                return predictor._get_async_session()
+
+        s2 = asyncio.run(get_and_close_session())
+        self.assertIsNot(s1, s2)
+
+    def test_close_sessions_of_all_event_loops(self):
+        predictor = Predictor("mock_service", session=make_mock_session())
+
+        async def get_session():
+            return predictor._get_async_session()
+
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            s1 = asyncio.run_coroutine_threadsafe(get_session(), loop).result()
+
+            async def close():
+                s2 = predictor._get_async_session()
+                await predictor.aclose()
+                return s2
+
+            s2 = asyncio.run(close())
+            # the session of the other event loop is closed in its event loop.
+            self.assertTrue(s1.closed)
+            self.assertTrue(s2.closed)
+            self.assertEqual(len(predictor._async_sessions), 0)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    def test_cleanup_after_failed_init(self):
+        session = make_mock_session()
+        session.service_api.get.side_effect = RuntimeError("service not found")
+        with self.assertRaises(RuntimeError):
+            Predictor("mock_service", session=session)
+
+        # the predictor could be cleaned up if its initializer failed.
+        predictor = Predictor.__new__(Predictor)
+        predictor.__del__()
+        asyncio.run(predictor.aclose())
+
+
+class TestPredictorBatching(BasePredictorTestCase):
+    def test_merge_and_split_batch(self):
+        data, sizes = _merge_batch(JsonSerializer(), [[[1, 2]], [[3, 4], [5, 6]]])
+        self.assertEqual(data, [[1, 2], [3, 4], [5, 6]])
+        self.assertEqual(sizes, [1, 2])
+        self.assertEqual(
+            _split_batch(JsonSerializer(), ["a", "b", "c"], sizes), [["a"], ["b", "c"]]
+        )
+
+        data, sizes = _merge_batch(
+            TensorFlowSerializer(),
+            [{"x": np.zeros((1, 3))}, {"x": np.ones((2, 3))}],
+        )
+        self.assertEqual(data["x"].shape, (3, 3))
+        results = _split_batch(TensorFlowSerializer(), {"y": np.arange(3)}, sizes)
+        np.testing.assert_array_equal(results[1]["y"], [1, 2])
+
+        data, sizes = _merge_batch(
+            PyTorchSerializer(), [np.zeros((2, 4)), np.ones((1, 4))]
+        )
+        self.assertEqual(data.shape, (3, 4))
+        results = _split_batch(PyTorchSerializer(), np.arange(3), sizes)
+        np.testing.assert_array_equal(results[0], [0, 1])
+
+        with self.assertRaises(ValueError):
+            _split_batch(PyTorchSerializer(), np.arange(4), sizes)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not available.")
+    def test_merge_and_split_arrow_batch(self):
+        serializer = ArrowSerializer()
+        dfs = [
+            pd.DataFrame({"id": np.arange(rows), "name": ["row"] * rows})
+            for rows in (1, 2, 3)
+        ]
+        merged, sizes = _merge_batch(serializer, dfs)
+        self.assertEqual(sizes, [1, 2, 3])
+        result = serializer.deserialize(serializer.serialize(merged))
+        for expected, actual in zip(dfs, _split_batch(serializer, result, sizes)):
+            pd.testing.assert_frame_equal(actual, expected)
+
+    def test_split_mixed_dict_result(self):
+        result = {
+            "y": [[0], [1], [2]],
+            "scores": np.arange(6).reshape(3, 2),
+            "model_version": "v1",
+            "count": 3,
+            "labels": ["a", "b"],
+        }
+        results = _split_batch(JsonSerializer(), result, [1, 2])
+        self.assertEqual(results[0]["y"], [[0]])
+        self.assertEqual(results[1]["y"], [[1], [2]])
+        np.testing.assert_array_equal(results[1]["scores"], [[2, 3], [4, 5]])
+        for r in results:
+            self.assertEqual(r["model_version"], "v1")
+            self.assertEqual(r["count"], 3)
+            self.assertEqual(r["labels"], ["a", "b"])
+        self.assertIsNot(results[0]["labels"], results[1]["labels"])
+
+        with self.assertRaises(ValueError):
+            _split_batch(JsonSerializer(), {"model_version": "v1"}, [1, 2])
+
+    def test_unsplittable_result_fallback(self):
+        predictor = Predictor(
+            "mock_service",
+            session=make_mock_session(),
+            batch_config=BatchConfig(max_batch_size=8, max_wait_ms=200),
+        )
+        requests = []
+        lock = threading.Lock()
+
+        def send_request(data, *args, **kwargs):
+            rows = json.loads(data)
+            with lock:
+                requests.append(rows)
+            resp = MagicMock()
+            resp.status_code = 200
+            resp.content = json.dumps({"sum": sum(row[0] for row in rows)}).encode()
+            return resp
+
+        with patch.object(predictor, "_send_request", side_effect=send_request):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(
+                    executor.map(lambda i: predictor.predict([[i]]), range(4))
+                )
+
+        self.assertEqual(results, [{"sum": i} for i in range(4)])
+        self.assertTrue(any(len(rows) > 1 for rows in requests))
+
+    def test_coalesce_concurrent_calls(self):
+        predictor = Predictor(
+            "mock_service",
+            session=make_mock_session(),
+            batch_config=BatchConfig(max_batch_size=8, max_wait_ms=200),
+        )
+        requests = []
+        lock = threading.Lock()
+
+        def send_request(data, *args, **kwargs):
+            rows = json.loads(data)
+            with lock:
+                requests.append(rows)
+            resp = MagicMock()
+            resp.status_code = 200
+            resp.content = json.dumps([row[0] * 2 for row in rows]).encode()
+            return resp
+
+        with patch.object(predictor, "_send_request", side_effect=send_request):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(
+                    executor.map(lambda i: predictor.predict([[i]]), range(8))
+                )
+
+        self.assertEqual(results, [[i * 2] for i in range(8)])
+        self.assertLess(len(requests), 8)
+        self.assertEqual(sum(len(rows) for rows in requests), 8)
+
+    def test_close_under_load(self):
+        predictor = Predictor(
+            "mock_service",
+            session=make_mock_session(),
+            batch_config=BatchConfig(max_batch_size=4, max_wait_ms=5),
+        )
+
+        def send_request(data, *args, **kwargs):
+            time.sleep(0.01)
+            resp = MagicMock()
+            resp.status_code = 200
+            resp.content = json.dumps([row[0] for row in json.loads(data)]).encode()
+            return resp
+
+        with patch.object(predictor, "_send_request", side_effect=send_request):
+            futures = [predictor._batcher.submit([[i]]) for i in range(64)]
+            predictor._batcher.close()
+            with self.assertRaises(RuntimeError):
+                predictor._batcher.submit([[0]])
+            # the calls queued before close are flushed.
+            results = [f.result(timeout=10) for f in futures]
+        self.assertEqual(results, [[i] for i in range(64)])
+
+
+class TestPredictorPredictMany(BasePredictorTestCase):
+    def setUp(self):
+        super(TestPredictorPredictMany, self).setUp()
+        self.predictor = Predictor("mock_service", session=make_mock_session())
+
+    def test_predict_many(self):
+        in_flight, max_in_flight = [0], [0]
+        lock = threading.Lock()
+
+        def send_request(data, *args, **kwargs):
+            value = json.loads(data)
+            with lock:
+                in_flight[0] += 1
+                max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+            time.sleep(0.01)
+            with lock:
+                in_flight[0] -= 1
+            resp = MagicMock()
+            resp.status_code = 500 if value == 3 else 200
+            resp.content = json.dumps(value * 2).encode()
+            return resp
+
+        with patch.object(self.predictor, "_send_request", side_effect=send_request):
+            results = list(
+                self.predictor.predict_many((i for i in range(20)), concurrency=4)
+            )
+            unordered = dict(
+                self.predictor.predict_many(range(20), concurrency=4, ordered=False)
+            )
+
+        self.assertLessEqual(max_in_flight[0], 4)
+        self.assertIsInstance(results[3], PredictionException)
+        self.assertEqual(
+            results[:3] + results[4:], [i * 2 for i in range(20) if i != 3]
+        )
+        self.assertEqual(len(unordered), 20)
+        self.assertEqual(unordered[5], 10)
+
+    def test_predict_many_raise_exception(self):
+        resp = MagicMock()
+        resp.status_code = 500
+        resp.content = b"error"
+        with patch.object(self.predictor, "_send_request", return_value=resp):
+            with self.assertRaises(PredictionException):
+                list(self.predictor.predict_many(range(4), return_exceptions=False))
+
+    def test_predict_many_async(self):
+        async def handler(request):
+            value = json.loads(await request.read())
+            if value == 3:
+                return web.Response(status=500, body=b"error")
+            return web.Response(body=json.dumps(value * 2).encode())
+
+        async def run():
+            app = web.Application()
+            app.router.add_route("*", "/{tail:.*}", handler)
+            server = TestServer(app)
+            await server.start_server()
+            # drop the descriptor cached by the predictor created in setUp.
+            service_descriptor_cache.clear()
+            predictor = Predictor(
+                "mock_service",
+                session=make_mock_session(endpoint=str(server.make_url("/"))),
+            )
+            async with predictor:
+                results = [
+                    r
+                    async for r in predictor.predict_many_async(
+                        range(10), concurrency=3
+                    )
+                ]
+            await server.close()
+            return results
+
+        results = asyncio.run(run())
+        self.assertIsInstance(results[3], PredictionException)
+        self.assertEqual(
+            results[:3] + results[4:], [i * 2 for i in range(10) if i != 3]
+        )
+
+
+class TestSerializerContentType(BasePredictorTestCase):
+    def test_negotiate_content_type(self):
+        received = []
+
+        async def handler(request):
+            received.append(request.headers)
+            value = MsgPackSerializer().deserialize(await request.read())
+            if request.path == "/json":
+                return web.json_response({"y": value["x"].tolist()})
+            return web.Response(
+                body=MsgPackSerializer().serialize({"y": value["x"] * 2}),
+                content_type="application/msgpack",
+            )
+
+        async def run():
+            app = web.Application()
+            app.router.add_route("*", "/{tail:.*}", handler)
+            server = TestServer(app)
+            await server.start_server()
+            results = []
+            for path in ("/", "/json"):
+                service_descriptor_cache.clear()
+                predictor = Predictor(
+                    "mock_service",
+                    session=make_mock_session(endpoint=str(server.make_url(path))),
+                    serializer=MsgPackSerializer(),
+                )
+                async with predictor:
+                    results.append(await predictor.predict_async({"x": np.arange(3)}))
+            await server.close()
+            return results
+
+        results = asyncio.run(run())
+        np.testing.assert_array_equal(results[0]["y"], [0, 2, 4])
+        self.assertEqual(results[1], {"y": [0, 1, 2]})
+        self.assertEqual(received[0]["Content-Type"], "application/msgpack")
+        self.assertEqual(received[0]["Accept"], "application/msgpack, application/json")
+
+
+class TestCompression(BasePredictorTestCase):
+    def test_compress_request(self):
+        received = []
+
+        async def handler(request):
+            body = await request.read()
+            encoding = request.headers.get("Content-Encoding")
+            if encoding == "gzip":
+                body = gzip.decompress(body)
+            elif encoding == "zstd":
+                body = zstandard.ZstdDecompressor().decompress(body)
+            received.append((request.headers, body))
+            resp = web.Response(body=body)
+            resp.enable_compression(web.ContentCoding.gzip)
+            return resp
+
+        async def run(compression_config):
+            app = web.Application(handler_args={"auto_decompress": False})
+            app.router.add_route("*", "/{tail:.*}", handler)
+            server = TestServer(app)
+            await server.start_server()
+            service_descriptor_cache.clear()
+            predictor = Predictor(
+                "mock_service",
+                session=make_mock_session(endpoint=str(server.make_url("/"))),
+                serializer=JsonSerializer(),
+                compression_config=compression_config,
+            )
+            async with predictor:
+                results = [
+                    await predictor.predict_async(list(range(1000))),
+                    await predictor.predict_async([1, 2]),
+                ]
+            await server.close()
+            return predictor, results
+
+        for algorithm in ["gzip", "zstd"] if zstandard else ["gzip"]:
+            received.clear()
+            predictor, results = asyncio.run(
+                run(CompressionConfig(algorithm, threshold=100))
+            )
+            self.assertEqual(results, [list(range(1000)), [1, 2]])
+            self.assertEqual(received[0][0]["Content-Encoding"], algorithm)
+            self.assertNotIn("Content-Encoding", received[1][0])
+            stats = predictor.compression_stats
+            self.assertEqual(stats["compressed_requests"], 1)
+            self.assertEqual(stats["request_bytes"], len(received[0][1]))
+            self.assertLess(
+                stats["request_compressed_bytes"], stats["request_bytes"] / 2
+            )
+            self.assertEqual(stats["compressed_responses"], 2)
+            self.assertLess(stats["response_compressed_bytes"], stats["response_bytes"])
+
+    def test_skip_incompressible_data(self):
+        predictor = Predictor(
+            "mock_service",
+            session=make_mock_session(),
+            compression_config=CompressionConfig(threshold=16),
+        )
+        data = os.urandom(1024)
+        self.assertEqual(
+            predictor._compress_request(data, None, None, async_client=False)[0],
+            data,
+        )
+        self.assertEqual(predictor.compression_stats["compressed_requests"], 0)
+
+
+class TestInstrumentation(BasePredictorTestCase):
+    def test_latency_histogram(self):
+        histogram = LatencyHistogram()
+        self.assertIsNone(histogram.percentile(50))
+        for i in range(1, 10001):
+            histogram.record(i / 1000)
+        for p in (50, 90, 99, 99.9):
+            self.assertAlmostEqual(histogram.percentile(p), p / 10, delta=p / 1000)
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 10000)
+        self.assertEqual(summary["max"], 10)
+        self.assertAlmostEqual(summary["mean"], 5.0005)
+        self.assertEqual(
+            set(summary),
+            {"count", "mean", "min", "max"} | {"p50", "p90", "p99", "p99.9"},
+        )
+
+    def test_stage_latencies(self):
+        async def handler(request):
+            await request.read()
+            return web.Response(body=b"[1]")
+
+        async def run():
+            app = web.Application()
+            app.router.add_route("*", "/{tail:.*}", handler)
+            server = TestServer(app)
+            await server.start_server()
+            predictor = Predictor(
+                "mock_service",
+                session=make_mock_session(endpoint=str(server.make_url("/"))),
+                serializer=JsonSerializer(),
+            )
+            timings = []
+            predictor.enable_instrumentation(callback=timings.append)
+            async with predictor:
+                for _ in range(3):
+                    await predictor.predict_async([1])
+            await server.close()
+            return predictor, timings
+
+        predictor, timings = asyncio.run(run())
+        stats = predictor.stats()
+        self.assertEqual(
+            set(stats),
+            {"serialize", "connect", "ttfb", "download", "deserialize", "total"},
+        )
+        self.assertEqual(stats["total"]["count"], 3)
+        # the connection is reused by the subsequent requests.
+        self.assertEqual(len([t for t in timings if "connect" in t]), 1)
+        for t in timings:
+            self.assertLessEqual(
+                sum(v for k, v in t.items() if k != "total"), t["total"]
+            )
+
+        predictor.disable_instrumentation()
+        self.assertEqual(predictor.stats(), {})
+
+    def test_disabled_by_default(self):
+        predictor = Predictor("mock_service", session=make_mock_session())
+        resp = MagicMock(status_code=200, content=b"[1]", headers={})
+        with patch.object(predictor, "_send_request", return_value=resp) as send:
+            predictor.predict([1])
+            self.assertNotIn("hooks", send.call_args.kwargs)
+            self.assertEqual(predictor.stats(), {})
+
+            predictor.enable_instrumentation()
+            predictor.predict([1])
+            self.assertIn("hooks", send.call_args.kwargs)
+        self.assertEqual(
+            set(predictor.stats()),
+            {"serialize", "ttfb", "download", "deserialize", "total"},
+        )
+
+
+class TestLocalPredictor(BaseUnitTestCase):
+    def setUp(self):
+        super(TestLocalPredictor, self).setUp()
+        self.peers = set()
+
+        async def handler(request):
+            self.peers.add(request.transport.get_extra_info("peername"))
+            value = json.loads(await request.read())
+            return web.Response(body=json.dumps(value * 2).encode())
+
+        async def start():
+            app = web.Application()
+            app.router.add_route("*", "/{tail:.*}", handler)
+            self.runner = web.AppRunner(app)
+            await self.runner.setup()
+            site = web.TCPSite(self.runner, "127.0.0.1", 0)
+            await site.start()
+            return self.runner.addresses[0][1]
+
+        # serve the local service in a background event loop.
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.port = asyncio.run_coroutine_threadsafe(start(), self.loop).result()
+
+    def tearDown(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        super(TestLocalPredictor, self).tearDown()
+
+    def test_predict(self):
+        predictor = LocalPredictor(port=self.port)
+        self.assertEqual([predictor.predict(i) for i in range(5)], [0, 2, 4, 6, 8])
+        self.assertEqual(predictor.raw_predict([1]).json(), [1, 1])
+        # connection is reused by the successive calls.
+        self.assertEqual(len(self.peers), 1)
+        self.assertEqual(
+            list(predictor.predict_many(range(20), concurrency=4)),
+            [i * 2 for i in range(20)],
+        )
+        self.assertLessEqual(len(self.peers), 5)
+
+    def test_predict_async(self):
+        predictor = LocalPredictor(port=self.port)
+
+        async def run():
+            async with predictor:
+                results = [await predictor.predict_async(i) for i in range(3)]
+                raw = await predictor.raw_predict_async("[2]")
+                results.extend(
+                    [r async for r in predictor.predict_many_async(range(3, 10))]
+                )
+            return results, raw
+
+        results, raw = asyncio.run(run())
+        self.assertEqual(results, [i * 2 for i in range(10)])
+        self.assertEqual(raw.json(), [2, 2])
+
+
+class TestStreamingRawResponse(BasePredictorTestCase):
+    def test_iter_events(self):
+        resp = MagicMock()
+        resp.status_code = 200
+        resp.headers = {"Content-Type": "text/event-stream"}
+        resp.iter_content.return_value = iter(
+            [b"data: hel", b'lo\r\n\r\n: comment\nevent: end\ndata: {"a"', b": 1}\n\n"]
+        )
+        streaming_resp = StreamingRawResponse(resp, start_time=time.perf_counter())
+        events = list(streaming_resp.iter_events())
+
+        self.assertEqual([e.data for e in events], ["hello", '{"a": 1}'])
+        self.assertEqual(events[1].event, "end")
+        self.assertEqual(events[1].json(), {"a": 1})
+        self.assertIsNotNone(streaming_resp.time_to_first_byte)
+
+    def test_raw_predict_async_stream(self):
+        async def handler(request):
+            resp = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+            await resp.prepare(request)
+            for i in range(3):
+                await resp.write(f"id: {i}\ndata: token-{i}\n\n".encode())
+            await resp.write_eof()
+            return resp
+
+        async def run():
+            app = web.Application()
+            app.router.add_route("*", "/{tail:.*}", handler)
+            server = TestServer(app)
+            await server.start_server()
+            predictor = Predictor(
+                "mock_service",
+                session=make_mock_session(endpoint=str(server.make_url("/"))),
+            )
+            async with predictor:
+                resp = await predictor.raw_predict_async(b"prompt", stream=True)
+                async with resp:
+                    events = [e async for e in resp.iter_events()]
+            await server.close()
+            return resp, events
+
+        resp, events = asyncio.run(run())
+        self.assertEqual([e.data for e in events], ["token-0", "token-1", "token-2"])
+        self.assertEqual(events[2].id, "2")
+        self.assertIsNotNone(resp.time_to_first_byte)
+
+
+class TestServiceDescriptorCache(BasePredictorTestCase):
+    def test_shared_descriptor(self):
+        session = make_mock_session()
+        p1 = Predictor("mock_service", session=session)
+        p2 = Predictor("mock_service", session=session)
+        self.assertEqual(session.service_api.get.call_count, 1)
+        self.assertEqual(p1.service_descriptor, p2.service_descriptor)
+        # the predictors do not share the cached descriptor object.
+        p1.service_descriptor["Status"] = "Stopped"
+        self.assertEqual(p2.service_status, "Running")
+        p3 = Predictor("mock_service", session=session)
+        self.assertEqual(p3.service_status, "Running")
+
+        p1.refresh()
+        self.assertEqual(session.service_api.get.call_count, 2)
+
+        session.service_api.get.return_value = dict(
+            session.service_api.get.return_value, CurrentVersion=0
+        )
+        p1.switch_version(1)
+        self.assertEqual(session.service_api.get.call_count, 4)
+        self.assertEqual(p1.service_descriptor["CurrentVersion"], 0)
+        Predictor("mock_service", session=session)
+        self.assertEqual(session.service_api.get.call_count, 4)
+
+    def test_wait_for_ready_bypass_cache(self):
+        session = make_mock_session()
+        predictor = Predictor("mock_service", session=session)
+        stopped = dict(session.service_api.get.return_value, Status="Stopped")
+        session.service_api.get.return_value = stopped
+        # the service was stopped after the descriptor is cached.
+        with patch.object(
+            Predictor, "_wait_for_status"
+        ) as wait_for_status, patch.object(Predictor, "_wait_for_gateway_ready"):
+            predictor.wait_for_ready()
+        wait_for_status.assert_called_once()
+
+    def test_from_service_descriptor(self):
+        descriptor = json.loads(
+            json.dumps(make_mock_session().service_api.get.return_value)
+        )
+        session = make_mock_session()
+        p = Predictor.from_service_descriptor(descriptor, session=session)
+        self.assertEqual(p.service_name, "mock_service")
+        self.assertEqual(p.access_token, "mock_token")
+        session.service_api.get.assert_not_called()
+
+    def test_expired_descriptor(self):
+        cache = ServiceDescriptorCache(ttl=0.01)
+        cache.put("cn-hangzhou", "mock_service", {"ServiceName": "mock_service"})
+        self.assertIsNotNone(cache.get("cn-hangzhou", "mock_service"))
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("cn-hangzhou", "mock_service"))
+
+
+class TestSignatureDefCache(BaseUnitTestCase):
+    signature_def = {
+        "signature_name": "serving_default",
+        "inputs": [{"name": "x", "shape": [-1, 2], "type": "DT_FLOAT"}],
+        "outputs": [{"name": "y", "shape": [-1, 1], "type": "DT_FLOAT"}],
+    }
+
+    def setUp(self):
+        super(TestSignatureDefCache, self).setUp()
+        service_descriptor_cache.clear()
+        _signature_def_cache.clear()
+
+    def make_session(self, version=1):
+        session = MagicMock()
+        session.region_id = "cn-hangzhou"
+        session.service_api.get.return_value = {
+            "ServiceName": "tf_service",
+            "Status": "Running",
+            "CurrentVersion": version,
+            "ServiceConfig": json.dumps({"processor": "tensorflow_cpu_2.7"}),
+            "InternetEndpoint": "http://127.0.0.1",
+            "AccessToken": "token",
+        }
+        return session
+
+    def test_cache_signature_def(self):
+        session = self.make_session()
+        with patch(
+            "urllib.request.urlopen",
+            side_effect=lambda *args: io.StringIO(json.dumps(self.signature_def)),
+        ) as mock_urlopen, tempfile.TemporaryDirectory() as cache_dir, patch.object(
+            TensorFlowSerializer, "signature_def_cache_dir", cache_dir
+        ):
+            for _ in range(3):
+                sig_def = TensorFlowSerializer.inspect_model_signature_def(
+                    "tf_service", session=session
+                )
+                self.assertEqual(sig_def, self.signature_def)
+            self.assertEqual(mock_urlopen.call_count, 1)
+            self.assertEqual(session.service_api.get.call_count, 1)
+
+            # signature def persisted on disk is reused by other processes.
+            _signature_def_cache.clear()
+            service_descriptor_cache.clear()
+            TensorFlowSerializer.inspect_model_signature_def(
+                "tf_service", session=session
+            )
+            self.assertEqual(mock_urlopen.call_count, 1)
+
+            # fetch the signature def again if service version changed.
+            service_descriptor_cache.clear()
+            TensorFlowSerializer.inspect_model_signature_def(
+                "tf_service", session=self.make_session(version=2)
+            )
+            self.assertEqual(mock_urlopen.call_count, 2)
+
+
+class TestPredictorRetry(BasePredictorTestCase):
+    @staticmethod
+    def make_response(status_code, content=b""):
+        resp = MagicMock()
+        resp.status_code = status_code
+        resp.content = content
+        return resp
+
+    def test_retry(self):
+        predictor = Predictor(
+            "mock_service",
+            session=make_mock_session(),
+            retry_config=RetryConfig(max_attempts=3, backoff_base=0.001),
+        )
+        with patch.object(
+            predictor._request_session,
+            "request",
+            side_effect=[
+                requests.exceptions.ConnectionError(),
+                self.make_response(503),
+                self.make_response(200, b"[1]"),
+            ],
+        ) as mock_request:
+            self.assertEqual(predictor.predict([1]), [1])
+        self.assertEqual(mock_request.call_count, 3)
+        self.assertEqual(predictor.retry_stats["retries"], 2)
+
+        with patch.object(
+            predictor._request_session,
+            "request",
+            return_value=self.make_response(503),
+        ):
+            with self.assertRaises(PredictionException):
+                predictor.predict([1])
+
+    def test_hedging(self):
+        predictor = Predictor(
+            "mock_service",
+            session=make_mock_session(),
+            retry_config=RetryConfig(
+                hedging=True, hedging_percentile=50, hedging_min_samples=5
+            ),
+        )
+        for _ in range(10):
+            predictor._latencies.record(0.01)
+        calls = []
+
+        def request(**kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                time.sleep(1)
+                return self.make_response(200, b'"slow"')
+            return self.make_response(200, b'"fast"')
+
+        self.assertIsNone(predictor._hedging_executor)
+        with patch.object(predictor._request_session, "request", side_effect=request):
+            self.assertEqual(predictor.predict([1]), "fast")
+        self.assertEqual(predictor.retry_stats["hedges"], 1)
+        self.assertEqual(predictor.retry_stats["hedge_wins"], 1)
+        executor = predictor._hedging_executor
+        self.assertEqual(
+            executor._max_workers, 2 * predictor.connection_config.pool_size
+        )
+        predictor.close()
+        self.assertTrue(executor._shutdown)
+        self.assertIsNone(predictor._hedging_executor)
+
+    def test_hedging_executor_not_created(self):
+        predictor = Predictor(
+            "mock_service",
+            session=make_mock_session(),
+            retry_config=RetryConfig(hedging_min_samples=5),
+        )
+        for _ in range(10):
+            predictor._latencies.record(0.01)
+        with patch.object(
+            predictor._request_session,
+            "request",
+            return_value=self.make_response(200, b"[1]"),
+        ):
+            self.assertEqual(predictor.predict([1]), [1])
+        self.assertIsNone(predictor._hedging_executor)
+        predictor.close()
+
+    def test_release_hedged_responses(self):
+        futures = [Future() for _ in range(3)]
+        responses = [self.make_response(200) for _ in futures]
+        for future, resp in zip(futures[:2], responses):
+            future.set_result(resp)
+        Predictor._release_hedged_responses(futures, winner=futures[1])
+        responses[0].close.assert_called_once()
+        responses[1].close.assert_not_called()
+        # the response of the running request is closed once it completes.
+        futures[2].set_result(responses[2])
+        responses[2].close.assert_called_once()
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            tasks = [loop.create_future() for _ in range(3)]
+            responses = [MagicMock() for _ in tasks]
+            for task, resp in zip(tasks[:2], responses):
+                task.set_result(resp)
+            Predictor._release_hedged_responses_async(tasks, winner=tasks[0])
+            await asyncio.sleep(0)
+            responses[0].release.assert_not_called()
+            responses[1].release.assert_called_once()
+            self.assertTrue(tasks[2].cancelled())
+
+        asyncio.run(run())
+
+    def test_streaming_request_not_hedged(self):
+        predictor = Predictor(
+            "mock_service",
+            session=make_mock_session(),
+            retry_config=RetryConfig(hedging=True),
+        )
+        resp = MagicMock()
+        resp.status = 200
+
+        async def send_request_once(*args, **kwargs):
+            return resp
+
+        async def run():
+            with patch.object(
+                predictor, "_send_request_once_async", side_effect=send_request_once
+            ), patch.object(
+                predictor, "_send_hedged_request_async", side_effect=send_request_once
+            ) as hedged:
+                await predictor._send_request_async(data=b"data", stream=True)
+                hedged.assert_not_called()
+                await predictor._send_request_async(data=b"data")
+                hedged.assert_called_once()
+
+        asyncio.run(run())
+
+    def test_async_enqueue_not_retried(self):
+        predictor = AsyncPredictor(
+            "mock_service",
+            session=make_mock_session(service_config={"metadata": {"type": "Async"}}),
+            retry_config=RetryConfig(backoff_base=0.001, hedging=True),
+        )
+        resp = MagicMock()
+        resp.status = 503
+        resp.read = AsyncMock(return_value=b"")
+
+        async def send_request_once(*args, **kwargs):
+            return resp
+
+        async def run(**kwargs):
+            with patch.object(
+                predictor, "_send_request_once_async", side_effect=send_request_once
+            ) as send, patch.object(
+                predictor, "_send_hedged_request_async", side_effect=send_request_once
+            ) as hedged:
+                await predictor._send_request_async(data=b"data", **kwargs)
+                return send.call_count + hedged.call_count
+
+        # each enqueued request creates a task in the queue.
+        self.assertEqual(asyncio.run(run(idempotent=False)), 1)
+        self.assertEqual(asyncio.run(run()), 3)
+        predictor.retry_config = RetryConfig(backoff_base=0.001, retry_methods=["POST"])
+        self.assertEqual(asyncio.run(run(idempotent=False)), 3)
+
+        predictor.retry_config = RetryConfig(backoff_base=0.001)
+        with patch.object(
+            predictor, "_send_request_once_async", side_effect=send_request_once
+        ) as send:
+            with self.assertRaises(RuntimeError):
+                predictor.predict([1]).result(timeout=10)
+            with self.assertRaises(RuntimeError):
+                predictor.raw_predict(b"data").result(timeout=10)
+        self.assertEqual(send.call_count, 2)
+        predictor.close()
+
+
+class TestDirectEndpoint(BasePredictorTestCase):
+    instances = [
+        {"InnerIP": "10.0.0.1", "InstancePort": 8000, "Status": "Running"},
+        {"InnerIP": "10.0.0.2", "InstancePort": 8000, "Status": "Running"},
+        {"InnerIP": "10.0.0.3", "InstancePort": 8000, "Status": "Pending"},
+    ]
+
+    def test_least_outstanding_requests(self):
+        balancer = _InstanceBalancer(
+            lambda: self.instances,
+            LoadBalancerConfig(policy=LoadBalancerConfig.LEAST_OUTSTANDING_REQUESTS),
+        )
+        addresses = [balancer.acquire() for _ in range(4)]
+        self.assertEqual(
+            sorted(addresses), ["10.0.0.1:8000"] * 2 + ["10.0.0.2:8000"] * 2
+        )
+        for _ in range(2):
+            balancer.release("10.0.0.1:8000", success=True)
+        self.assertEqual(balancer.acquire(), "10.0.0.1:8000")
+
+    def test_eject_failing_instance(self):
+        balancer = _InstanceBalancer(
+            lambda: self.instances, LoadBalancerConfig(max_failures=2)
+        )
+        balancer.refresh()
+        self.assertEqual(sorted(balancer.addresses), ["10.0.0.1:8000", "10.0.0.2:8000"])
+        for _ in range(2):
+            balancer.release("10.0.0.1:8000", success=False)
+        for _ in range(10):
+            address = balancer.acquire()
+            self.assertEqual(address, "10.0.0.2:8000")
+            balancer.release(address, success=True)
+
+        # fallback to all the instances if all of them are ejected.
+        for _ in range(2):
+            balancer.release("10.0.0.2:8000", success=False)
+        self.assertIn(balancer.acquire(), ["10.0.0.1:8000", "10.0.0.2:8000"])
+
+    def test_refresh_instances(self):
+        list_instances = MagicMock(return_value=self.instances[:1])
+        balancer = _InstanceBalancer(
+            list_instances, LoadBalancerConfig(refresh_interval=0)
+        )
+        self.assertEqual(balancer.acquire(), "10.0.0.1:8000")
+        list_instances.return_value = self.instances[1:]
+        self.assertEqual(balancer.acquire(), "10.0.0.2:8000")
+
+        # keep using the stale instance table if the refresh fails.
+        list_instances.side_effect = RuntimeError("refresh failed")
+        self.assertEqual(balancer.acquire(), "10.0.0.2:8000")
+
+    def test_predict(self):
+        session = make_mock_session(endpoint="http://mock.vpc/api/predict/mock_service")
+        session.service_api.list_instances.return_value = PaginatedResult(
+            items=self.instances, total_count=len(self.instances)
+        )
+        predictor = Predictor(
+            "mock_service",
+            session=session,
+            endpoint_type=EndpointType.DIRECT,
+            serializer=JsonSerializer(),
+        )
+        resp = MagicMock(status_code=200, content=b"[1]")
+        with patch.object(
+            predictor._request_session, "request", return_value=resp
+        ) as mock_request:
+            self.assertEqual(predictor.predict([1]), [1])
+        self.assertIn(
+            mock_request.call_args.kwargs["url"],
+            [
+                "http://10.0.0.1:8000/api/predict/mock_service",
+                "http://10.0.0.2:8000/api/predict/mock_service",
+            ],
+        )
+        session.service_api.list_instances.assert_called_once()
+
+
+class TestConcurrencyLimiter(BasePredictorTestCase):
+    def test_aimd_limit(self):
+        limit = AIMDLimit(initial_limit=10, backoff_ratio=0.5, timeout=1)
+        limit.update(0.1, inflight=10, dropped=False)
+        self.assertEqual(limit.limit, 11)
+        # limit is not increased if it is not utilized.
+        limit.update(0.1, inflight=2, dropped=False)
+        self.assertEqual(limit.limit, 11)
+        limit.update(0.1, inflight=10, dropped=True)
+        self.assertEqual(limit.limit, 5)
+        limit.update(2, inflight=5, dropped=False)
+        self.assertEqual(limit.limit, 2)
+
+    def test_gradient_limit(self):
+        limit = GradientLimit(initial_limit=20)
+        for _ in range(50):
+            limit.update(0.1, inflight=limit.limit, dropped=False)
+        self.assertGreater(limit.limit, 20)
+
+        stable_limit = limit.limit
+        for _ in range(20):
+            limit.update(1.0, inflight=limit.limit, dropped=False)
+        self.assertLess(limit.limit, stable_limit)
+
+    def test_shed_excess_requests(self):
+        limiter = ConcurrencyLimiter(AIMDLimit(initial_limit=2), max_queue_size=0)
+        limiter.acquire()
+        limiter.acquire()
+        with self.assertRaises(ConcurrencyLimitExceededException):
+            limiter.acquire()
+        limiter.release(0.1)
+        limiter.acquire()
+        self.assertEqual(limiter.inflight, 2)
+
+        limiter = ConcurrencyLimiter(AIMDLimit(initial_limit=1), queue_timeout=0.01)
+        limiter.acquire()
+        with self.assertRaises(ConcurrencyLimitExceededException):
+            limiter.acquire()
+        self.assertEqual(limiter.queue_size, 0)
+
+    def test_queue_excess_requests(self):
+        limiter = ConcurrencyLimiter(AIMDLimit(initial_limit=2, max_limit=2))
+        peak = 0
+        lock = threading.Lock()
+
+        def request():
+            nonlocal peak
+            limiter.acquire()
+            with lock:
+                peak = max(peak, limiter.inflight)
+            time.sleep(0.01)
+            limiter.release(0.01)
+
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(lambda _: request(), range(16)))
+        self.assertEqual(peak, 2)
+        self.assertEqual(limiter.inflight, 0)
+
+    def test_acquire_async(self):
+        limiter = ConcurrencyLimiter(AIMDLimit(initial_limit=2, max_limit=2))
+        peak = 0
+
+        async def request():
+            nonlocal peak
+            await limiter.acquire_async()
+            peak = max(peak, limiter.inflight)
+            await asyncio.sleep(0.01)
+            limiter.release(0.01)
+
+        async def run():
+            await asyncio.gather(*[request() for _ in range(10)])
+
+        asyncio.run(run())
+        self.assertEqual(peak, 2)
+        self.assertEqual(limiter.inflight, 0)
+
+    def test_shared_limiter(self):
+        session = make_mock_session()
+        limiter = ConcurrencyLimiter.for_service("mock_service", session=session)
+        self.assertIs(
+            ConcurrencyLimiter.for_service("mock_service", session=session), limiter
+        )
+        self.assertIsNot(
+            ConcurrencyLimiter.for_service("another_service", session=session),
+            limiter,
+        )
+
+    def test_predict_with_limiter(self):
+        limiter = ConcurrencyLimiter(AIMDLimit(initial_limit=10, backoff_ratio=0.5))
+        predictor = Predictor(
+            "mock_service",
+            session=make_mock_session(),
+            serializer=JsonSerializer(),
+            concurrency_limiter=limiter,
+        )
+        resp = MagicMock(status_code=429, content=b"")
+        with patch.object(predictor._request_session, "request", return_value=resp):
+            with self.assertRaises(PredictionException):
+                predictor.predict([1])
+        self.assertEqual(limiter.limit, 5)
+        self.assertEqual(limiter.inflight, 0)
+
+
+class TestAsyncPredictorEngine(BasePredictorTestCase):
+    class FakeResponse(object):
+        def __init__(self, status, headers=None, body=b""):
+            self.status = status
+            self.headers = headers or {}
+            self.body = body
+
+        async def read(self):
+            return self.body
+
+        async def json(self):
+            return json.loads(self.body)
+
+        def release(self):
+            pass
+
+    def test_predict(self):
+        predictor = AsyncPredictor(
+            "mock_service",
+            max_workers=4,
+            session=make_mock_session(service_config={"metadata": {"type": "Async"}}),
+            serializer=JsonSerializer(),
+        )
+        inputs = {}
+        inflight, peak = 0, 0
+
+        async def send_request(**kwargs):
+            nonlocal inflight, peak
+            inflight += 1
+            peak = max(peak, inflight)
+            await asyncio.sleep(0.01)
+            inflight -= 1
+            if kwargs["method"] == "POST":
+                request_id = str(len(inputs))
+                inputs[request_id] = kwargs["data"]
+                return self.FakeResponse(
+                    200, headers={"X-Eas-Queueservice-Request-Id": request_id}
+                )
+            request_id = kwargs["url"].split("requestId=")[1].split("&")[0]
+            body = json.dumps(
+                [{"tags": {}, "data": base64.b64encode(inputs[request_id]).decode()}]
+            )
+            return self.FakeResponse(200, body=body.encode())
+
+        thread_count = threading.active_count()
+        with patch(
+            "pai.predictor._ServicePredictorMixin._send_request_once_async",
+            side_effect=send_request,
+        ):
+            tasks = [predictor.predict([i]) for i in range(100)]
+            self.assertEqual(
+                [task.result(timeout=10) for task in tasks], [[i] for i in range(100)]
+            )
+            self.assertLessEqual(threading.active_count(), thread_count + 1)
+
+            results = []
+            predictor.predict([-1], callback=results.append).result(timeout=10)
+            predictor.close()
+        self.assertEqual(results, [[-1]])
+        self.assertEqual(peak, 4)
+
+    def test_callback_thread(self):
+        predictor = AsyncPredictor(
+            "mock_service",
+            max_workers=2,
+            session=make_mock_session(service_config={"metadata": {"type": "Async"}}),
+            serializer=JsonSerializer(),
+        )
+        inputs = {}
+
+        async def send_request(**kwargs):
+            if kwargs["method"] == "POST":
+                request_id = str(len(inputs))
+                inputs[request_id] = kwargs["data"]
+                return self.FakeResponse(
+                    200, headers={"X-Eas-Queueservice-Request-Id": request_id}
+                )
+            request_id = kwargs["url"].split("requestId=")[1].split("&")[0]
+            body = json.dumps(
+                [{"tags": {}, "data": base64.b64encode(inputs[request_id]).decode()}]
+            )
+            return self.FakeResponse(200, body=body.encode())
+
+        results = []
+
+        def append(result):
+            results.append((threading.current_thread().name, result))
+
+        def callback(result):
+            append(result)
+            if result == [0]:
+                # blocking on another call of the predictor in a callback.
+                predictor.predict([1], callback=append).result(timeout=10)
+
+        with patch(
+            "pai.predictor._ServicePredictorMixin._send_request_once_async",
+            side_effect=send_request,
+        ):
+            predictor.predict([0], callback=callback).result(timeout=10)
+            predictor.raw_predict(b"[2]", callback=callback).result(timeout=10)
+            predictor.close()
+        self.assertEqual(
+            sorted(r if isinstance(r, list) else r.json() for _, r in results),
+            [[0], [1], [2]],
+        )
+        for name, _ in results:
+            self.assertTrue(name.startswith("AsyncPredictionCallback"))
+
+    def test_bound_body_reads(self):
+        predictor = AsyncPredictor(
+            "mock_service",
+            max_workers=2,
+            session=make_mock_session(service_config={"metadata": {"type": "Async"}}),
+            serializer=JsonSerializer(),
+        )
+        inflight, peak = 0, 0
+
+        class SlowBodyResponse(self.FakeResponse):
+            content = None
+
+            async def read(self):
+                nonlocal inflight
+                if self.content is None:
+                    await asyncio.sleep(0.01)
+                    self.content = self.body
+                    inflight -= 1
+                return self.content
+
+        async def send_request(**kwargs):
+            nonlocal inflight, peak
+            inflight += 1
+            peak = max(peak, inflight)
+            return SlowBodyResponse(200, body=b"ok")
+
+        async def run():
+            return await asyncio.gather(
+                *[predictor._send_request_async(data=b"data") for _ in range(10)]
+            )
+
+        with patch(
+            "pai.predictor._ServicePredictorMixin._send_request_once_async",
+            side_effect=send_request,
+        ):
+            responses = predictor._engine.submit(run()).result(timeout=10)
+            predictor.close()
+        self.assertEqual(len(responses), 10)
+        self.assertEqual(peak, 2)
+
+    def test_result_arrives_before_tracked(self):
+        class FakePredictor(object):
+            def __init__(self):
+                self.sink = [
+                    {"index": "0", "tags": {"requestId": "r0"}, "data": "result-0"},
+                    {"index": "1", "tags": {"requestId": "r1"}, "data": "result-1"},
+                    {"index": "2", "tags": {"requestId": "other"}, "data": "x"},
+                ]
+                self.deleted = []
+
+            async def _get_results_async(self, index, length):
+                return [item for item in self.sink if int(item["index"]) >= index]
+
+            async def _delete_results_async(self, indexes):
+                self.deleted.extend(indexes)
+
+            def _parse_encapsulated_response(self, item):
+                return item["data"]
+
+        async def run():
+            predictor = FakePredictor()
+            tracker = _SinkResultTracker(predictor, batch_size=10, max_untracked=2)
+            r1 = await asyncio.wait_for(tracker.track("r1"), timeout=5)
+            # the cursor has moved past the result of r0, which is tracked later.
+            r0 = await asyncio.wait_for(tracker.track("r0"), timeout=5)
+            await asyncio.sleep(0)
+            return r0, r1, predictor.deleted
+
+        r0, r1, deleted = asyncio.run(run())
+        self.assertEqual((r0, r1), ("result-0", "result-1"))
+        self.assertEqual(sorted(deleted), ["0", "1"])
+
+    def test_submit_many(self):
+        predictor = AsyncPredictor(
+            "mock_service",
+            session=make_mock_session(service_config={"metadata": {"type": "Async"}}),
+            serializer=JsonSerializer(),
+        )
+        sink = {}
+
+        async def send_request(**kwargs):
+            await asyncio.sleep(0.001)
+            if kwargs["method"] == "POST":
+                request_id = "r{}".format(len(sink))
+                sink[request_id] = kwargs["data"]
+                return self.FakeResponse(
+                    200, headers={"X-Eas-Queueservice-Request-Id": request_id}
+                )
+            request_id = parse_qs(urlsplit(kwargs["url"]).query)["requestId"][0]
+            body = json.dumps(
+                [{"tags": {}, "data": base64.b64encode(sink[request_id]).decode()}]
+            )
+            return self.FakeResponse(200, body=body.encode())
+
+        with patch(
+            "pai.predictor._ServicePredictorMixin._send_request_once_async",
+            side_effect=send_request,
+        ), tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertEqual(
+                list(predictor.submit_many(range(20), concurrency=4)), list(range(20))
+            )
+            results = dict(predictor.submit_many(range(20), ordered=False))
+            self.assertEqual(results, {i: i for i in range(20)})
+
+            sink.clear()
+            checkpoint = os.path.join(tmp_dir, "checkpoint.jsonl")
+            collected = []
+            for result in predictor.submit_many(
+                range(100), max_outstanding=40, checkpoint=checkpoint
+            ):
+                collected.append(result)
+                if len(collected) == 30:
+                    break
+            submitted = len(sink)
+            self.assertGreater(submitted, 30)
+
+            # resume from the checkpoint, submitted inputs are not sent again.
+            collected.extend(
+                predictor.submit_many(
+                    range(100), max_outstanding=40, checkpoint=checkpoint
+                )
+            )
+            predictor.close()
+        self.assertEqual(collected, list(range(100)))
+        self.assertEqual(len(sink), 100)
+
+    def test_batch_result_retrieval(self):
+        predictor = AsyncPredictor(
+            "mock_service",
+            session=make_mock_session(service_config={"metadata": {"type": "Async"}}),
+            serializer=JsonSerializer(),
+            result_batch_size=16,
+        )
+        # sink queue contains a result of the request sent by another client.
+        sink = [{"index": 0, "tags": {"requestId": "foreign"}, "data": ""}]
+        gets, deleted = [], []
+
+        async def send_request(**kwargs):
+            await asyncio.sleep(0.001)
+            query = {
+                k: v[0] for k, v in parse_qs(urlsplit(kwargs["url"]).query).items()
+            }
+            if kwargs["method"] == "POST":
+                request_id = "r{}".format(len(sink))
+                sink.append(
+                    {
+                        "index": len(sink),
+                        "tags": {"requestId": request_id},
+                        "data": base64.b64encode(kwargs["data"]).decode(),
+                    }
+                )
+                return self.FakeResponse(
+                    200, headers={"X-Eas-Queueservice-Request-Id": request_id}
+                )
+            elif kwargs["method"] == "DELETE":
+                deleted.extend(int(idx) for idx in query["_indexes_"].split(","))
+                return self.FakeResponse(200)
+            gets.append(query)
+            start, length = int(query["_index_"]), int(query["_length_"])
+            items = [item for item in sink if item["index"] >= start][:length]
+            return self.FakeResponse(200, body=json.dumps(items).encode())
+
+        with patch(
+            "pai.predictor._ServicePredictorMixin._send_request_once_async",
+            side_effect=send_request,
+        ):
+            tasks = [predictor.predict([i]) for i in range(100)]
+            self.assertEqual(
+                [task.result(timeout=10) for task in tasks], [[i] for i in range(100)]
+            )
+            predictor.close()
+        self.assertNotIn(0, deleted)
+        self.assertEqual(sorted(deleted), list(range(1, 101)))
+        self.assertLess(len(gets), 50)
+        self.assertNotIn("requestId", gets[0])
+
+    def test_payload_offload(self):
+        objects = {}
+        bucket = MagicMock(bucket_name="payload-bucket")
+        bucket.put_object.side_effect = lambda key, data: objects.__setitem__(key, data)
+        bucket.get_object.side_effect = lambda key: io.BytesIO(objects[key])
+        bucket.delete_object.side_effect = lambda key: objects.pop(key)
+        predictor = AsyncPredictor(
+            "mock_service",
+            session=make_mock_session(service_config={"metadata": {"type": "Async"}}),
+            serializer=JsonSerializer(),
+            offload_config=PayloadOffloadConfig(
+                "oss://payload-bucket/payloads/", threshold=100, bucket=bucket
+            ),
+        )
+        sink, sent = {}, []
+        config = predictor.offload_config
+
+        async def send_request(**kwargs):
+            if kwargs["method"] == "POST":
+                # echo service that offloads the large results.
+                data = kwargs["data"]
+                sent.append(data)
+                uri = config.parse_reference(data)
+                if uri:
+                    payload = objects[uri[len("oss://payload-bucket/") :]]
+                    objects["results/" + uri.rsplit("/", 1)[1]] = payload
+                    data = config.make_reference(
+                        "oss://payload-bucket/results/" + uri.rsplit("/", 1)[1]
+                    )
+                request_id = "r{}".format(len(sink))
+                sink[request_id] = data
+                return self.FakeResponse(
+                    200, headers={"X-Eas-Queueservice-Request-Id": request_id}
+                )
+            request_id = parse_qs(urlsplit(kwargs["url"]).query)["requestId"][0]
+            body = json.dumps(
+                [{"tags": {}, "data": base64.b64encode(sink[request_id]).decode()}]
+            )
+            return self.FakeResponse(200, body=body.encode())
+
+        with patch(
+            "pai.predictor._ServicePredictorMixin._send_request_once_async",
+            side_effect=send_request,
+        ):
+            self.assertEqual(predictor.predict([1]).result(timeout=10), [1])
+            self.assertEqual(sent[-1], b"[1]")
+
+            data = list(range(100))
+            self.assertEqual(predictor.predict(data).result(timeout=10), data)
+            self.assertLess(len(sent[-1]), 100)
+            # request payload is deleted once the result is retrieved.
+            self.assertFalse([key for key in objects if key.startswith("payloads/")])
+
+            resp = predictor.raw_predict(data).result(timeout=10)
+            predictor.close()
+        self.assertIsInstance(resp, OffloadedRawResponse)
+        self.assertEqual(resp.json(), data)
+        self.assertEqual(
+            b"".join(resp.iter_content(chunk_size=16)), json.dumps(data).encode()
+        )
+
+    def test_payload_offload_release(self):
+        objects = {}
+        bucket = MagicMock(bucket_name="payload-bucket")
+        bucket.put_object.side_effect = lambda key, data: objects.__setitem__(key, data)
+        bucket.delete_object.side_effect = lambda key: objects.pop(key)
+        predictor = AsyncPredictor(
+            "mock_service",
+            session=make_mock_session(service_config={"metadata": {"type": "Async"}}),
+            serializer=JsonSerializer(),
+            offload_config=PayloadOffloadConfig(
+                "oss://payload-bucket/payloads/", threshold=100, bucket=bucket
+            ),
+        )
+        requests, results = [], {}
+
+        async def send_request(**kwargs):
+            if kwargs["method"] == "POST":
+                requests.append(kwargs["data"])
+                request_id = "r{}".format(len(requests))
+                return self.FakeResponse(
+                    200, headers={"X-Eas-Queueservice-Request-Id": request_id}
+                )
+            request_id = parse_qs(urlsplit(kwargs["url"]).query)["requestId"][0]
+            if request_id not in results:
+                return self.FakeResponse(204)
+            body = json.dumps(
+                [
+                    {
+                        "tags": {"lastCode": results[request_id]},
+                        "data": base64.b64encode(b"error").decode(),
+                    }
+                ]
+            )
+            return self.FakeResponse(200, body=body.encode())
+
+        data = list(range(100))
+        with patch(
+            "pai.predictor._ServicePredictorMixin._send_request_once_async",
+            side_effect=send_request,
+        ):
+            # the queued request may still be processed after the polling timeout.
+            with self.assertRaises(RuntimeError):
+                predictor.predict(
+                    data, wait_config=WaitConfig(interval=0.01, max_attempts=2)
+                ).result(timeout=10)
+            self.assertEqual(len(objects), 1)
+
+            # the payload is deleted once the error result is retrieved.
+            results["r2"] = 500
+            with self.assertRaises(PredictionException):
+                predictor.predict(data).result(timeout=10)
+            predictor.close()
+        self.assertEqual(len(objects), 1)
+
+    def test_payload_offload_content_type(self):
+        bucket = MagicMock(bucket_name="payload-bucket")
+        predictor = AsyncPredictor(
+            "mock_service",
+            session=make_mock_session(service_config={"metadata": {"type": "Async"}}),
+            serializer=MsgPackSerializer(),
+            offload_config=PayloadOffloadConfig(
+                "oss://payload-bucket/payloads/", threshold=100, bucket=bucket
+            ),
+        )
+
+        async def run(data):
+            sent, _, payload_uri = await predictor._offload_request(
+                predictor._handle_input(data)
+            )
+            return sent, predictor._offloaded_headers(
+                predictor._serializer_headers(), payload_uri
+            )
+
+        _, headers = asyncio.run(run([1]))
+        self.assertEqual(headers["Content-Type"], "application/msgpack")
+        # the payload reference is sent as JSON.
+        sent, headers = asyncio.run(run(list(range(200))))
+        self.assertEqual(json.loads(sent), {"payload_uri": ANY})
+        self.assertEqual(headers["Content-Type"], "application/json")
+        self.assertEqual(headers["Accept"], predictor.serializer.accept)
+
+
+class TestWaitConfig(BasePredictorTestCase):
+    def test_intervals(self):
+        intervals = WaitConfig(interval=2).intervals()
+        self.assertEqual([next(intervals) for _ in range(3)], [0, 2, 2])
+
+        intervals = WaitConfig(min_interval=0.1, interval=1, jitter=0).intervals()
+        self.assertEqual(
+            [next(intervals) for _ in range(7)], [0, 0.1, 0.2, 0.4, 0.8, 1, 1]
+        )
+
+        intervals = WaitConfig(min_interval=0.1, jitter=0.5).intervals()
+        next(intervals)
+        self.assertTrue(0.05 <= next(intervals) <= 0.15)
+
+        # first poll is delayed by the estimated completion time.
+        intervals = WaitConfig(min_interval=0.1, adaptive=True).intervals(10)
+        self.assertEqual(next(intervals), 8)
+
+    def test_poll_result(self):
+        predictor = AsyncPredictor(
+            "mock_service",
+            session=make_mock_session(service_config={"metadata": {"type": "Async"}}),
+        )
+        polls = []
+
+        async def get_result(request_id):
+            polls.append(time.monotonic())
+            if len(polls) >= 4:
+                return 200, {}, b"ok"
+
+        async def run(wait_config):
+            polls.clear()
+            return await predictor._poll_result_async("1", wait_config=wait_config)
+
+        with patch.object(predictor, "_get_result_async", side_effect=get_result):
+            config = WaitConfig(min_interval=0.01, interval=0.02, adaptive=True)
+            for _ in range(5):
+                self.assertEqual(asyncio.run(run(config))[2], b"ok")
+            self.assertEqual(len(predictor._completion_times), 5)
+            self.assertIsNotNone(predictor._estimate_completion_time())
+
+            with self.assertRaisesRegex(RuntimeError, "timeout"):
+                asyncio.run(run(WaitConfig(interval=1, timeout=0.05)))
+            self.assertEqual(len(polls), 2)
+
+            with self.assertRaisesRegex(RuntimeError, "timeout"):
+                asyncio.run(run(WaitConfig(interval=0.01, max_attempts=2)))
+            self.assertEqual(len(polls), 2)
@@ -0,0 +1,291 @@
+#  Copyright 2023 Alibaba, Inc. or its affiliates.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       https://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+import datetime
+import json
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from eas_prediction import pytorch_predict_pb2 as pt_pb
+from eas_prediction import tf_request_pb2 as tf_pb
+
+from pai.serializers import (
+    ArrowSerializer,
+    FastJsonSerializer,
+    MsgPackSerializer,
+    PyTorchSerializer,
+    TensorFlowSerializer,
+)
+from tests.unit import BaseUnitTestCase
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+try:
+    import msgpack_numpy
+except ImportError:
+    msgpack_numpy = None
+
+
+class TestTensorFlowSerializer(BaseUnitTestCase):
+    def test_serialize(self):
+        serializer = TensorFlowSerializer()
+        serializer._output_filter = ["output"]
+        data = {
+            "float": np.random.rand(4, 3).astype(np.float32),
+            "double": np.random.rand(2, 5),
+            "bool": np.array([[True, False, True]]),
+            "int": np.arange(-3, 3, dtype=np.int32).reshape(2, 3),
+            "int64": np.array([-(2**40), 2**40], dtype=np.int64),
+            "string": np.array(["foo", "bar"]),
+        }
+        request = tf_pb.PredictRequest.FromString(serializer.serialize(data))
+
+        self.assertEqual(list(request.output_filter), ["output"])
+        self.assertEqual(set(request.inputs.keys()), set(data.keys()))
+        self.assertEqual(list(request.inputs["float"].array_shape.dim), [4, 3])
+        np.testing.assert_array_equal(
+            np.asarray(request.inputs["float"].float_val, np.float32),
+            data["float"].ravel(),
+        )
+        np.testing.assert_array_equal(
+            request.inputs["double"].double_val, data["double"].ravel()
+        )
+        self.assertEqual(list(request.inputs["bool"].bool_val), [True, False, True])
+        self.assertEqual(list(request.inputs["int"].int_val), list(range(-3, 3)))
+        self.assertEqual(list(request.inputs["int64"].int64_val), [-(2**40), 2**40])
+        self.assertEqual(list(request.inputs["string"].string_val), [b"foo", b"bar"])
+
+    def test_deserialize(self):
+        float_value = np.random.rand(2, 3).astype(np.float32)
+        response = tf_pb.PredictResponse()
+        response.outputs["float"].dtype = tf_pb.DT_FLOAT
+        response.outputs["float"].array_shape.dim.extend([2, 3])
+        response.outputs["float"].float_val.extend(float_value.ravel().tolist())
+        response.outputs["bool"].dtype = tf_pb.DT_BOOL
+        response.outputs["bool"].array_shape.dim.extend([-1])
+        response.outputs["bool"].bool_val.extend([False, True])
+        response.outputs["int"].dtype = tf_pb.DT_INT32
+        response.outputs["int"].array_shape.dim.extend([3])
+        response.outputs["int"].int_val.extend([-1, 0, 1])
+        response.outputs["empty"].dtype = tf_pb.DT_INVALID
+
+        result = TensorFlowSerializer().deserialize(response.SerializeToString())
+
+        self.assertEqual(result["float"].dtype, np.float32)
+        np.testing.assert_array_equal(result["float"], float_value)
+        np.testing.assert_array_equal(result["bool"], [False, True])
+        np.testing.assert_array_equal(result["int"], [-1, 0, 1])
+        self.assertIsNone(result["empty"])
+        # decoded array is writable.
+        result["float"][0, 0] = 1.0
+
+
+class TestPyTorchSerializer(BaseUnitTestCase):
+    def test_serialize(self):
+        serializer = PyTorchSerializer()
+        float_value = np.random.rand(2, 2).astype(np.float32)
+        request = pt_pb.PredictRequest.FromString(
+            serializer.serialize([float_value, np.array([1, 2, 3], np.int64)])
+        )
+        self.assertEqual(len(request.inputs), 2)
+        self.assertEqual(list(request.inputs[0].array_shape.dim), [2, 2])
+        np.testing.assert_array_equal(
+            np.asarray(request.inputs[0].float_val, np.float32), float_value.ravel()
+        )
+        self.assertEqual(list(request.inputs[1].int64_val), [1, 2, 3])
+
+    def test_deserialize(self):
+        response = pt_pb.PredictResponse()
+        output = response.outputs.add()
+        output.dtype = pt_pb.DT_DOUBLE
+        output.array_shape.dim.extend([2, 2])
+        output.double_val.extend([1.0, 2.0, 3.0, 4.0])
+
+        result = PyTorchSerializer().deserialize(response.SerializeToString())
+        np.testing.assert_array_equal(result, [[1.0, 2.0], [3.0, 4.0]])
+
+        output = response.outputs.add()
+        output.dtype = pt_pb.DT_INT32
+        output.array_shape.dim.extend([1])
+        output.int_val.extend([7])
+        results = PyTorchSerializer().deserialize(response.SerializeToString())
+        self.assertEqual(len(results), 2)
+        np.testing.assert_array_equal(results[1], [7])
+
+
+class TestFastJsonSerializer(BaseUnitTestCase):
+    data = {
+        "array": np.arange(6, dtype=np.float32).reshape(2, 3),
+        "strided": np.arange(6, dtype=">i4")[::2],
+        "scalar": np.int64(7),
+        "time": datetime.datetime(2024, 1, 2, 3, 4, 5),
+        "bytes": b"abc",
+    }
+    expected = {
+        "array": [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]],
+        "strided": [0, 2, 4],
+        "scalar": 7,
+        "time": "2024-01-02T03:04:05",
+        "bytes": "YWJj",
+    }
+
+    def test_serialize(self):
+        serializer = FastJsonSerializer()
+        self.assertEqual(json.loads(serializer.serialize(self.data)), self.expected)
+        self.assertEqual(serializer.deserialize(b'{"a": [1, 2]}'), {"a": [1, 2]})
+
+    def test_stdlib_fallback(self):
+        serializer = FastJsonSerializer()
+        serializer._orjson = None
+        self.assertEqual(json.loads(serializer.serialize(self.data)), self.expected)
+        self.assertEqual(
+            json.loads(serializer.serialize(pd.DataFrame({"a": [1, 2]}))), [[1], [2]]
+        )
+
+
+class TestMsgPackSerializer(BaseUnitTestCase):
+    def test_serialize(self):
+        serializer = MsgPackSerializer()
+        self.assertEqual(serializer.content_type, "application/msgpack")
+        value = np.random.rand(3, 4).astype(np.float32)
+        result = serializer.deserialize(
+            serializer.serialize(
+                {"x": value, "id": np.int32(3), "raw": b"\x00\x01", 1: [1.5, "a"]}
+            )
+        )
+        self.assertEqual(result["x"].dtype, np.float32)
+        np.testing.assert_array_equal(result["x"], value)
+        self.assertEqual(result["id"], 3)
+        self.assertEqual(result["raw"], b"\x00\x01")
+        self.assertEqual(result[1], [1.5, "a"])
+        # decoded array is writable.
+        result["x"][0, 0] = 1.0
+
+    def test_negotiate_content_type(self):
+        serializer = MsgPackSerializer()
+        self.assertEqual(
+            serializer.deserialize_response(
+                b'{"y": [1, 2]}', content_type="application/json; charset=utf-8"
+            ),
+            {"y": [1, 2]},
+        )
+        with patch("importlib.import_module", side_effect=ImportError):
+            serializer = MsgPackSerializer()
+        self.assertEqual(serializer.content_type, "application/json")
+        self.assertEqual(
+            json.loads(serializer.serialize({"x": np.arange(2)})), {"x": [0, 1]}
+        )
+
+    def test_str_keys(self):
+        # arrays encoded with str keys by the earlier versions are decoded.
+        serializer = MsgPackSerializer()
+        data = serializer._msgpack.packb(
+            {
+                "nd": True,
+                "type": "<i4",
+                "kind": "",
+                "shape": [2],
+                "data": np.arange(2, dtype="<i4").tobytes(),
+            },
+            use_bin_type=True,
+        )
+        np.testing.assert_array_equal(serializer.deserialize(data), [0, 1])
+
+    def test_user_dict_with_ndarray_keys(self):
+        serializer = MsgPackSerializer()
+        values = [
+            {"nd": True, "type": "feature", "data": b"\x00\x01"},
+            {"nd": False, "type": "<i4", "data": b"\x00", "id": 1},
+            {"nd": True, "type": "<i4", "kind": "", "shape": [3], "data": b"\x00"},
+            {"nd": True, "type": "unknown", "kind": "", "shape": [1], "data": b"x"},
+            {"nd": True, "type": "|O", "kind": "", "shape": [1], "data": b"\x00" * 8},
+            {"nd": True, "type": "<i4", "kind": "", "shape": "2", "data": b"\x00" * 8},
+        ]
+        for value in values:
+            self.assertEqual(serializer.deserialize(serializer.serialize(value)), value)
+
+    @unittest.skipIf(msgpack_numpy is None, "msgpack-numpy is not available.")
+    def test_msgpack_numpy_compatible(self):
+        serializer = MsgPackSerializer()
+        value = np.random.rand(3, 2).astype(np.float32)
+        result = msgpack_numpy.unpackb(serializer.serialize({"x": value}))
+        self.assertEqual(result["x"].dtype, np.float32)
+        np.testing.assert_array_equal(result["x"], value)
+
+        records = np.array([(1, 0.5)], dtype=[("a", "<i4"), ("b", "<f8")])
+        result = serializer.deserialize(
+            msgpack_numpy.packb({"x": value, "n": np.int64(7), "r": records})
+        )
+        np.testing.assert_array_equal(result["x"], value)
+        self.assertEqual(result["n"], 7)
+        self.assertEqual(result["r"].dtype, records.dtype)
+        np.testing.assert_array_equal(result["r"], records)
+
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not available.")
+class TestArrowSerializer(BaseUnitTestCase):
+    def make_dataframe(self, rows=10):
+        return pd.DataFrame(
+            {
+                "id": np.arange(rows),
+                "score": np.random.rand(rows).astype(np.float32),
+                "flag": np.arange(rows) % 2 == 0,
+                "name": ["row-{}".format(i) for i in range(rows)],
+            }
+        )
+
+    def test_serialize_dataframe(self):
+        df = self.make_dataframe()
+        for serializer in [
+            ArrowSerializer(),
+            ArrowSerializer(compression="zstd"),
+            ArrowSerializer(format="parquet"),
+        ]:
+            result = serializer.deserialize(serializer.serialize(df))
+            pd.testing.assert_frame_equal(result, df)
+
+    def test_content_type(self):
+        serializer = ArrowSerializer()
+        self.assertEqual(serializer.content_type, "application/vnd.apache.arrow.stream")
+        self.assertTrue(serializer.accept.startswith(serializer.content_type))
+        serializer = ArrowSerializer(format="parquet")
+        self.assertEqual(serializer.content_type, "application/vnd.apache.parquet")
+        self.assertIn("application/vnd.apache.arrow.stream", serializer.accept)
+
+    def test_serialize_numpy(self):
+        serializer = ArrowSerializer(return_type="numpy")
+        records = np.rec.fromarrays(
+            [np.arange(3), np.array([0.5, 1.5, 2.5])], names="x,y"
+        )
+        result = serializer.deserialize(serializer.serialize(records))
+        np.testing.assert_array_equal(result["x"], [0, 1, 2])
+        np.testing.assert_array_equal(result["y"], [0.5, 1.5, 2.5])
+
+        result = serializer.deserialize(serializer.serialize(np.eye(2)))
+        self.assertEqual(list(result.keys()), ["0", "1"])
+        np.testing.assert_array_equal(result["1"], [0.0, 1.0])
+
+        table = ArrowSerializer(return_type="arrow").deserialize(
+            serializer.serialize({"k": [1, 2]})
+        )
+        self.assertIsInstance(table, pyarrow.Table)
+        self.assertEqual(table.column("k").to_pylist(), [1, 2])
+
+        with self.assertRaises(ValueError):
+            serializer.serialize("unsupported")